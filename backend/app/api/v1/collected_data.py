@@ -3,15 +3,20 @@
 提供 GPU 价格、推理覆盖率和 CapEx 数据的实时数据服务
 """
 
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 
+from app.services.snapshot_cache import SnapshotCache
+from collectors.capex_collector import CapExCollector
+from collectors.gpu_price_collector import GPUPriceCollector
+from collectors.inference_coverage_collector import InferenceCoverageCollector
+from app.services.price_series import GPUPriceSeries
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/collected", tags=["Collected Data"])
@@ -27,41 +32,24 @@ class CollectedDataResponse(BaseModel):
     source: str = "collected"
 
 
+# 最新快照及派生视图的进程内缓存 (没有 JSON 快照时读快照存储)
+_snapshot_cache = SnapshotCache(DATA_DIR, {
+    "gpu_prices": GPUPriceCollector.load_latest_snapshot,
+    "capex": CapExCollector.load_latest_snapshot,
+    "inference_coverage": InferenceCoverageCollector.load_latest_snapshot,
+})
+
+# GPU 价格历史查询 (快照存储块摘要缓存)
+_price_series = GPUPriceSeries(DATA_DIR)
+
+
 def load_latest_json(subdir: str, prefix: str) -> Optional[Dict]:
-    """加载目录下最新的 JSON 文件"""
-    data_path = DATA_DIR / subdir
-    if not data_path.exists():
-        return None
-    
-    # 找到最新的文件
-    json_files = sorted(data_path.glob(f"{prefix}*.json"), reverse=True)
-    if not json_files:
-        return None
-    
-    latest = json_files[0]
-    try:
-        with open(latest, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"加载 {latest} 失败: {e}")
-        return None
+    """加载最新快照 (JSON 文件或快照存储；缓存，快照变化时重新解析)"""
+    return _snapshot_cache.load(subdir, prefix)
 
 
-@router.get("/gpu-prices", response_model=CollectedDataResponse)
-async def get_gpu_prices():
-    """
-    获取最新 GPU 价格数据
-    
-    返回各云厂商的 GPU 实例价格，包括:
-    - Lambda Labs
-    - AWS
-    - Azure
-    - GCP
-    """
-    data = load_latest_json("gpu_prices", "prices_")
-    if not data:
-        raise HTTPException(status_code=404, detail="GPU 价格数据未找到")
-    
+def build_gpu_summary(data: Dict) -> Dict[str, Any]:
+    """GPU 价格摘要: 服务商列表、关键 GPU 最低价"""
     # 从 providers 数据中提取各 GPU 最低价
     key_gpus = {}
     gpu_types = ["H100", "H200", "A100", "B100", "B200"]
@@ -87,16 +75,106 @@ async def get_gpu_prices():
                 "provider": best_provider,
             }
     
+    return {
+        "providers": list(data.get("providers", {}).keys()),
+        "key_gpus": key_gpus,
+        "total_prices": sum(
+            len(prices) for prices in data.get("providers", {}).values()
+        ),
+    }
+
+
+def build_coverage_summary(data: Dict) -> Dict[str, Any]:
+    """推理覆盖率摘要: 按公司分组的文章"""
+    articles_by_company: Dict[str, List] = {}
+    for article in data.get("relevant_articles", []):
+        company = article.get("matched_company", "other")
+        if company not in articles_by_company:
+            articles_by_company[company] = []
+        articles_by_company[company].append({
+            "title": article.get("title"),
+            "url": article.get("url"),
+            "source": article.get("source"),
+        })
+    
+    return {
+        "total_articles": data.get("rss_articles", 0),
+        "relevant_count": len(data.get("relevant_articles", [])),
+        "articles_by_company": articles_by_company,
+        "sec_filings": data.get("sec_filings", {}),
+    }
+
+
+def build_capex_summary(data: Dict) -> Dict[str, Any]:
+    """CapEx 摘要: 每家公司最新4季度数据"""
+    companies_summary = {}
+    for company, quarters in data.get("companies", {}).items():
+        if quarters:
+            # 按季度排序取最新4个
+            sorted_quarters = sorted(
+                quarters, 
+                key=lambda x: x.get("period", ""), 
+                reverse=True
+            )[:4]
+            
+            avg_intensity = sum(
+                q.get("capital_intensity_pct", 0) for q in sorted_quarters
+            ) / len(sorted_quarters)
+            
+            companies_summary[company] = {
+                "latest_period": sorted_quarters[0].get("period"),
+                "latest_capex_b": sorted_quarters[0].get("capex_b"),
+                "latest_revenue_b": sorted_quarters[0].get("total_revenue_b"),
+                "avg_capital_intensity_4q": round(avg_intensity, 1),
+                "history": sorted_quarters,
+            }
+    
+    return {
+        "companies": companies_summary,
+        "summary": data.get("summary", {}),
+    }
+
+
+def build_news_feed(data: Dict) -> Dict[str, Any]:
+    """新闻列表"""
+    articles = data.get("relevant_articles", [])
+    
+    # 格式化为新闻列表
+    news_items = []
+    for article in articles:
+        news_items.append({
+            "title": article.get("title"),
+            "url": article.get("url"),
+            "company": article.get("matched_company", "").upper(),
+            "source": _extract_source_name(article.get("source", "")),
+            "collected_at": data.get("timestamp"),
+        })
+    
+    return {
+        "news": news_items,
+        "count": len(news_items),
+    }
+
+
+@router.get("/gpu-prices", response_model=CollectedDataResponse)
+async def get_gpu_prices():
+    """
+    获取最新 GPU 价格数据
+    
+    返回各云厂商的 GPU 实例价格，包括:
+    - Lambda Labs
+    - AWS
+    - Azure
+    - GCP
+    """
+    entry = _snapshot_cache.entry("gpu_prices", "prices_")
+    if not entry:
+        raise HTTPException(status_code=404, detail="GPU 价格数据未找到")
+    
     return CollectedDataResponse(
         success=True,
-        data={
-            "providers": list(data.get("providers", {}).keys()),
-            "key_gpus": key_gpus,
-            "total_prices": sum(
-                len(prices) for prices in data.get("providers", {}).values()
-            ),
-        },
-        timestamp=data.get("timestamp"),
+        data=entry.view("key_gpus", build_gpu_summary),
+        timestamp=entry.data.get("timestamp"),
         source="gpu_price_collector",
     )
 
@@ -117,6 +195,56 @@ async def get_gpu_prices_detail():
     )
 
 
+def _parse_time(value: Optional[str], name: str, end_of_day: bool = False) -> Optional[datetime]:
+    """
+    解析 ISO 时间参数；只有日期时 to 取当天结束
+    
+    带时区偏移的时间转换为本地时间并去掉时区 (快照时间戳是本地 naive 时间)
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"{name} 不是有效的 ISO 时间: {value}")
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59)
+    return parsed
+
+
+@router.get("/gpu-prices/history", response_model=CollectedDataResponse)
+async def get_gpu_price_history(
+    gpu_type: str = Query("H100", description="GPU 类型，如 H100、A100"),
+    start: Optional[str] = Query(None, alias="from", description="开始时间 (ISO format)"),
+    end: Optional[str] = Query(None, alias="to", description="结束时间 (ISO format)"),
+    provider: Optional[str] = Query(None, description="只看指定服务商"),
+):
+    """
+    获取 GPU 价格历史
+    
+    返回时间范围内每个快照的每 GPU 小时最低价、对应服务商及各服务商最低价
+    """
+    start_time = _parse_time(start, "from")
+    end_time = _parse_time(end, "to", end_of_day=True)
+    points = _price_series.query(gpu_type, start_time, end_time, provider)
+    
+    return CollectedDataResponse(
+        success=True,
+        data={
+            "gpu_type": gpu_type.upper(),
+            "unit": "per_gpu_hour",
+            "from": start_time.isoformat() if start_time else None,
+            "to": end_time.isoformat() if end_time else None,
+            "count": len(points),
+            "series": points,
+        },
+        timestamp=points[-1]["timestamp"] if points else None,
+        source="gpu_price_collector",
+    )
+
+
 @router.get("/inference-coverage", response_model=CollectedDataResponse)
 async def get_inference_coverage():
     """
@@ -126,31 +254,14 @@ async def get_inference_coverage():
     - RSS 相关文章
     - SEC 8-K 文件列表
     """
-    data = load_latest_json("inference_coverage", "coverage_")
-    if not data:
+    entry = _snapshot_cache.entry("inference_coverage", "coverage_")
+    if not entry:
         raise HTTPException(status_code=404, detail="推理覆盖率数据未找到")
     
-    # 按公司分组文章
-    articles_by_company: Dict[str, List] = {}
-    for article in data.get("relevant_articles", []):
-        company = article.get("matched_company", "other")
-        if company not in articles_by_company:
-            articles_by_company[company] = []
-        articles_by_company[company].append({
-            "title": article.get("title"),
-            "url": article.get("url"),
-            "source": article.get("source"),
-        })
-    
     return CollectedDataResponse(
         success=True,
-        data={
-            "total_articles": data.get("rss_articles", 0),
-            "relevant_count": len(data.get("relevant_articles", [])),
-            "articles_by_company": articles_by_company,
-            "sec_filings": data.get("sec_filings", {}),
-        },
-        timestamp=data.get("timestamp"),
+        data=entry.view("articles_by_company", build_coverage_summary),
+        timestamp=entry.data.get("timestamp"),
         source="inference_coverage_collector",
     )
 
@@ -163,40 +274,14 @@ async def get_capex_data():
     返回:
     - Microsoft, Alphabet, Amazon, Meta 的 CapEx/Revenue 比率
     """
-    data = load_latest_json("capex", "capex_")
-    if not data:
+    entry = _snapshot_cache.entry("capex", "capex_")
+    if not entry:
         raise HTTPException(status_code=404, detail="CapEx 数据未找到")
     
-    # 获取每家公司最新4季度数据
-    companies_summary = {}
-    for company, quarters in data.get("companies", {}).items():
-        if quarters:
-            # 按季度排序取最新4个
-            sorted_quarters = sorted(
-                quarters, 
-                key=lambda x: x.get("period", ""), 
-                reverse=True
-            )[:4]
-            
-            avg_intensity = sum(
-                q.get("capital_intensity_pct", 0) for q in sorted_quarters
-            ) / len(sorted_quarters)
-            
-            companies_summary[company] = {
-                "latest_period": sorted_quarters[0].get("period"),
-                "latest_capex_b": sorted_quarters[0].get("capex_b"),
-                "latest_revenue_b": sorted_quarters[0].get("total_revenue_b"),
-                "avg_capital_intensity_4q": round(avg_intensity, 1),
-                "history": sorted_quarters,
-            }
-    
     return CollectedDataResponse(
         success=True,
-        data={
-            "companies": companies_summary,
-            "summary": data.get("summary", {}),
-        },
-        timestamp=data.get("timestamp"),
+        data=entry.view("companies_summary", build_capex_summary),
+        timestamp=entry.data.get("timestamp"),
         source="capex_collector",
     )
 
@@ -208,30 +293,14 @@ async def get_news_feed():
     
     从采集的 RSS 数据中提取 AI 公司相关新闻
     """
-    data = load_latest_json("inference_coverage", "coverage_")
-    if not data:
+    entry = _snapshot_cache.entry("inference_coverage", "coverage_")
+    if not entry:
         raise HTTPException(status_code=404, detail="新闻数据未找到")
     
-    articles = data.get("relevant_articles", [])
-    
-    # 格式化为新闻列表
-    news_items = []
-    for article in articles:
-        news_items.append({
-            "title": article.get("title"),
-            "url": article.get("url"),
-            "company": article.get("matched_company", "").upper(),
-            "source": _extract_source_name(article.get("source", "")),
-            "collected_at": data.get("timestamp"),
-        })
-    
     return CollectedDataResponse(
         success=True,
-        data={
-            "news": news_items,
-            "count": len(news_items),
-        },
-        timestamp=data.get("timestamp"),
+        data=entry.view("news_feed", build_news_feed),
+        timestamp=entry.data.get("timestamp"),
         source="inference_coverage_collector",
     )
 
@@ -23,37 +23,25 @@ _cache = {
 
 
 async def get_spider_data():
-    """获取所有爬虫数据"""
-    from spiders import (
-        OpenAISpider, AnthropicSpider, LambdaLabsSpider,
-        DeepSeekSpider, QwenSpider, MiniMaxSpider,
-        AWSSpider, AzureSpider, GCPSpider
-    )
-    
-    all_data = []
+    """获取所有爬虫数据 (并发执行，单个厂商超时不影响其它厂商)"""
+    from spiders import SpiderRunner
     
-    spiders = [
+    providers = [
         # B板块：大模型 API
-        ("openai", OpenAISpider()),
-        ("anthropic", AnthropicSpider()),
-        ("deepseek", DeepSeekSpider()),
-        ("qwen", QwenSpider()),
-        ("minimax", MiniMaxSpider()),
+        "openai", "anthropic", "deepseek", "qwen", "minimax",
         # C板块：GPU 租赁
-        ("lambda_labs", LambdaLabsSpider()),
-        ("aws", AWSSpider()),
-        ("azure", AzureSpider()),
-        ("gcp", GCPSpider()),
+        "lambda_labs", "aws", "azure", "gcp",
     ]
     
-    for provider, spider in spiders:
-        try:
-            results = await spider.run()
-            for item in results:
-                item["provider"] = provider
-            all_data.extend(results)
-        except Exception as e:
-            print(f"Error from {provider}: {e}")
+    all_data = []
+    run_results = await SpiderRunner().run_registry(providers)
+    
+    for provider, result in run_results.items():
+        if result.error:
+            print(f"Error from {provider}: {result.error}")
+        for item in result.records:
+            item["provider"] = provider
+        all_data.extend(result.records)
     
     return all_data
 
@@ -87,6 +75,22 @@ async def list_prices():
     }
 
 
+@router.get("/prices/latest")
+async def list_latest_prices(provider: str = None):
+    """
+    价格目录的最新价格 (直接读取 price_latest，不触发采集)
+
+    每项含当前价格、上次价格、变价时间和变化百分比
+    """
+    from app.repositories.price_history import get_repository
+    catalog = get_repository().get_latest_catalog(provider)
+
+    return {
+        "success": True,
+        "data": catalog,
+        "total": len(catalog),
+    }
+
 
 @router.get("/prices/{provider}")
 async def get_provider_prices(provider: str):
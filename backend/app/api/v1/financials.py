@@ -7,9 +7,10 @@ from fastapi import APIRouter, HTTPException
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
 from datetime import datetime
-import httpx
 import os
 
+from spiders.http_client import get_http_pool
+
 router = APIRouter(prefix="/financials", tags=["financials"])
 
 # EODHD API 配置
@@ -60,10 +61,9 @@ async def fetch_fundamentals(ticker: str) -> Optional[Dict]:
     }
     
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(url, params=params)
-            if response.status_code == 200:
-                return response.json()
+        response = await get_http_pool().get(url, params=params, timeout=30.0)
+        if response.status_code == 200:
+            return response.json()
     except Exception as e:
         print(f"Error fetching {ticker}: {e}")
     
@@ -8,6 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.v1.router import router as api_v1_router
 from app.core.database import init_db
+from spiders.http_client import close_http_pool
+from spiders.browser_pool import close_browser_pool
+from app.repositories.sqlite_pool import close_all_connections
 
 
 @asynccontextmanager
@@ -17,7 +20,9 @@ async def lifespan(app: FastAPI):
     await init_db()
     yield
     # Shutdown
-    pass
+    await close_http_pool()
+    await close_browser_pool()
+    close_all_connections()
 
 
 app = FastAPI(
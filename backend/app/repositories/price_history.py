@@ -3,37 +3,65 @@ Price History Storage - 价格历史存储
 
 使用 SQLite 进行 MVP 阶段的数据持久化。
 支持:
-- 价格历史记录
+- 价格历史记录 (区间存储: 价格不变时延长当前区间，变化时才新开一行)
+- 最新价格表 price_latest (触发器维护，含上次价格和变价时间)
 - 周/月/年同比计算
 """
 
-import os
 import sqlite3
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
+from app.repositories.sqlite_pool import get_connection_manager
+
 logger = logging.getLogger(__name__)
 
 # 数据库路径
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "infrawatch.db"
 
+# 趋势对比的时间点: (标签, 距今天数)
+TREND_OFFSETS = (
+    ("weekOverWeek", 7),
+    ("monthOverMonth", 30),
+    ("yearOverYear", 365),
+)
+
+# 批量趋势查询每批的 SKU 数 (每个 SKU 占 3 个绑定参数，低于 SQLite 默认的 999 上限)
+TREND_BATCH_SIZE = 300
+
+# (provider, sku_id, price_type)
+PriceKey = Tuple[str, str, str]
+
+
+def to_epoch(value: datetime) -> int:
+    """datetime -> epoch 秒 (无时区的 datetime 视为 UTC，与 utcnow() 一致)"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
 
 def get_db_connection() -> sqlite3.Connection:
-    """获取数据库连接"""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
-    conn.row_factory = sqlite3.Row
-    return conn
+    """获取当前线程的数据库连接 (长连接，WAL 模式，调用方不要关闭)"""
+    return get_connection_manager(DB_PATH).connection()
+
+
+def db_transaction():
+    """写事务 (进程内串行，正常退出提交，异常回滚)"""
+    return get_connection_manager(DB_PATH).transaction()
 
 
 def init_db():
     """初始化数据库表"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
+    with db_transaction() as conn:
+        _create_tables(conn.cursor())
+    logger.info(f"数据库初始化完成: {DB_PATH}")
+
+
+def _create_tables(cursor: sqlite3.Cursor):
+    """建表 (幂等)"""
     # 价格历史表
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS price_history (
@@ -46,17 +74,24 @@ def init_db():
             unit TEXT,
             currency TEXT DEFAULT 'USD',
             recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            valid_from INTEGER,
+            valid_to INTEGER,
             metadata TEXT,
             UNIQUE(provider, sku_id, price_type, recorded_at)
         )
     """)
+    _migrate_price_history(cursor)
     
-    # 创建索引
+    # 创建索引: (SKU, 价格类型, 区间起点)，"某时刻之前/之后最近一个区间" 都是一次索引 seek
+    cursor.execute("DROP INDEX IF EXISTS idx_price_history_lookup")
     cursor.execute("""
-        CREATE INDEX IF NOT EXISTS idx_price_history_lookup 
-        ON price_history(provider, sku_id, recorded_at)
+        CREATE INDEX IF NOT EXISTS idx_price_history_asof 
+        ON price_history(provider, sku_id, price_type, valid_from)
     """)
     
+    # 最新价格表: 每个 SKU 一行，由 price_history 上的触发器维护
+    _create_price_latest(cursor)
+    
     # 信号日志表
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS signal_log (
@@ -75,10 +110,184 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
+
+
+def _migrate_price_history(cursor: sqlite3.Cursor):
+    """
+    旧库迁移 (幂等):
+    1. 逐次记录 (recorded_at 文本) -> epoch 秒 valid_from
+    2. 增加 valid_to，并把连续相同价格的记录压缩为一个区间
+    """
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(price_history)")}
+    if "valid_from" not in columns:
+        cursor.execute("ALTER TABLE price_history ADD COLUMN valid_from INTEGER")
+    cursor.execute("""
+        UPDATE price_history
+        SET valid_from = CAST(strftime('%s', recorded_at) AS INTEGER)
+        WHERE valid_from IS NULL
+    """)
+    if cursor.rowcount > 0:
+        logger.info(f"price_history: 回填 {cursor.rowcount} 行 valid_from")
     
-    conn.commit()
-    conn.close()
-    logger.info(f"数据库初始化完成: {DB_PATH}")
+    if "valid_to" not in columns:
+        cursor.execute("ALTER TABLE price_history ADD COLUMN valid_to INTEGER")
+        cursor.execute("UPDATE price_history SET valid_to = valid_from")
+        _compact_intervals(cursor)
+
+
+def _create_price_latest(cursor: sqlite3.Cursor):
+    """
+    最新价格表及触发器
+    
+    - 插入新区间 (即价格变化) 时 upsert: 价格不同则记下上次价格和变价时间
+      (只接受起点不早于当前行的区间，补录旧历史不会覆盖最新价格)
+    - 延长区间 (更新 valid_to) 时同步 last_seen
+    """
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'price_latest'"
+    ).fetchone()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS price_latest (
+            provider TEXT NOT NULL,
+            sku_id TEXT NOT NULL,
+            price_type TEXT NOT NULL,
+            sector TEXT,
+            unit TEXT,
+            price REAL NOT NULL,
+            previous_price REAL,
+            changed_at INTEGER NOT NULL,
+            last_seen INTEGER NOT NULL,
+            history_id INTEGER NOT NULL,
+            PRIMARY KEY (provider, sku_id, price_type)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_price_latest_insert
+        AFTER INSERT ON price_history
+        BEGIN
+            INSERT INTO price_latest
+                (provider, sku_id, price_type, sector, unit, price, previous_price,
+                 changed_at, last_seen, history_id)
+            VALUES
+                (NEW.provider, NEW.sku_id, NEW.price_type, NEW.sector, NEW.unit, NEW.price, NULL,
+                 NEW.valid_from, NEW.valid_to, NEW.id)
+            ON CONFLICT (provider, sku_id, price_type) DO UPDATE SET
+                previous_price = CASE WHEN excluded.price != price_latest.price
+                                      THEN price_latest.price ELSE price_latest.previous_price END,
+                changed_at = CASE WHEN excluded.price != price_latest.price
+                                  THEN excluded.changed_at ELSE price_latest.changed_at END,
+                price = excluded.price,
+                sector = excluded.sector,
+                unit = excluded.unit,
+                last_seen = MAX(excluded.last_seen, price_latest.last_seen),
+                history_id = excluded.history_id
+            WHERE excluded.changed_at >= price_latest.changed_at;
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_price_latest_extend
+        AFTER UPDATE OF valid_to ON price_history
+        BEGIN
+            UPDATE price_latest SET last_seen = MAX(last_seen, NEW.valid_to)
+            WHERE history_id = NEW.id;
+        END
+    """)
+    if not exists:
+        _rebuild_price_latest(cursor)
+
+
+def _rebuild_price_latest(cursor: sqlite3.Cursor):
+    """由 price_history 全量重建最新价格表 (建表时)"""
+    cursor.execute("DELETE FROM price_latest")
+    cursor.execute("""
+        INSERT INTO price_latest
+            (provider, sku_id, price_type, sector, unit, price, previous_price,
+             changed_at, last_seen, history_id)
+        SELECT h.provider, h.sku_id, h.price_type, h.sector, h.unit, h.price,
+            (SELECT p.price FROM price_history p
+             WHERE p.provider = h.provider AND p.sku_id = h.sku_id
+             AND p.price_type = h.price_type AND p.valid_from <= h.valid_from
+             AND p.id != h.id AND p.price != h.price
+             ORDER BY p.valid_from DESC, p.id DESC LIMIT 1),
+            h.valid_from, h.valid_to, h.id
+        FROM price_history h
+        WHERE h.id = (
+            SELECT l.id FROM price_history l
+            WHERE l.provider = h.provider AND l.sku_id = h.sku_id
+            AND l.price_type = h.price_type
+            ORDER BY l.valid_from DESC, l.id DESC LIMIT 1
+        )
+    """)
+    if cursor.rowcount > 0:
+        logger.info(f"price_latest: 重建 {cursor.rowcount} 个 SKU")
+
+
+def _compact_intervals(cursor: sqlite3.Cursor) -> int:
+    """把同一 SKU 连续相同价格的行合并为一个区间，返回删除的行数"""
+    rows = cursor.execute("""
+        SELECT id, provider, sku_id, price_type, price, valid_to FROM price_history
+        ORDER BY provider, sku_id, price_type, valid_from, id
+    """).fetchall()
+    
+    deletes: List[Tuple[int]] = []
+    extends: Dict[int, int] = {}
+    run_key, run_id, run_price = None, None, None
+    for row_id, provider, sku_id, price_type, price, valid_to in rows:
+        key = (provider, sku_id, price_type)
+        if key == run_key and price == run_price:
+            deletes.append((row_id,))
+            extends[run_id] = max(extends.get(run_id, valid_to), valid_to)
+        else:
+            run_key, run_id, run_price = key, row_id, price
+    
+    cursor.executemany(
+        "UPDATE price_history SET valid_to = MAX(valid_to, ?) WHERE id = ?",
+        [(valid_to, row_id) for row_id, valid_to in extends.items()],
+    )
+    cursor.executemany("DELETE FROM price_history WHERE id = ?", deletes)
+    if deletes:
+        logger.info(f"price_history: 压缩 {len(rows)} 行 -> {len(rows) - len(deletes)} 个区间")
+    return len(deletes)
+
+
+def _nearest_price(
+    target: int,
+    before: Optional[Tuple[float, int]],
+    after: Optional[Tuple[float, int]],
+    tolerance: int,
+) -> Optional[float]:
+    """
+    从目标时间前后最近的两个区间中取更近的价格 (距离相同取之前的)
+    
+    Args:
+        before: 起点 <= 目标时间的最后一个区间 (价格, valid_to)，目标在区间内时距离为 0
+        after: 起点 > 目标时间的第一个区间 (价格, valid_from)
+    """
+    before_distance = max(0, target - before[1]) if before else None
+    after_distance = after[1] - target if after else None
+    if before_distance is not None and before_distance > tolerance:
+        before_distance = None
+    if after_distance is not None and after_distance > tolerance:
+        after_distance = None
+    
+    if before_distance is None:
+        return after[0] if after_distance is not None else None
+    if after_distance is None or before_distance <= after_distance:
+        return before[0]
+    return after[0]
+
+
+def _trend_changes(
+    current_price: Optional[float],
+    history: Dict[str, float],
+) -> Dict[str, Optional[float]]:
+    """由当前价格和历史价格计算各周期涨跌幅 (百分比)"""
+    def calc_change(old_price: Optional[float]) -> Optional[float]:
+        if current_price is None or old_price is None or old_price == 0:
+            return None
+        return round((current_price - old_price) / old_price * 100, 1)
+    
+    return {label: calc_change(history.get(label)) for label, _ in TREND_OFFSETS}
 
 
 class PriceHistoryRepository:
@@ -97,71 +306,92 @@ class PriceHistoryRepository:
         unit: str = None,
         metadata: Dict = None,
     ) -> int:
-        """保存价格记录"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO price_history 
-                (provider, sku_id, sector, price_type, price, unit, metadata, recorded_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                provider, sku_id, sector, price_type, price, unit,
-                json.dumps(metadata) if metadata else None,
-                datetime.utcnow().isoformat()
-            ))
-            conn.commit()
-            return cursor.lastrowid
-        finally:
-            conn.close()
+        """保存价格记录 (价格未变时延长当前区间)，返回区间行 id"""
+        observation = (
+            provider, sku_id, sector, price_type, price, unit,
+            json.dumps(metadata) if metadata else None,
+        )
+        with db_transaction() as conn:
+            row_ids = self._record_observations(conn.cursor(), [observation], datetime.utcnow())
+        return row_ids[0]
     
     def save_prices_batch(self, prices: List[Dict]) -> int:
-        """批量保存价格"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        count = 0
-        
-        try:
-            for p in prices:
-                provider = p.get("provider")
-                sku_id = p.get("sku_id")
-                
-                # 确定板块
-                sector = "C" if p.get("hourly_rate") else "B"
-                
-                # 保存输入价格
-                if p.get("input_price"):
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO price_history 
-                        (provider, sku_id, sector, price_type, price, unit, recorded_at)
-                        VALUES (?, ?, ?, 'input', ?, 'per_million_tokens', ?)
-                    """, (provider, sku_id, sector, p["input_price"], datetime.utcnow().isoformat()))
-                    count += 1
-                
-                # 保存输出价格
-                if p.get("output_price"):
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO price_history 
-                        (provider, sku_id, sector, price_type, price, unit, recorded_at)
-                        VALUES (?, ?, ?, 'output', ?, 'per_million_tokens', ?)
-                    """, (provider, sku_id, sector, p["output_price"], datetime.utcnow().isoformat()))
-                    count += 1
-                
-                # 保存小时价格 (GPU)
-                if p.get("hourly_rate"):
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO price_history 
-                        (provider, sku_id, sector, price_type, price, unit, recorded_at)
-                        VALUES (?, ?, ?, 'hourly', ?, 'per_hour', ?)
-                    """, (provider, sku_id, sector, p["hourly_rate"], datetime.utcnow().isoformat()))
-                    count += 1
+        """批量保存价格 (单个事务)"""
+        observations = []
+        for p in prices:
+            provider = p.get("provider")
+            sku_id = p.get("sku_id")
+            
+            # 确定板块
+            sector = "C" if p.get("hourly_rate") else "B"
+            
+            # 输入价格
+            if p.get("input_price"):
+                observations.append((provider, sku_id, sector, "input", p["input_price"], "per_million_tokens", None))
             
-            conn.commit()
-            logger.info(f"批量保存 {count} 条价格记录")
-            return count
-        finally:
-            conn.close()
+            # 输出价格
+            if p.get("output_price"):
+                observations.append((provider, sku_id, sector, "output", p["output_price"], "per_million_tokens", None))
+            
+            # 小时价格 (GPU)
+            if p.get("hourly_rate"):
+                observations.append((provider, sku_id, sector, "hourly", p["hourly_rate"], "per_hour", None))
+        
+        with db_transaction() as conn:
+            self._record_observations(conn.cursor(), observations, datetime.utcnow())
+        
+        logger.info(f"批量保存 {len(observations)} 条价格记录")
+        return len(observations)
+    
+    def _record_observations(
+        self,
+        cursor: sqlite3.Cursor,
+        observations: List[Tuple],
+        now: datetime,
+    ) -> List[Optional[int]]:
+        """
+        记录一批价格观测
+        
+        每个 SKU 的当前 (最新) 区间一次批量取出；价格相同则把 valid_to 延长到 now，
+        价格变化才插入新区间 [now, now]。同一批中同一 SKU 出现多次时只记录最后一条
+        (同一时刻只能有一个价格，否则会产生重叠区间)。返回每条观测对应的区间行 id
+        
+        Args:
+            observations: [(provider, sku_id, sector, price_type, price, unit, metadata_json)]
+        """
+        ts = to_epoch(now)
+        latest_observations: Dict[PriceKey, Tuple] = {}
+        for o in observations:
+            latest_observations[(o[0], o[1], o[3])] = o
+        current = {
+            key: (row["id"], row["price"])
+            for key, row in self._latest_rows(cursor, list(latest_observations)).items()
+        }
+        
+        extended = set()
+        opened = 0
+        for key, (provider, sku_id, sector, price_type, price, unit, metadata) in latest_observations.items():
+            if key in current and current[key][1] == price:
+                extended.add(current[key][0])
+                continue
+            cursor.execute("""
+                INSERT OR IGNORE INTO price_history 
+                (provider, sku_id, sector, price_type, price, unit, metadata, recorded_at, valid_from, valid_to)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (provider, sku_id, sector, price_type, price, unit, metadata, now.isoformat(), ts, ts))
+            if cursor.rowcount:
+                current[key] = (cursor.lastrowid, price)
+                opened += 1
+        row_ids: List[Optional[int]] = [
+            current.get((o[0], o[1], o[3]), (None,))[0] for o in observations
+        ]
+        
+        cursor.executemany(
+            "UPDATE price_history SET valid_to = ? WHERE id = ? AND valid_to < ?",
+            [(ts, row_id, ts) for row_id in extended],
+        )
+        logger.debug(f"price_history: 新区间 {opened}，延长 {len(extended)}")
+        return row_ids
     
     def get_latest_price(
         self,
@@ -169,21 +399,45 @@ class PriceHistoryRepository:
         sku_id: str,
         price_type: str = "input",
     ) -> Optional[Dict]:
-        """获取最新价格"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        """获取最新价格 (price_latest 主键查找，附带上次价格和变价时间)"""
+        cursor = get_db_connection().cursor()
+        cursor.execute("""
+            SELECT h.*, l.previous_price, l.changed_at, l.last_seen FROM price_latest l
+            JOIN price_history h ON h.id = l.history_id
+            WHERE l.provider = ? AND l.sku_id = ? AND l.price_type = ?
+        """, (provider, sku_id, price_type))
         
-        try:
-            cursor.execute("""
-                SELECT * FROM price_history 
-                WHERE provider = ? AND sku_id = ? AND price_type = ?
-                ORDER BY recorded_at DESC LIMIT 1
-            """, (provider, sku_id, price_type))
-            
-            row = cursor.fetchone()
-            return dict(row) if row else None
-        finally:
-            conn.close()
+        row = cursor.fetchone()
+        return dict(row) if row else None
+    
+    def get_latest_catalog(self, provider: Optional[str] = None) -> List[Dict]:
+        """
+        整个价格目录的最新价格 (一次扫描 price_latest)
+        
+        每行含当前价格、上次价格、变价时间 changed_at 和最近一次观测 last_seen (epoch 秒)，
+        以及相对上次价格的变化百分比 change
+        """
+        cursor = get_db_connection().cursor()
+        sql = """
+            SELECT provider, sku_id, price_type, sector, unit, price, previous_price,
+                   changed_at, last_seen
+            FROM price_latest
+        """
+        params: Tuple = ()
+        if provider:
+            sql += " WHERE provider = ?"
+            params = (provider,)
+        cursor.execute(sql + " ORDER BY provider, sku_id, price_type", params)
+        
+        catalog = []
+        for row in cursor.fetchall():
+            item = dict(row)
+            previous = item["previous_price"]
+            item["change"] = (
+                round((item["price"] - previous) / previous * 100, 2) if previous else None
+            )
+            catalog.append(item)
+        return catalog
     
     def get_price_at(
         self,
@@ -193,26 +447,14 @@ class PriceHistoryRepository:
         target_date: datetime,
         tolerance_days: int = 2,
     ) -> Optional[float]:
-        """获取指定日期附近的价格"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        start = (target_date - timedelta(days=tolerance_days)).isoformat()
-        end = (target_date + timedelta(days=tolerance_days)).isoformat()
+        """
+        获取指定时间附近 (± tolerance_days) 最近的价格
         
-        try:
-            cursor.execute("""
-                SELECT price FROM price_history 
-                WHERE provider = ? AND sku_id = ? AND price_type = ?
-                AND recorded_at BETWEEN ? AND ?
-                ORDER BY ABS(julianday(recorded_at) - julianday(?))
-                LIMIT 1
-            """, (provider, sku_id, price_type, start, end, target_date.isoformat()))
-            
-            row = cursor.fetchone()
-            return row["price"] if row else None
-        finally:
-            conn.close()
+        两次索引 seek: 目标时间之前开始的最后一个区间、之后开始的第一个区间，取更近的一个
+        """
+        key = (provider, sku_id, price_type)
+        prices = self._prices_as_of([key], [("target", to_epoch(target_date))], tolerance_days)
+        return prices.get(key, {}).get("target")
     
     def calculate_trends(
         self,
@@ -231,31 +473,136 @@ class PriceHistoryRepository:
                 "yearOverYear": 年同比百分比,
             }
         """
-        now = datetime.utcnow()
+        key = (provider, sku_id, price_type)
+        return self.calculate_trends_bulk({key: current_price})[key]
+    
+    def calculate_trends_bulk(
+        self,
+        items: Dict[PriceKey, Optional[float]],
+        tolerance_days: int = 2,
+    ) -> Dict[PriceKey, Dict[str, Optional[float]]]:
+        """
+        批量计算趋势
         
-        # 获取历史价格
-        week_ago = self.get_price_at(provider, sku_id, price_type, now - timedelta(days=7))
-        month_ago = self.get_price_at(provider, sku_id, price_type, now - timedelta(days=30))
-        year_ago = self.get_price_at(provider, sku_id, price_type, now - timedelta(days=365))
+        每批 SKU 用一条集合查询取回所有 SKU 在 7/30/365 天前附近的价格，
+        查询次数与目录大小无关 (每 TREND_BATCH_SIZE 个 SKU 一次)
         
-        # 如果没有提供当前价格，从数据库获取
-        if current_price is None:
-            latest = self.get_latest_price(provider, sku_id, price_type)
-            current_price = latest["price"] if latest else None
+        Args:
+            items: {(provider, sku_id, price_type): 当前价格}，当前价格为 None 时取库中最新价格
         
-        if current_price is None:
-            return {"weekOverWeek": None, "monthOverMonth": None, "yearOverYear": None}
+        Returns:
+            {(provider, sku_id, price_type): {"weekOverWeek": ..., "monthOverMonth": ..., "yearOverYear": ...}}
+        """
+        keys = list(items)
+        history = self.get_prices_at_offsets(keys, tolerance_days)
         
-        def calc_change(old_price: Optional[float]) -> Optional[float]:
-            if old_price is None or old_price == 0:
-                return None
-            return round((current_price - old_price) / old_price * 100, 1)
+        missing = [key for key in keys if items[key] is None]
+        latest = self.get_latest_prices(missing) if missing else {}
         
-        return {
-            "weekOverWeek": calc_change(week_ago),
-            "monthOverMonth": calc_change(month_ago),
-            "yearOverYear": calc_change(year_ago),
-        }
+        result = {}
+        for key in keys:
+            current_price = items[key]
+            if current_price is None:
+                current_price = latest.get(key)
+            result[key] = _trend_changes(current_price, history.get(key, {}))
+        return result
+    
+    def get_prices_at_offsets(
+        self,
+        keys: List[PriceKey],
+        tolerance_days: int = 2,
+    ) -> Dict[PriceKey, Dict[str, float]]:
+        """
+        批量获取各 SKU 在 TREND_OFFSETS 各时间点附近的价格
+        
+        Returns:
+            {(provider, sku_id, price_type): {"weekOverWeek": 7 天前价格, ...}} (无数据的时间点不出现)
+        """
+        now = datetime.utcnow()
+        targets = [(label, to_epoch(now - timedelta(days=days))) for label, days in TREND_OFFSETS]
+        return self._prices_as_of(keys, targets, tolerance_days)
+    
+    def _prices_as_of(
+        self,
+        keys: List[PriceKey],
+        targets: List[Tuple[str, int]],
+        tolerance_days: int,
+    ) -> Dict[PriceKey, Dict[str, float]]:
+        """
+        as-of 查询: 每个 (SKU, 目标时间) 两次索引 seek (之前开始的最后一个区间、
+        之后开始的第一个区间)，耗时与历史记录密度无关
+        """
+        tolerance = tolerance_days * 86400
+        target_params = [v for label, ts in targets for v in (label, ts, ts + tolerance)]
+        target_values = ", ".join(["(?, ?, ?)"] * len(targets))
+        
+        cursor = get_db_connection().cursor()
+        result: Dict[PriceKey, Dict[str, float]] = {}
+        for i in range(0, len(keys), TREND_BATCH_SIZE):
+            batch = keys[i:i + TREND_BATCH_SIZE]
+            key_values = ", ".join(["(?, ?, ?)"] * len(batch))
+            cursor.execute(f"""
+                WITH keys(provider, sku_id, price_type) AS (VALUES {key_values}),
+                targets(label, target, hi) AS (VALUES {target_values}),
+                seeks AS (
+                    SELECT k.provider, k.sku_id, k.price_type, t.label, t.target,
+                        (SELECT h.id FROM price_history h
+                         WHERE h.provider = k.provider AND h.sku_id = k.sku_id
+                         AND h.price_type = k.price_type
+                         AND h.valid_from <= t.target
+                         ORDER BY h.valid_from DESC, h.id DESC LIMIT 1) AS before_id,
+                        (SELECT h.id FROM price_history h
+                         WHERE h.provider = k.provider AND h.sku_id = k.sku_id
+                         AND h.price_type = k.price_type
+                         AND h.valid_from > t.target AND h.valid_from <= t.hi
+                         ORDER BY h.valid_from ASC LIMIT 1) AS after_id
+                    FROM keys k CROSS JOIN targets t
+                )
+                SELECT s.provider, s.sku_id, s.price_type, s.label, s.target,
+                       b.price AS before_price, b.valid_to AS before_ts,
+                       a.price AS after_price, a.valid_from AS after_ts
+                FROM seeks s
+                LEFT JOIN price_history b ON b.id = s.before_id
+                LEFT JOIN price_history a ON a.id = s.after_id
+                WHERE s.before_id IS NOT NULL OR s.after_id IS NOT NULL
+            """, [v for key in batch for v in key] + target_params)
+            
+            for row in cursor.fetchall():
+                price = _nearest_price(
+                    row["target"],
+                    (row["before_price"], row["before_ts"]) if row["before_ts"] is not None else None,
+                    (row["after_price"], row["after_ts"]) if row["after_ts"] is not None else None,
+                    tolerance,
+                )
+                if price is None:
+                    continue
+                key = (row["provider"], row["sku_id"], row["price_type"])
+                result.setdefault(key, {})[row["label"]] = price
+        return result
+    
+    def get_latest_prices(self, keys: List[PriceKey]) -> Dict[PriceKey, float]:
+        """批量获取最新价格"""
+        rows = self._latest_rows(get_db_connection().cursor(), keys)
+        return {key: row["price"] for key, row in rows.items()}
+    
+    def _latest_rows(self, cursor: sqlite3.Cursor, keys: List[PriceKey]) -> Dict[PriceKey, sqlite3.Row]:
+        """批量获取各 SKU 的当前区间 (id 为区间行 id)，每个 SKU 一次 price_latest 主键查找"""
+        result: Dict[PriceKey, sqlite3.Row] = {}
+        for i in range(0, len(keys), TREND_BATCH_SIZE):
+            batch = keys[i:i + TREND_BATCH_SIZE]
+            key_values = ", ".join(["(?, ?, ?)"] * len(batch))
+            cursor.execute(f"""
+                WITH keys(provider, sku_id, price_type) AS (VALUES {key_values})
+                SELECT l.history_id AS id, l.provider, l.sku_id, l.price_type, l.price,
+                       l.previous_price, l.changed_at, l.last_seen
+                FROM keys k
+                JOIN price_latest l ON l.provider = k.provider AND l.sku_id = k.sku_id
+                AND l.price_type = k.price_type
+            """, [v for key in batch for v in key])
+            
+            for row in cursor.fetchall():
+                result[(row["provider"], row["sku_id"], row["price_type"])] = row
+        return result
     
     def get_price_history(
         self,
@@ -264,23 +611,23 @@ class PriceHistoryRepository:
         price_type: str = "input",
         days: int = 365,
     ) -> List[Dict]:
-        """获取价格历史"""
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        """
+        获取价格历史
         
-        start_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
+        返回与时间窗口重叠的价格区间 (recorded_at 为区间起点，valid_from/valid_to 为 epoch 秒)
+        """
+        cursor = get_db_connection().cursor()
         
-        try:
-            cursor.execute("""
-                SELECT price, recorded_at FROM price_history 
-                WHERE provider = ? AND sku_id = ? AND price_type = ?
-                AND recorded_at >= ?
-                ORDER BY recorded_at ASC
-            """, (provider, sku_id, price_type, start_date))
-            
-            return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        start_ts = to_epoch(datetime.utcnow() - timedelta(days=days))
+        
+        cursor.execute("""
+            SELECT price, recorded_at, valid_from, valid_to FROM price_history 
+            WHERE provider = ? AND sku_id = ? AND price_type = ?
+            AND valid_to >= ?
+            ORDER BY valid_from ASC, id ASC
+        """, (provider, sku_id, price_type, start_ts))
+        
+        return [dict(row) for row in cursor.fetchall()]
 
 
 # 全局仓库实例
@@ -306,26 +653,12 @@ def save_and_enrich_prices(prices: List[Dict]) -> List[Dict]:
     repo = get_repository()
     now = datetime.utcnow()
     
-    # 保存价格到数据库
-    repo.save_prices_batch(prices)
+    # 保存价格到数据库 (爬虫失败/超时时的后备数据不写入历史)
+    repo.save_prices_batch([p for p in prices if p.get("source") != "fallback"])
     
-    # 计算并添加趋势
-    enriched = []
+    # 确定每个价格的类型和当前价格
+    price_keys: List[Optional[Tuple[PriceKey, float]]] = []
     for p in prices:
-        item = p.copy()
-        provider = p.get("provider")
-        sku_id = p.get("sku_id")
-        
-        # 获取上市时间 (用于限制趋势计算)
-        available_since_str = p.get("available_since")
-        available_since = None
-        if available_since_str:
-            try:
-                available_since = datetime.fromisoformat(available_since_str)
-            except (ValueError, TypeError):
-                pass
-        
-        # 确定价格类型
         if p.get("hourly_rate"):
             price_type = "hourly"
             current_price = p["hourly_rate"]
@@ -336,11 +669,34 @@ def save_and_enrich_prices(prices: List[Dict]) -> List[Dict]:
             price_type = "hourly"
             current_price = p["price"]
         else:
+            price_keys.append(None)
+            continue
+        price_keys.append(((p.get("provider"), p.get("sku_id"), price_type), current_price))
+    
+    # 整个目录的历史价格一次批量查询
+    history = repo.get_prices_at_offsets(list({pk[0] for pk in price_keys if pk}))
+    
+    # 计算并添加趋势
+    enriched = []
+    for p, price_key in zip(prices, price_keys):
+        item = p.copy()
+        if price_key is None:
             enriched.append(item)
             continue
+        key, current_price = price_key
+        provider, sku_id, _ = key
+        
+        # 获取上市时间 (用于限制趋势计算)
+        available_since_str = p.get("available_since")
+        available_since = None
+        if available_since_str:
+            try:
+                available_since = datetime.fromisoformat(available_since_str)
+            except (ValueError, TypeError):
+                pass
         
         # 计算趋势
-        trends = repo.calculate_trends(provider, sku_id, price_type, current_price)
+        trends = _trend_changes(current_price, history.get(key, {}))
         
         # MVP Fallback: 如果没有历史数据，使用模拟趋势
         # 这些趋势反映 AI 行业的一般价格下降趋势
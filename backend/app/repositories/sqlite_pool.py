@@ -0,0 +1,116 @@
+"""
+SQLite 连接管理
+
+每个线程持有一个长连接 (按数据库路径区分)，连接建立时设置:
+- journal_mode=WAL: 读者与写者并行，读不阻塞写、写不阻塞读
+- synchronous=NORMAL: WAL 模式下仍保证崩溃一致性，提交时不再每次 fsync
+- mmap_size / cache_size: 用内存映射和更大的页缓存减少读 I/O
+- busy_timeout: 写锁被占用时等待而不是立即报错
+
+SQLite 同一时刻只允许一个写者: transaction() 以 BEGIN IMMEDIATE 开始，事务开始时即取得
+数据库写锁，事务内 "先读后写" 不会与其他进程 (多个 uvicorn worker、脚本) 交错；
+进程内的写事务另经线程锁串行化
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+MMAP_SIZE = 256 * 1024 * 1024     # 256 MB
+CACHE_SIZE_KB = 20 * 1024         # 20 MB 页缓存
+BUSY_TIMEOUT = 5.0                # 秒
+
+
+class SQLiteConnectionManager:
+    """
+    按线程复用的 SQLite 连接
+
+    用法:
+        manager = get_connection_manager(DB_PATH)
+        rows = manager.connection().execute("SELECT ...").fetchall()
+        with manager.transaction() as conn:
+            conn.execute("INSERT ...")
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 连接只在创建它的线程中使用；允许跨线程仅为了 close_all() 统一关闭
+        conn = sqlite3.connect(str(self.db_path), timeout=BUSY_TIMEOUT, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._connections_lock:
+            self._connections.append(conn)
+        logger.debug(f"[sqlite] 新建连接 {self.db_path} (线程 {threading.get_ident()})")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """当前线程的连接"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """写事务: 开始即持有数据库写锁 (BEGIN IMMEDIATE)，正常退出提交，异常回滚"""
+        conn = self.connection()
+        with self._write_lock:
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+
+    def close_all(self):
+        """关闭所有线程的连接 (应用关闭时调用)"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"[sqlite] 关闭连接失败: {e}")
+        self._local = threading.local()
+
+
+# 每个数据库文件一个管理器
+_managers: Dict[str, SQLiteConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: Path) -> SQLiteConnectionManager:
+    """获取数据库文件对应的连接管理器"""
+    key = str(Path(db_path).resolve())
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = _managers[key] = SQLiteConnectionManager(db_path)
+        return manager
+
+
+def close_all_connections():
+    """关闭所有 SQLite 连接"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        manager.close_all()
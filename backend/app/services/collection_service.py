@@ -9,6 +9,7 @@ from typing import Any, Dict, List, Optional
 from datetime import datetime
 
 from spiders import get_spider, list_spiders, OpenAISpider, AnthropicSpider, LambdaLabsSpider
+from spiders.runner import SpiderRunner, SpiderJob, STATUS_UNCHANGED, STATUS_TIMEOUT, STATUS_ERROR
 from app.core.config_loader import ConfigLoader
 
 logger = logging.getLogger(__name__)
@@ -24,14 +25,16 @@ class CollectionService:
     3. 计算派生指标
     """
     
-    def __init__(self, repository=None):
+    def __init__(self, repository=None, runner: Optional[SpiderRunner] = None):
         """
         初始化采集服务
         
         Args:
             repository: 数据仓库实例 (可选)
+            runner: 并发爬虫执行器 (可选，默认使用默认并发/截止时间配置)
         """
         self.repository = repository
+        self.runner = runner or SpiderRunner()
         
     async def collect_sector(self, sector_id: str) -> Dict[str, Any]:
         """
@@ -47,6 +50,7 @@ class CollectionService:
             "started_at": datetime.utcnow().isoformat(),
             "providers": [],
             "total_records": 0,
+            "unchanged_providers": [],
             "errors": [],
         }
         
@@ -58,6 +62,8 @@ class CollectionService:
         
         providers = sector_config.get("providers", [])
         
+        # 构建爬虫任务
+        jobs = []
         for provider in providers:
             if not provider.get("enabled", True):
                 continue
@@ -65,28 +71,46 @@ class CollectionService:
             provider_id = provider.get("id")
             spider_class_name = provider.get("spider_class", "").lower()
             
+            spider = self._get_spider_for_provider(spider_class_name, provider)
+            if not spider:
+                logger.warning(f"未找到爬虫: {spider_class_name}")
+                continue
+            
+            jobs.append(SpiderJob(provider_id, spider, url=provider.get("pricing_url")))
+        
+        # 并发运行爬虫 (单个厂商超时不阻塞整个板块)
+        run_results = await self.runner.run(jobs)
+        
+        for provider_id, run_result in run_results.items():
+            records = run_result.records
+            if run_result.error:
+                error_msg = f"{provider_id}: {run_result.error}"
+                results["errors"].append(error_msg)
+                logger.error(f"[采集] 失败 - {error_msg}")
+            
             try:
-                # 获取爬虫实例
-                spider = self._get_spider_for_provider(spider_class_name, provider)
-                if not spider:
-                    logger.warning(f"未找到爬虫: {spider_class_name}")
-                    continue
+                unchanged = run_result.status == STATUS_UNCHANGED
                 
-                # 运行爬虫
-                url = provider.get("pricing_url")
-                records = await spider.run(url)
-                
-                # 转换为标准格式并存储
+                # 转换为标准格式并存储 (页面未变化时跳过，下游信号检测同样跳过；
+                # 失败/超时时的记录是后备数据，不作为采集结果存储)
                 stored_count = 0
-                for record in records:
-                    formatted = self._format_record(sector_id, provider_id, record)
-                    
-                    if self.repository:
-                        await self.repository.save_metric(**formatted)
-                        stored_count += 1
+                if unchanged:
+                    results["unchanged_providers"].append(provider_id)
+                    logger.info(f"[采集] {provider_id} 页面未变化，跳过存储")
+                elif run_result.status in (STATUS_TIMEOUT, STATUS_ERROR):
+                    logger.info(f"[采集] {provider_id} {run_result.status}，后备数据不存储")
+                else:
+                    for record in records:
+                        formatted = self._format_record(sector_id, provider_id, record)
+                        
+                        if self.repository:
+                            await self.repository.save_metric(**formatted)
+                            stored_count += 1
                 
                 results["providers"].append({
                     "provider_id": provider_id,
+                    "status": run_result.status,
+                    "elapsed": round(run_result.elapsed, 3),
                     "records_collected": len(records),
                     "records_stored": stored_count,
                 })
@@ -97,7 +121,7 @@ class CollectionService:
             except Exception as e:
                 error_msg = f"{provider_id}: {str(e)}"
                 results["errors"].append(error_msg)
-                logger.error(f"[采集] 失败 - {error_msg}")
+                logger.error(f"[采集] 存储失败 - {error_msg}")
         
         results["completed_at"] = datetime.utcnow().isoformat()
         return results
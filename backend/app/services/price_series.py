@@ -0,0 +1,184 @@
+"""
+GPU 价格时间序列
+基于列式快照存储的块索引按时间范围选块，只读取范围内的块；
+块写入后不再变化，每块的 "GPU 类型 x 服务商 最低价" 摘要计算一次后缓存。
+早于存储中最早块的时间段 (尚未回填或只回填了一部分) 按文件名日期筛选 prices_*.json 补齐
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from collectors.snapshot_store import SnapshotStore, get_snapshot_store
+
+logger = logging.getLogger(__name__)
+
+# 缓存的块摘要数量上限 (每天数个快照，足够覆盖数年)
+MAX_CACHED_BLOCKS = 4096
+
+# 摘要: {GPU 类型: {服务商: 每 GPU 小时最低价}}
+PriceSummary = Dict[str, Dict[str, float]]
+
+
+def per_gpu_hourly_price(record: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+    """
+    从一条价格记录取 (GPU 类型, 每 GPU 小时价格)
+
+    兼容两种记录格式:
+    - Lambda Labs: price + specs.gpu_type/gpus
+    - 云厂商: hourly_rate + gpu_type/gpu_count (整机价格)
+    """
+    specs = record.get("specs") or {}
+    gpu_type = (specs.get("gpu_type") or record.get("gpu_type") or "").upper()
+    price = record.get("price", record.get("hourly_rate"))
+    if not gpu_type or not isinstance(price, (int, float)) or price <= 0:
+        return gpu_type, None
+    if record.get("unit", "per_hour") != "per_hour":
+        return gpu_type, None
+    gpus = specs.get("gpus") or record.get("gpu_count") or 1
+    return gpu_type, price / gpus
+
+
+def summarise_prices(rows: List[Dict[str, Any]]) -> PriceSummary:
+    """快照行 (带 provider 字段) -> 各 GPU 类型、各服务商最低价"""
+    summary: PriceSummary = {}
+    for row in rows:
+        gpu_type, price = per_gpu_hourly_price(row)
+        if price is None:
+            continue
+        by_provider = summary.setdefault(gpu_type, {})
+        provider = row.get("provider", "")
+        if provider not in by_provider or price < by_provider[provider]:
+            by_provider[provider] = round(price, 4)
+    return summary
+
+
+def _point(timestamp: str, summary: PriceSummary, gpu_type: str) -> Optional[Dict[str, Any]]:
+    """合并所有匹配 gpu_type 的类型 (如 H100 匹配 "H100 SXM")，得到一个时间点"""
+    wanted = gpu_type.upper()
+    by_provider: Dict[str, float] = {}
+    for item_gpu, prices in summary.items():
+        if wanted not in item_gpu:
+            continue
+        for provider, price in prices.items():
+            if provider not in by_provider or price < by_provider[provider]:
+                by_provider[provider] = price
+    if not by_provider:
+        return None
+    best_provider = min(by_provider, key=by_provider.get)
+    return {
+        "timestamp": timestamp,
+        "lowest_price": by_provider[best_provider],
+        "provider": best_provider,
+        "by_provider": by_provider,
+    }
+
+
+class GPUPriceSeries:
+    """
+    GPU 价格时间序列查询
+
+    用法:
+        series = GPUPriceSeries(DATA_DIR)
+        points = series.query("H100", start=datetime(2026, 1, 1), end=None)
+    """
+
+    def __init__(self, data_dir: Path, store: Optional[SnapshotStore] = None):
+        self.data_dir = Path(data_dir)
+        self._store = store
+        self._summaries: "OrderedDict[Tuple[str, str, int], PriceSummary]" = OrderedDict()
+
+    @property
+    def store(self) -> SnapshotStore:
+        return self._store or get_snapshot_store("gpu_prices")
+
+    def _store_summaries(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> List[Tuple[int, PriceSummary]]:
+        """范围内各块的摘要 (只读取未缓存的块)"""
+        store = self.store
+        refs = store.blocks(start, end)
+
+        def cache_key(ref) -> Tuple[str, str, int]:
+            return (str(store.root), ref.segment, ref.offset)
+
+        missing = [ref for ref in refs if cache_key(ref) not in self._summaries]
+        for ref, rows, _ in store.iter_blocks(missing):
+            self._summaries[cache_key(ref)] = summarise_prices(rows)
+        if missing:
+            logger.debug(f"[price_series] 读取 {len(missing)}/{len(refs)} 个块")
+
+        result = []
+        for ref in refs:
+            key = cache_key(ref)
+            self._summaries.move_to_end(key)
+            result.append((ref.ts, self._summaries[key]))
+        while len(self._summaries) > MAX_CACHED_BLOCKS:
+            self._summaries.popitem(last=False)
+        return result
+
+    def _json_summaries(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> List[Tuple[int, PriceSummary]]:
+        """从 prices_YYYY-MM-DD.json 读取 (按文件名日期跳过范围外的文件)"""
+        result = []
+        for path in sorted((self.data_dir / "gpu_prices").glob("prices_*.json")):
+            day = path.stem[len("prices_"):]
+            if start and day < start.date().isoformat():
+                continue
+            if end and day > end.date().isoformat():
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                timestamp = datetime.fromisoformat(snapshot["timestamp"])
+            except Exception as e:
+                logger.warning(f"[price_series] 跳过 {path}: {e}")
+                continue
+            if (start and timestamp < start) or (end and timestamp > end):
+                continue
+            rows = [
+                {"provider": provider, **record}
+                for provider, records in snapshot.get("providers", {}).items()
+                for record in records
+            ]
+            result.append((int(timestamp.timestamp()), summarise_prices(rows)))
+        return result
+
+    def query(
+        self,
+        gpu_type: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        provider: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        时间范围内 gpu_type 的最低价序列 (按时间升序)
+        
+        快照存储最早的块之前的部分 (未回填或只回填了一部分) 由 JSON 快照补齐
+        """
+        blocks = self.store.blocks()
+        if not blocks:
+            summaries = self._json_summaries(start, end)
+        else:
+            summaries = self._store_summaries(start, end)
+            first_ts = min(ref.ts for ref in blocks)
+            first_time = datetime.fromtimestamp(first_ts)
+            if start is None or start < first_time:
+                json_end = min(end, first_time) if end else first_time
+                summaries += [item for item in self._json_summaries(start, json_end) if item[0] < first_ts]
+
+        points = []
+        for ts, summary in sorted(summaries, key=lambda item: item[0]):
+            if provider:
+                summary = {
+                    gpu: {provider: prices[provider]}
+                    for gpu, prices in summary.items() if provider in prices
+                }
+            point = _point(datetime.fromtimestamp(ts).isoformat(), summary, gpu_type)
+            if point:
+                points.append(point)
+        return points
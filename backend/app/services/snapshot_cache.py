@@ -0,0 +1,151 @@
+"""
+采集快照缓存
+按 (子目录, 前缀) 缓存最新 JSON 快照的解析结果，以及由快照派生的视图 (如 key_gpus)。
+
+失效判断 (每次请求只做几次 stat):
+- 目录中有 latest 指针文件时 (采集器写入)，比较指针和它指向的文件的 mtime/大小
+- 否则比较目录 mtime (新增文件) 和当前最新文件的 mtime/大小 (原地覆盖)，
+  只有目录 mtime 变化时才重新 glob
+- 不导出 JSON (SNAPSHOT_JSON_EXPORT=0) 或目录中没有 JSON 时，从快照存储读取最新快照，
+  比较存储索引的 mtime/大小
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from collectors.snapshot_store import get_snapshot_store, json_export_enabled, latest_pointer_path
+
+logger = logging.getLogger(__name__)
+
+# 从快照存储读取最新快照的函数 (按子目录，子目录名即数据集名)
+StoreLoader = Callable[[], Optional[Dict[str, Any]]]
+
+
+@dataclass
+class SnapshotEntry:
+    """缓存项: 解析后的快照及其派生视图"""
+    path: Path
+    signature: Tuple
+    data: Dict[str, Any]
+    views: Dict[str, Any] = field(default_factory=dict)
+
+    def view(self, name: str, builder: Callable[[Dict[str, Any]], Any]) -> Any:
+        """由快照派生的视图，每个快照只计算一次"""
+        if name not in self.views:
+            self.views[name] = builder(self.data)
+        return self.views[name]
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class SnapshotCache:
+    """
+    最新快照缓存
+
+    用法:
+        cache = SnapshotCache(DATA_DIR, {"gpu_prices": GPUPriceCollector.load_latest_snapshot})
+        entry = cache.entry("gpu_prices", "prices_")
+        summary = entry.view("key_gpus", build_gpu_summary)
+    """
+
+    def __init__(self, data_dir: Path, store_loaders: Optional[Dict[str, StoreLoader]] = None):
+        self.data_dir = Path(data_dir)
+        self.store_loaders = store_loaders or {}
+        self._entries: Dict[Tuple[str, str], SnapshotEntry] = {}
+        # (子目录, 前缀) -> (目录 mtime, 最新文件)，目录未变化时跳过 glob
+        self._listings: Dict[Tuple[str, str], Tuple[int, Optional[Path]]] = {}
+        self._lock = threading.Lock()
+
+    def _locate(self, subdir: str, prefix: str) -> Tuple[Optional[Path], Tuple]:
+        """找到最新快照，返回 (路径, 签名)；来自快照存储时路径为存储目录"""
+        path, signature = self._locate_json(subdir, prefix) if json_export_enabled() else (None, ())
+        if path is None and subdir in self.store_loaders:
+            store = get_snapshot_store(subdir)
+            store_sig = store.signature()
+            if store_sig is not None:
+                return store.root, ("store", store_sig)
+        return path, signature
+
+    def _locate_json(self, subdir: str, prefix: str) -> Tuple[Optional[Path], Tuple]:
+        """找到最新 JSON 快照文件，返回 (路径, 签名)"""
+        data_path = self.data_dir / subdir
+
+        pointer = latest_pointer_path(data_path, prefix)
+        pointer_sig = _file_signature(pointer)
+        if pointer_sig is not None:
+            try:
+                target = data_path / pointer.read_text(encoding="utf-8").strip()
+            except OSError:
+                target = None
+            if target is not None:
+                target_sig = _file_signature(target)
+                if target_sig is not None:
+                    return target, ("pointer", pointer_sig, target_sig)
+
+        try:
+            dir_mtime = data_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None, ()
+
+        key = (subdir, prefix)
+        listing = self._listings.get(key)
+        if listing is None or listing[0] != dir_mtime:
+            json_files = sorted(data_path.glob(f"{prefix}*.json"), reverse=True)
+            listing = (dir_mtime, json_files[0] if json_files else None)
+            self._listings[key] = listing
+
+        latest = listing[1]
+        if latest is None:
+            return None, ()
+        return latest, ("dir", dir_mtime, _file_signature(latest))
+
+    def entry(self, subdir: str, prefix: str) -> Optional[SnapshotEntry]:
+        """获取最新快照的缓存项 (快照变化时重新解析)"""
+        key = (subdir, prefix)
+        path, signature = self._locate(subdir, prefix)
+        if path is None:
+            return None
+
+        cached = self._entries.get(key)
+        if cached is not None and cached.path == path and cached.signature == signature:
+            return cached
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached.path == path and cached.signature == signature:
+                return cached
+            try:
+                if signature[0] == "store":
+                    data = self.store_loaders[subdir]()
+                else:
+                    with open(path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+            except Exception as e:
+                logger.error(f"加载 {path} 失败: {e}")
+                return None
+            if data is None:
+                return None
+            entry = SnapshotEntry(path=path, signature=signature, data=data)
+            self._entries[key] = entry
+            logger.debug(f"[snapshot_cache] 已加载 {path}")
+            return entry
+
+    def load(self, subdir: str, prefix: str) -> Optional[Dict[str, Any]]:
+        """最新快照 (只读，调用方不要修改)"""
+        entry = self.entry(subdir, prefix)
+        return entry.data if entry else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._listings.clear()
@@ -4,13 +4,15 @@ CapEx 资本密集度数据采集器
 """
 
 import asyncio
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
-import httpx
+
+from collectors.sec_client import get_sec_client
+from collectors.sec_sync import get_sec_sync
+from collectors.snapshot_store import SnapshotStore, get_snapshot_store, write_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -76,31 +78,36 @@ class CapExCollector:
     # SEC Edgar API
     SEC_EDGAR_BASE = "https://data.sec.gov"
     
-    def __init__(self, timeout: int = 15, retries: int = 3):
-        self.timeout = timeout
-        self.retries = retries
-        self.headers = {
-            "User-Agent": "InfraWatch/1.0 (research@example.com)",
-            "Accept": "application/json",
-        }
+    # 常见 CapEx 字段 (按优先级)
+    CAPEX_KEYS = [
+        "PaymentsToAcquirePropertyPlantAndEquipment",
+        "CapitalExpendituresIncurredButNotYetPaid",
+    ]
+    
+    # 常见 Revenue 字段 (按优先级)
+    REVENUE_KEYS = [
+        "Revenues",
+        "RevenueFromContractWithCustomerExcludingAssessedTax",
+        "SalesRevenueNet",
+    ]
+    
+    # 增量同步: 出现新的 10-Q/10-K 才重新下载 companyfacts
+    SYNC_STREAM = "capex"
+    SYNC_FORMS = ("10-Q", "10-K")
     
-    async def _fetch_json(self, url: str) -> Optional[Dict]:
-        """HTTP GET JSON with retry"""
-        for attempt in range(self.retries):
-            try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    resp = await client.get(url, headers=self.headers)
-                    resp.raise_for_status()
-                    return resp.json()
-            except Exception as e:
-                logger.warning(f"Fetch failed ({attempt+1}/{self.retries}): {url} - {e}")
-                await asyncio.sleep(1 * (attempt + 1))
-        return None
+    def __init__(self, full_refresh: bool = False):
+        self.full_refresh = full_refresh
+        # SEC 请求经共享客户端 (统一 User-Agent、全局请求预算、并发上限)
+        self.sec = get_sec_client()
     
     async def fetch_company_facts(self, cik: str) -> Optional[Dict]:
-        """从SEC获取公司XBRL财务数据"""
-        url = f"{self.SEC_EDGAR_BASE}/api/xbrl/companyfacts/CIK{cik}.json"
-        return await self._fetch_json(url)
+        """
+        从SEC获取公司XBRL财务数据
+        
+        边下载边增量解析，只保留 CAPEX_KEYS / REVENUE_KEYS 的 USD 数据点，
+        不在内存中物化完整的 companyfacts 文档
+        """
+        return await self.sec.company_facts(cik, self.CAPEX_KEYS + self.REVENUE_KEYS)
     
     def extract_capex_from_facts(self, facts: Dict, company: str) -> List[CapExDataPoint]:
         """从 XBRL facts 提取 CapEx 数据"""
@@ -108,21 +115,9 @@ class CapExCollector:
         
         us_gaap = facts.get("facts", {}).get("us-gaap", {})
         
-        # 常见 CapEx 字段
-        capex_keys = [
-            "PaymentsToAcquirePropertyPlantAndEquipment",
-            "CapitalExpendituresIncurredButNotYetPaid",
-        ]
-        
-        revenue_keys = [
-            "Revenues",
-            "RevenueFromContractWithCustomerExcludingAssessedTax",
-            "SalesRevenueNet",
-        ]
-        
         # 查找 CapEx
         capex_data = {}
-        for key in capex_keys:
+        for key in self.CAPEX_KEYS:
             if key in us_gaap:
                 units = us_gaap[key].get("units", {})
                 usd = units.get("USD", [])
@@ -135,7 +130,7 @@ class CapExCollector:
         
         # 查找 Revenue
         revenue_data = {}
-        for key in revenue_keys:
+        for key in self.REVENUE_KEYS:
             if key in us_gaap:
                 units = us_gaap[key].get("units", {})
                 usd = units.get("USD", [])
@@ -172,7 +167,14 @@ class CapExCollector:
         if not cik:
             return []
         
-        logger.info(f"[{company}] 正在采集 SEC 数据...")
+        # 先查 submissions 索引，没有新财报时复用上次结果
+        sync = get_sec_sync()
+        check = await sync.check(self.SYNC_STREAM, cik, self.SYNC_FORMS, force=self.full_refresh)
+        if not check.changed:
+            logger.info(f"[{company}] 无新 10-Q/10-K (最新 {check.latest.get('accession') if check.latest else '-'})，复用上次数据")
+            return [CapExDataPoint(**dp) for dp in check.cached_payload]
+        
+        logger.info(f"[{company}] 正在采集 SEC 数据 (新文件 {len(check.new_filings)} 份)...")
         
         facts = await self.fetch_company_facts(cik)
         if not facts:
@@ -182,19 +184,26 @@ class CapExCollector:
         data_points = self.extract_capex_from_facts(facts, company)
         logger.info(f"[{company}] 提取到 {len(data_points)} 个季度数据")
         
+        sync.commit(check, [asdict(dp) for dp in data_points])
         return data_points
     
     async def collect_all(self) -> Dict[str, Any]:
         """采集所有公司"""
         logger.info("开始 CapEx 资本密集度采集...")
         
-        all_data = {}
+        # 公司之间并发采集，请求速率由 SEC 客户端的全局预算控制
+        companies = list(self.COMPANIES.items())
+        results = await asyncio.gather(
+            *(self.collect_company(company, info) for company, info in companies),
+            return_exceptions=True,
+        )
         
-        for company, info in self.COMPANIES.items():
-            data_points = await self.collect_company(company, info)
+        all_data = {}
+        for (company, _), data_points in zip(companies, results):
+            if isinstance(data_points, Exception):
+                logger.error(f"[{company}] 采集失败: {data_points}")
+                data_points = []
             all_data[company] = [asdict(dp) for dp in data_points]
-            # 避免请求过快
-            await asyncio.sleep(0.5)
         
         result = {
             "timestamp": datetime.now().isoformat(),
@@ -229,11 +238,41 @@ class CapExCollector:
         timestamp = datetime.now().strftime("%Y-%m-%d")
         filename = DATA_DIR / f"capex_{timestamp}.json"
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        rows, meta = self.snapshot_to_rows(result)
+        saved = write_snapshot("capex", result, rows, meta, filename)
         
-        logger.info(f"采集结果已保存: {filename}")
-        return str(filename)
+        logger.info(f"采集结果已保存: {saved}")
+        return saved
+    
+    @staticmethod
+    def snapshot_to_rows(result: Dict[str, Any]) -> Tuple[List[Dict], Dict[str, Any]]:
+        """采集结果 -> 列式存储的行 (每个公司季度一行) 和元数据"""
+        rows = [
+            {**data_point, "company": company}
+            for company, data_points in result.get("companies", {}).items()
+            for data_point in data_points
+        ]
+        meta = {k: v for k, v in result.items() if k != "companies"}
+        meta["company_order"] = list(result.get("companies", {}).keys())
+        return rows, meta
+    
+    @staticmethod
+    def snapshot_from_rows(rows: List[Dict], meta: Dict[str, Any]) -> Dict[str, Any]:
+        """列式存储的行和元数据 -> 采集结果"""
+        meta = dict(meta)
+        companies: Dict[str, List[Dict]] = {c: [] for c in meta.pop("company_order", [])}
+        for row in rows:
+            companies.setdefault(row["company"], []).append(row)
+        return {"timestamp": meta.get("timestamp"), "companies": companies, **meta}
+    
+    @classmethod
+    def load_latest_snapshot(cls, store: Optional[SnapshotStore] = None) -> Optional[Dict[str, Any]]:
+        """从快照存储读取最新采集结果"""
+        latest = (store or get_snapshot_store("capex")).latest()
+        if latest is None:
+            return None
+        _, rows, meta = latest
+        return cls.snapshot_from_rows(rows, meta)
 
 
 async def main():
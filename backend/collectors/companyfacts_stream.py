@@ -0,0 +1,109 @@
+"""
+SEC companyfacts 流式提取
+companyfacts 文档每家公司数 MB 到数十 MB，而 CapEx 采集只用到少数 us-gaap 概念；
+边下载边增量解析 JSON，只物化目标概念的 USD 数据点，其余内容直接丢弃
+"""
+
+import json
+import logging
+from typing import Any, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+# ijson 为可选依赖，缺失时退回整体解析
+try:
+    import ijson
+    from ijson.common import ObjectBuilder
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
+
+class CompanyFactsExtractor:
+    """
+    companyfacts 增量提取器
+
+    用法:
+        extractor = CompanyFactsExtractor(["Revenues", ...])
+        async for chunk in response.aiter_bytes():
+            extractor.feed(chunk)
+        facts = extractor.close()
+
+    返回结构与原始文档的子集一致:
+        {"facts": {"us-gaap": {concept: {"units": {"USD": [...]}}}}}
+    因此可直接交给 CapExCollector.extract_capex_from_facts
+    """
+
+    def __init__(self, concepts: Iterable[str], taxonomy: str = "us-gaap", unit: str = "USD"):
+        self.concepts = list(concepts)
+        self.taxonomy = taxonomy
+        self.unit = unit
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.bytes_read = 0
+
+        if IJSON_AVAILABLE:
+            # ijson 前缀以 "." 分隔，数组元素为 "item"
+            self._prefixes = {
+                f"facts.{taxonomy}.{concept}.units.{unit}.item": concept
+                for concept in self.concepts
+            }
+            self._events = ijson.sendable_list()
+            self._parser = ijson.parse_coro(self._events, use_float=True)
+            self._builder = None
+            self._builder_concept = None
+            self._depth = 0
+        else:
+            self._chunks: List[bytes] = []
+
+    def feed(self, chunk: bytes):
+        """送入一块响应数据"""
+        self.bytes_read += len(chunk)
+        if not IJSON_AVAILABLE:
+            self._chunks.append(chunk)
+            return
+        self._parser.send(chunk)
+        self._drain()
+
+    def close(self) -> Dict[str, Any]:
+        """结束解析，返回精简后的 facts 文档"""
+        if IJSON_AVAILABLE:
+            self._parser.close()
+            self._drain()
+        else:
+            self._extract_from_document(json.loads(b"".join(self._chunks)))
+            self._chunks = []
+        return {
+            "facts": {
+                self.taxonomy: {
+                    concept: {"units": {self.unit: entries}}
+                    for concept, entries in self.entries.items()
+                }
+            }
+        }
+
+    def _drain(self):
+        """处理已解析出的事件，只为目标前缀构建对象"""
+        for prefix, event, value in self._events:
+            if self._builder is not None:
+                self._builder.event(event, value)
+                if event in ("start_map", "start_array"):
+                    self._depth += 1
+                elif event in ("end_map", "end_array"):
+                    self._depth -= 1
+                    if self._depth == 0:
+                        self.entries.setdefault(self._builder_concept, []).append(self._builder.value)
+                        self._builder = None
+            elif event == "start_map" and prefix in self._prefixes:
+                self._builder = ObjectBuilder()
+                self._builder.event(event, value)
+                self._builder_concept = self._prefixes[prefix]
+                self._depth = 1
+        del self._events[:]
+
+    def _extract_from_document(self, document: Dict[str, Any]):
+        """整体解析回退路径"""
+        taxonomy_facts = document.get("facts", {}).get(self.taxonomy, {})
+        for concept in self.concepts:
+            if concept in taxonomy_facts:
+                entries = taxonomy_facts[concept].get("units", {}).get(self.unit, [])
+                self.entries[concept] = entries
@@ -8,13 +8,15 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
 # 导入现有爬虫
 from spiders.lambda_labs_spider import LambdaLabsSpider
 from spiders.aws_spider import AWSSpider
 from spiders.azure_spider import AzureSpider
 from spiders.gcp_spider import GCPSpider
+from spiders.runner import SpiderRunner, SpiderJob, STATUS_OK, STATUS_UNCHANGED
+from collectors.snapshot_store import SnapshotStore, get_snapshot_store, write_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,9 @@ logger = logging.getLogger(__name__)
 DATA_DIR = Path(__file__).parent.parent / "data" / "gpu_prices"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# 单个服务商的采集时间预算 (秒)，超时即取消并使用后备数据，不拖慢其他服务商
+DEFAULT_PROVIDER_BUDGET = 20
+
 
 class GPUPriceCollector:
     """
@@ -40,6 +45,16 @@ class GPUPriceCollector:
         "gcp": GCPSpider,
     }
     
+    # 各服务商时间预算 (秒)。均为普通 HTTP 请求: 单次超时 10s，失败重试前退避 1~3s。
+    # Lambda 是小 JSON 接口，15s 容得下一次超时后重试；云厂商定价页是数 MB 的 HTML，
+    # 30s 容得下两次超时加退避
+    PROVIDER_BUDGETS = {
+        "lambda_labs": 15,
+        "aws": 30,
+        "azure": 30,
+        "gcp": 30,
+    }
+    
     # H100 SKU 标准化映射
     H100_SKU_PATTERNS = {
         "h100_sxm": ["h100_sxm", "h100-sxm", "gpu_1x_h100", "p5.48xlarge"],
@@ -48,19 +63,40 @@ class GPUPriceCollector:
         "a100_80gb": ["a100_80gb", "a100-80gb", "gpu_1x_a100_sxm4_80gb"],
     }
     
+    def __init__(self, runner: Optional[SpiderRunner] = None):
+        self.runner = runner or SpiderRunner()
+        # 最近一次采集各服务商的状态、耗时和记录数
+        self.provider_status: Dict[str, Dict[str, Any]] = {}
+    
     async def collect_all(self) -> Dict[str, List[Dict]]:
-        """从所有服务商采集价格"""
-        results = {}
+        """
+        从所有服务商并发采集价格
         
-        for provider_name, spider_class in self.PROVIDERS.items():
-            try:
-                spider = spider_class()
-                prices = await spider.run()
-                results[provider_name] = prices
-                logger.info(f"[{provider_name}] 采集到 {len(prices)} 条价格")
-            except Exception as e:
-                logger.error(f"[{provider_name}] 采集失败: {e}")
-                results[provider_name] = []
+        每个服务商有独立的时间预算，超时/失败的服务商使用后备数据，
+        其余服务商的结果照常返回；逐个状态记录在 provider_status
+        """
+        jobs = [
+            SpiderJob(
+                provider_name,
+                spider_class(),
+                deadline=self.PROVIDER_BUDGETS.get(provider_name, DEFAULT_PROVIDER_BUDGET),
+            )
+            for provider_name, spider_class in self.PROVIDERS.items()
+        ]
+        run_results = await self.runner.run(jobs)
+        
+        results = {}
+        self.provider_status = {}
+        for provider_name, run_result in run_results.items():
+            results[provider_name] = run_result.records
+            status = run_result.to_dict()
+            status.pop("provider")
+            status["budget"] = self.PROVIDER_BUDGETS.get(provider_name, DEFAULT_PROVIDER_BUDGET)
+            self.provider_status[provider_name] = status
+            if run_result.error:
+                logger.error(f"[{provider_name}] 采集失败: {run_result.error}")
+            else:
+                logger.info(f"[{provider_name}] 采集到 {len(run_result.records)} 条价格 ({run_result.elapsed:.2f}s)")
         
         return results
     
@@ -90,22 +126,55 @@ class GPUPriceCollector:
         
         return gpu_prices
     
-    def save_snapshot(self, provider_prices: Dict[str, List[Dict]]) -> str:
-        """保存价格快照"""
+    def save_snapshot(
+        self,
+        provider_prices: Dict[str, List[Dict]],
+        provider_status: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> str:
+        """
+        保存价格快照
+        
+        部分服务商超时/失败时同样保存 (partial 为 True)，provider_status 记录逐个状态和耗时
+        """
         timestamp = datetime.now().strftime("%Y-%m-%d")
         filename = DATA_DIR / f"prices_{timestamp}.json"
+        provider_status = provider_status if provider_status is not None else self.provider_status
         
         snapshot = {
             "timestamp": datetime.now().isoformat(),
             "providers": provider_prices,
+            "provider_status": provider_status,
+            "partial": any(
+                s.get("status") not in (STATUS_OK, STATUS_UNCHANGED) for s in provider_status.values()
+            ),
             "aggregated": self.aggregate_h100_prices(provider_prices),
         }
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(snapshot, f, indent=2, ensure_ascii=False)
+        rows, meta = self.snapshot_to_rows(snapshot)
+        saved = write_snapshot("gpu_prices", snapshot, rows, meta, filename)
         
-        logger.info(f"价格快照已保存: {filename}")
-        return str(filename)
+        logger.info(f"价格快照已保存: {saved}")
+        return saved
+    
+    @staticmethod
+    def snapshot_to_rows(snapshot: Dict[str, Any]) -> Tuple[List[Dict], Dict[str, Any]]:
+        """快照 -> 列式存储的行 (每条价格一行，带 provider) 和元数据"""
+        rows = [
+            {"provider": provider, **record}
+            for provider, records in snapshot.get("providers", {}).items()
+            for record in records
+        ]
+        meta = {k: v for k, v in snapshot.items() if k != "providers"}
+        return rows, meta
+    
+    @staticmethod
+    def snapshot_from_rows(rows: List[Dict], meta: Dict[str, Any]) -> Dict[str, Any]:
+        """列式存储的行和元数据 -> 快照"""
+        providers: Dict[str, List[Dict]] = {}
+        for row in rows:
+            record = dict(row)
+            providers.setdefault(record.pop("provider"), []).append(record)
+        return {"timestamp": meta.get("timestamp"), "providers": providers, **meta}
     
     def get_current_quarter(self) -> str:
         """获取当前季度标识"""
@@ -130,8 +199,18 @@ class GPUPriceCollector:
             "quarter": self.get_current_quarter(),
             "snapshot_file": snapshot_file,
             "aggregated_prices": aggregated,
+            "provider_status": self.provider_status,
             "total_records": sum(len(p) for p in all_prices.values()),
         }
+    
+    @classmethod
+    def load_latest_snapshot(cls, store: Optional[SnapshotStore] = None) -> Optional[Dict[str, Any]]:
+        """从快照存储读取最新快照"""
+        latest = (store or get_snapshot_store("gpu_prices")).latest()
+        if latest is None:
+            return None
+        _, rows, meta = latest
+        return cls.snapshot_from_rows(rows, meta)
 
 
 async def main():
@@ -9,16 +9,38 @@ import logging
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
+
 import httpx
 
+from spiders.http_client import get_http_pool, ResponseTooLargeError
+from spiders.rate_limiter import backoff_delay, parse_retry_after
+from spiders.extraction import PricePattern, get_extraction_engine, register_patterns
+from spiders.response_cache import get_response_cache
+from collectors.sec_sync import get_sec_sync, recent_filings
+from collectors.rss_seen_store import get_seen_store, item_key
+from collectors.keyword_matcher import KeywordMatcher
+from collectors.snapshot_store import SnapshotStore, get_snapshot_store, json_export_enabled, write_snapshot
+
 logger = logging.getLogger(__name__)
 
 # 数据存储路径
 DATA_DIR = Path(__file__).parent.parent / "data" / "inference_coverage"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
+# 结果中保留的相关文章数 (新文章在前，与历史结果合并)
+MAX_RELEVANT_ARTICLES = 200
+
+# 快照存储中每隔多少块写一次完整的相关文章列表，其余块只存本次新增的文章
+FULL_ARTICLES_EVERY = 24
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
+# 文章摘要保留长度 (用于关键词匹配和展示)
+SUMMARY_MAX_CHARS = 1000
+_TAG_RE = re.compile(r"<[^>]+>")
+
 
 @dataclass
 class CoverageDataPoint:
@@ -53,6 +75,9 @@ class InferenceCoverageCollector:
         "amazon": ["AWS AI", "Amazon Bedrock", "AWS machine learning"],
     }
     
+    # 由 TARGET_COMPANIES 构建的关键词自动机 (模块加载时构建一次)
+    KEYWORD_MATCHER: Optional[KeywordMatcher] = None
+    
     # RSS源
     RSS_FEEDS = [
         # 公开RSS
@@ -69,37 +94,76 @@ class InferenceCoverageCollector:
         "amazon": "0001018724",
     }
     
-    def __init__(self, timeout: int = 10, retries: int = 3):
+    # 金额抽取模式
+    PATTERN_SET = "revenue_mentions"
+    AMOUNT_PATTERNS = [
+        PricePattern("amount", r"\$?([\d.]+)\s*(billion|B|million|M)", metric="amount", unit_group=2),
+    ]
+    
+    def __init__(self, timeout: int = 10, retries: int = 3, full_refresh: bool = False):
         self.timeout = timeout
         self.retries = retries
+        self.full_refresh = full_refresh
+        # 每个 feed 本次的获取状态: ok / not_modified / error
+        self.feed_stats: Dict[str, Dict[str, Any]] = {}
+        # 本次获取到的 feed 响应，结果保存成功后才写入条件请求缓存
+        self._pending_validators: Dict[str, httpx.Response] = {}
         self.headers = {
             "User-Agent": "InfraWatch/1.0 (research@infrawatch.io)",
             "Accept": "application/json, application/xml, text/xml",
         }
     
-    async def _fetch(self, url: str) -> Optional[str]:
-        """HTTP GET with retry"""
+    async def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+        """HTTP GET with retry (304 原样返回)"""
+        request_headers = {**self.headers, **(headers or {})}
         for attempt in range(self.retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    resp = await client.get(url, headers=self.headers)
-                    resp.raise_for_status()
-                    return resp.text
+                resp = await get_http_pool().get(url, headers=request_headers, timeout=self.timeout)
+                if resp.status_code == 304:
+                    return resp
+                resp.raise_for_status()
+                return resp
+            except ResponseTooLargeError as e:
+                logger.error(str(e))
+                return None
             except Exception as e:
                 logger.warning(f"Fetch failed ({attempt+1}/{self.retries}): {url} - {e}")
-                await asyncio.sleep(1 * (attempt + 1))
+                retry_after = None
+                if isinstance(e, httpx.HTTPStatusError):
+                    retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                if attempt < self.retries - 1:
+                    await asyncio.sleep(backoff_delay(attempt, retry_after))
         return None
     
     async def fetch_rss_feed(self, feed_url: str) -> List[Dict]:
-        """从RSS获取文章列表"""
-        content = await self._fetch(feed_url)
-        if not content:
+        """
+        获取RSS中的新文章
+        
+        以条件请求获取 feed (304 时不再解析)，并按 GUID/链接过滤掉已处理过的条目。
+        新的 ETag/Last-Modified 暂存，由 commit_feed_validators 在结果保存后写入缓存，
+        保存失败时下次不会收到 304 而漏掉未处理的条目
+        """
+        cache = get_response_cache()
+        cached = await cache.get(feed_url)
+        resp = await self._fetch(feed_url, headers=cached.validator_headers() if cached else None)
+        
+        if resp is None:
+            self.feed_stats[feed_url] = {"status": "error", "items": 0, "new": 0}
+            return []
+        if resp.status_code == 304:
+            self.feed_stats[feed_url] = {"status": "not_modified", "items": 0, "new": 0}
             return []
         
+        self._pending_validators[feed_url] = resp
+        items = self.parse_feed(resp.text, feed_url)
+        articles = get_seen_store().filter_new(feed_url, items)
+        self.feed_stats[feed_url] = {"status": "ok", "items": len(items), "new": len(articles)}
+        return articles
+    
+    def parse_feed(self, content: str, feed_url: str) -> List[Dict]:
+        """解析 RSS 2.0 / Atom 条目"""
         articles = []
         
-        # 简单解析 RSS XML
-        # 查找 <item> 或 <entry> 标签
         import xml.etree.ElementTree as ET
         try:
             root = ET.fromstring(content)
@@ -107,19 +171,29 @@ class InferenceCoverageCollector:
             items = root.findall(".//item")
             # Atom
             if not items:
-                items = root.findall(".//{http://www.w3.org/2005/Atom}entry")
+                items = root.findall(f".//{ATOM_NS}entry")
             
-            for item in items[:20]:  # 只取最新20条
-                title = item.findtext("title") or item.findtext("{http://www.w3.org/2005/Atom}title") or ""
+            for item in items:
+                title = item.findtext("title") or item.findtext(f"{ATOM_NS}title") or ""
                 link = item.findtext("link") or ""
                 if not link:
-                    link_elem = item.find("{http://www.w3.org/2005/Atom}link")
+                    link_elem = item.find(f"{ATOM_NS}link")
                     if link_elem is not None:
                         link = link_elem.get("href", "")
                 
+                summary = (
+                    item.findtext("description")
+                    or item.findtext(f"{ATOM_NS}summary")
+                    or item.findtext(f"{ATOM_NS}content")
+                    or ""
+                )
+                summary = " ".join(_TAG_RE.sub(" ", summary).split())[:SUMMARY_MAX_CHARS]
+                
                 articles.append({
                     "title": title,
                     "url": link,
+                    "guid": item.findtext("guid") or item.findtext(f"{ATOM_NS}id") or "",
+                    "summary": summary,
                     "source": feed_url,
                 })
         except Exception as e:
@@ -128,51 +202,63 @@ class InferenceCoverageCollector:
         return articles
     
     def filter_relevant_articles(self, articles: List[Dict]) -> List[Dict]:
-        """筛选与目标公司相关的文章"""
-        relevant = []
+        """
+        筛选与目标公司相关的文章
         
-        # 构建匹配关键词
-        all_keywords = []
-        for company, keywords in self.TARGET_COMPANIES.items():
-            all_keywords.extend([(kw, company) for kw in keywords])
+        标题和摘要各单次扫描，记录全部命中的公司及位置；
+        matched_company 取标题中最先出现的公司 (标题无命中时取摘要)
+        """
+        matcher = self.KEYWORD_MATCHER
+        relevant = []
         
         for article in articles:
-            title = article.get("title", "").lower()
-            for keyword, company in all_keywords:
-                if keyword.lower() in title:
-                    article["matched_company"] = company
-                    article["matched_keyword"] = keyword
-                    relevant.append(article)
-                    break
+            matches = []
+            for field in ("title", "summary"):
+                for m in sorted(matcher.scan(article.get(field) or ""), key=lambda m: m.start):
+                    matches.append({
+                        "field": field,
+                        "company": m.label,
+                        "keyword": m.keyword,
+                        "start": m.start,
+                        "end": m.end,
+                    })
+            
+            if matches:
+                article["matched_company"] = matches[0]["company"]
+                article["matched_keyword"] = matches[0]["keyword"]
+                article["matched_companies"] = list(dict.fromkeys(m["company"] for m in matches))
+                article["matches"] = matches
+                relevant.append(article)
         
         return relevant
     
     async def fetch_sec_filings(self, cik: str, form_type: str = "8-K") -> List[Dict]:
-        """从SEC Edgar获取公司文件"""
-        url = f"{self.SEC_EDGAR_BASE}/submissions/CIK{cik}.json"
+        """
+        从SEC Edgar获取公司文件
         
-        content = await self._fetch(url)
-        if not content:
-            return []
+        经增量同步层查询 submissions 索引: 没有游标之后的新文件时直接返回上次结果，
+        有新文件时重新生成列表，新文件标记 is_new
+        """
+        sync = get_sec_sync()
+        check = await sync.check(f"filings_{form_type}", cik, (form_type,), force=self.full_refresh)
+        if not check.changed:
+            return [{**f, "is_new": False} for f in check.cached_payload]
+        if check.submissions is None:
+            return check.cached_payload or []
         
         try:
-            data = json.loads(content)
-            filings = data.get("filings", {}).get("recent", {})
-            
-            forms = []
-            form_types = filings.get("form", [])
-            dates = filings.get("filingDate", [])
-            accessions = filings.get("accessionNumber", [])
-            
-            for i, ft in enumerate(form_types[:50]):
-                if form_type in ft:
-                    forms.append({
-                        "form_type": ft,
-                        "filing_date": dates[i] if i < len(dates) else "",
-                        "accession": accessions[i] if i < len(accessions) else "",
-                        "company": data.get("name", ""),
-                    })
-            
+            new_accessions = {f["accession"] for f in check.new_filings}
+            forms = [
+                {
+                    "form_type": f["form_type"],
+                    "filing_date": f["filing_date"],
+                    "accession": f["accession"],
+                    "company": f["company"],
+                    "is_new": f["accession"] in new_accessions,
+                }
+                for f in recent_filings(check.submissions, (form_type,), scan_limit=50)
+            ]
+            sync.commit(check, forms)
             return forms
         except Exception as e:
             logger.error(f"SEC解析失败: {e}")
@@ -180,18 +266,15 @@ class InferenceCoverageCollector:
     
     def extract_revenue_mentions(self, text: str, company: str) -> Optional[CoverageDataPoint]:
         """从文本中提取收入相关数据"""
-        # 正则匹配金额
+        # 匹配金额 (共享抽取引擎，模式只编译一次)
         # 例如: "$2 billion", "$2.5B", "2.5 billion dollars"
-        amount_pattern = r"\$?([\d.]+)\s*(billion|B|million|M)"
-        
-        matches = re.findall(amount_pattern, text, re.I)
-        if not matches:
-            return None
         
         # 简单提取第一个提到的金额
-        for amount, unit in matches:
-            value = float(amount)
-            if unit.lower() in ["million", "m"]:
+        for match in get_extraction_engine().scan(text, [self.PATTERN_SET]):
+            if match.value is None:
+                continue
+            value = match.value
+            if match.unit.lower() in ["million", "m"]:
                 value /= 1000  # 转换为billion
             
             return CoverageDataPoint(
@@ -209,47 +292,150 @@ class InferenceCoverageCollector:
         """执行全量采集"""
         logger.info("开始推理覆盖率数据采集...")
         
-        all_articles = []
-        
-        # 1. 采集RSS
-        for feed_url in self.RSS_FEEDS:
-            articles = await self.fetch_rss_feed(feed_url)
-            all_articles.extend(articles)
-            logger.info(f"[RSS] {feed_url}: {len(articles)} 篇")
+        # 1. 并发采集RSS (只返回未处理过的新条目)
+        self.feed_stats = {}
+        self._pending_validators = {}
+        feed_articles = await asyncio.gather(*(self.fetch_rss_feed(url) for url in self.RSS_FEEDS))
+        all_articles = [article for articles in feed_articles for article in articles]
+        for feed_url, stats in self.feed_stats.items():
+            logger.info(f"[RSS] {feed_url}: {stats['status']}, 新文章 {stats['new']} 篇")
         
-        # 2. 筛选相关文章
+        # 2. 只对新文章做关键词匹配
         relevant = self.filter_relevant_articles(all_articles)
-        logger.info(f"[筛选] 相关文章: {len(relevant)}")
+        logger.info(f"[筛选] 新的相关文章: {len(relevant)}")
         
         # 3. 采集SEC文件
+        # 公司之间并发，请求速率由 SEC 客户端的全局预算控制
+        sec_results = await asyncio.gather(*(self.fetch_sec_filings(cik) for cik in self.SEC_TICKERS.values()))
         sec_filings = {}
-        for company, cik in self.SEC_TICKERS.items():
-            filings = await self.fetch_sec_filings(cik)
+        for company, filings in zip(self.SEC_TICKERS, sec_results):
             sec_filings[company] = filings
-            logger.info(f"[SEC] {company}: {len(filings)} 份8-K")
+            new_count = sum(1 for f in filings if f.get("is_new"))
+            logger.info(f"[SEC] {company}: {len(filings)} 份8-K (新增 {new_count})")
         
         result = {
             "timestamp": datetime.now().isoformat(),
             "rss_articles": len(all_articles),
-            "relevant_articles": relevant,
+            "rss_feeds": self.feed_stats,
+            "new_relevant_articles": len(relevant),
+            "relevant_articles": self.merge_relevant_articles(relevant),
             "sec_filings": sec_filings,
         }
         
-        # 保存结果
+        # 保存结果，成功后再记录已处理条目 (保存失败时下次重新处理)
         self.save_result(result)
+        seen_store = get_seen_store()
+        for feed_url, articles in zip(self.RSS_FEEDS, feed_articles):
+            if articles:
+                seen_store.mark_seen(feed_url, [item_key(a) for a in articles])
+        await self.commit_feed_validators()
         
         return result
     
+    async def commit_feed_validators(self):
+        """条目处理完成后写入各 feed 的 ETag/Last-Modified"""
+        cache = get_response_cache()
+        for feed_url, resp in self._pending_validators.items():
+            await cache.store(feed_url, resp)
+        self._pending_validators = {}
+    
+    def merge_relevant_articles(self, new_articles: List[Dict]) -> List[Dict]:
+        """新相关文章在前，与上次结果中的相关文章合并去重"""
+        previous = (self.load_previous_result() or {}).get("relevant_articles", [])
+        
+        merged = []
+        keys = set()
+        for article in new_articles + previous:
+            key = item_key(article)
+            if key in keys:
+                continue
+            keys.add(key)
+            merged.append(article)
+        return merged[:MAX_RELEVANT_ARTICLES]
+    
+    def load_previous_result(self) -> Optional[Dict]:
+        """上次采集结果: 导出 JSON 时读最新的 coverage_*.json，否则 (或没有 JSON 时) 读快照存储"""
+        files = sorted(DATA_DIR.glob("coverage_*.json")) if json_export_enabled() else []
+        try:
+            if files:
+                with open(files[-1], "r", encoding="utf-8") as f:
+                    return json.load(f)
+            return self.load_latest_snapshot()
+        except Exception as e:
+            logger.warning(f"读取上次结果失败: {e}")
+            return None
+    
     def save_result(self, result: Dict) -> str:
         """保存采集结果"""
         timestamp = datetime.now().strftime("%Y-%m-%d")
         filename = DATA_DIR / f"coverage_{timestamp}.json"
         
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        block_id = len(get_snapshot_store("inference_coverage").blocks())
+        rows, meta = self.snapshot_to_rows(result, full=self.full_block_due(block_id))
+        saved = write_snapshot("inference_coverage", result, rows, meta, filename)
+        
+        logger.info(f"采集结果已保存: {saved}")
+        return saved
+    
+    @staticmethod
+    def full_block_due(block_id: int) -> bool:
+        """该块是否写入完整的相关文章列表"""
+        return block_id % FULL_ARTICLES_EVERY == 0
+    
+    @staticmethod
+    def snapshot_to_rows(result: Dict[str, Any], full: bool = True) -> Tuple[List[Dict], Dict[str, Any]]:
+        """
+        采集结果 -> 列式存储的行 (每篇相关文章一行) 和元数据
         
-        logger.info(f"采集结果已保存: {filename}")
-        return str(filename)
+        full 为 False 时只存本次新增的文章 (合并结果的前 new_relevant_articles 篇)，
+        沿用的历史文章由之前的块提供，见 load_latest_snapshot
+        """
+        articles = list(result.get("relevant_articles", []))
+        meta = {k: v for k, v in result.items() if k != "relevant_articles"}
+        meta["relevant_total"] = len(articles)
+        if not full:
+            articles = articles[:result.get("new_relevant_articles", len(articles))]
+        return articles, meta
+    
+    @staticmethod
+    def snapshot_from_rows(rows: List[Dict], meta: Dict[str, Any]) -> Dict[str, Any]:
+        """列式存储的行和元数据 -> 采集结果 (rows 为完整的相关文章列表)"""
+        meta = {k: v for k, v in meta.items() if k != "relevant_total"}
+        return {"timestamp": meta.get("timestamp"), "relevant_articles": rows, **meta}
+    
+    @classmethod
+    def load_latest_snapshot(cls, store: Optional[SnapshotStore] = None) -> Optional[Dict[str, Any]]:
+        """
+        从快照存储读取最新采集结果
+        
+        由新到旧读块并按去重键合并文章 (与 merge_relevant_articles 相同的顺序)，
+        读到完整列表的块或凑满 MAX_RELEVANT_ARTICLES 篇为止
+        """
+        store = store or get_snapshot_store("inference_coverage")
+        refs = store.blocks()
+        if not refs:
+            return None
+        
+        latest_meta = None
+        merged: List[Dict] = []
+        keys = set()
+        for ref in reversed(refs):
+            rows, meta = store.read_block(ref)
+            if latest_meta is None:
+                latest_meta = meta
+            for article in rows:
+                key = item_key(article)
+                if key not in keys:
+                    keys.add(key)
+                    merged.append(article)
+            # 旧块没有 relevant_total，存的是完整列表
+            if len(merged) >= MAX_RELEVANT_ARTICLES or len(rows) >= meta.get("relevant_total", len(rows)):
+                break
+        return cls.snapshot_from_rows(merged[:MAX_RELEVANT_ARTICLES], latest_meta)
+
+
+register_patterns(InferenceCoverageCollector.PATTERN_SET, InferenceCoverageCollector.AMOUNT_PATTERNS)
+InferenceCoverageCollector.KEYWORD_MATCHER = KeywordMatcher(InferenceCoverageCollector.TARGET_COMPANIES)
 
 
 async def main():
@@ -259,7 +445,7 @@ async def main():
     result = await collector.collect_all()
     
     print("\n=== 采集结果汇总 ===")
-    print(f"RSS文章: {result['rss_articles']}")
+    print(f"新RSS文章: {result['rss_articles']}")
     print(f"相关文章: {len(result['relevant_articles'])}")
     for article in result['relevant_articles'][:5]:
         print(f"  - [{article.get('matched_company')}] {article.get('title')[:60]}...")
@@ -0,0 +1,109 @@
+"""
+多关键词匹配 (Aho-Corasick)
+由 {标签: [关键词, ...]} 一次性构建自动机，对每段文本单次扫描即可找出所有关键词的出现位置，
+耗时与文本长度成正比，与关键词数量无关
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """关键词匹配结果 (start/end 为原文中的位置)"""
+    label: str
+    keyword: str
+    start: int
+    end: int
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick 关键词自动机
+
+    用法:
+        matcher = KeywordMatcher({"openai": ["OpenAI", "ChatGPT revenue"], ...})
+        matches = matcher.scan(text)     # 全部匹配 (含重叠)，按结束位置排序
+        labels = matcher.labels(text)    # 命中的标签，按首次出现顺序
+    """
+
+    def __init__(self, keywords: Dict[str, Iterable[str]], case_sensitive: bool = False):
+        self.case_sensitive = case_sensitive
+        # 状态转移表、失败指针、各状态的输出 (关键词长度, 关键词, 标签)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str, str]]] = [[]]
+
+        for label, words in keywords.items():
+            for word in words:
+                self._add(word, label)
+        self._build()
+
+    def _fold(self, text: str) -> str:
+        return text if self.case_sensitive else text.lower()
+
+    def _add(self, keyword: str, label: str):
+        pattern = self._fold(keyword)
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), keyword, label))
+
+    def _build(self):
+        """BFS 计算失败指针，并把失败链上的输出合并到每个状态"""
+        # 根的子状态失败指针均指向根
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> List[KeywordMatch]:
+        """单次扫描文本，返回所有关键词出现 (含重叠匹配)"""
+        if not text:
+            return []
+        folded = self._fold(text)
+        if len(folded) == len(text):
+            positions = enumerate(folded)
+        else:
+            # 个别字符折叠后长度变化 (如 "İ")，逐字符折叠以保证位置对应原文
+            positions = ((i, ch) for i, raw in enumerate(text) for ch in self._fold(raw))
+
+        goto, fail, out = self._goto, self._fail, self._out
+        matches = []
+        state = 0
+        for i, ch in positions:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                for length, keyword, label in out[state]:
+                    matches.append(KeywordMatch(label, keyword, max(end - length, 0), end))
+        return matches
+
+    def labels(self, text: str) -> List[str]:
+        """命中的标签 (按首次出现位置排序，去重)"""
+        seen = []
+        for match in sorted(self.scan(text), key=lambda m: m.start):
+            if match.label not in seen:
+                seen.append(match.label)
+        return seen
@@ -0,0 +1,95 @@
+"""
+RSS 已见条目存储
+按 feed 记录已处理条目的 GUID/链接及首次出现时间，
+每次采集只把新条目交给关键词匹配和存储
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+DEFAULT_SEEN_DIR = Path(__file__).parent.parent / "data" / "rss_seen"
+MAX_SEEN_PER_FEED = 2000  # 每个 feed 保留的条目数，超出后淘汰最早的 (远大于 feed 本身的条目数)
+
+
+def item_key(item: Dict) -> str:
+    """条目去重键: GUID > 链接 > 标题"""
+    return item.get("guid") or item.get("url") or item.get("title", "")
+
+
+class SeenItemStore:
+    """目录存储: 每个 feed 一个 JSON 文件 {key: first_seen}，原子替换写入"""
+
+    def __init__(self, seen_dir: Path = DEFAULT_SEEN_DIR, max_items: int = MAX_SEEN_PER_FEED):
+        self.seen_dir = Path(seen_dir)
+        self.max_items = max_items
+
+    def _path(self, feed_url: str) -> Path:
+        feed_key = hashlib.sha256(feed_url.encode("utf-8")).hexdigest()[:16]
+        return self.seen_dir / f"{feed_key}.json"
+
+    def load(self, feed_url: str) -> Dict[str, str]:
+        path = self._path(feed_url)
+        if not path.exists():
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("items", {})
+        except Exception as e:
+            logger.warning(f"[rss_seen] 读取失败 {path}: {e}")
+            return {}
+
+    def filter_new(self, feed_url: str, items: List[Dict]) -> List[Dict]:
+        """返回未见过的条目 (保持原顺序)"""
+        seen = self.load(feed_url)
+        new_items = []
+        keys = set()
+        for item in items:
+            key = item_key(item)
+            if key and key not in seen and key not in keys:
+                keys.add(key)
+                new_items.append(item)
+        return new_items
+
+    def mark_seen(self, feed_url: str, keys: Iterable[str]) -> bool:
+        """记录已处理的条目"""
+        seen = self.load(feed_url)
+        now = datetime.utcnow().isoformat()
+        for key in keys:
+            if key:
+                seen.setdefault(key, now)
+
+        if len(seen) > self.max_items:
+            newest = sorted(seen.items(), key=lambda kv: kv[1], reverse=True)[:self.max_items]
+            seen = dict(newest)
+
+        path = self._path(feed_url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.seen_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"feed": feed_url, "updated_at": now, "items": seen}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"[rss_seen] 写入失败 {path}: {e}")
+            return False
+
+
+# 全局存储实例
+_store: Optional[SeenItemStore] = None
+
+
+def get_seen_store() -> SeenItemStore:
+    """获取全局已见条目存储 (目录可由 RSS_SEEN_DIR 指定)"""
+    global _store
+    if _store is None:
+        _store = SeenItemStore(Path(os.getenv("RSS_SEEN_DIR", DEFAULT_SEEN_DIR)))
+    return _store
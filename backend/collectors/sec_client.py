@@ -0,0 +1,234 @@
+"""
+SEC EDGAR 共享客户端
+CapEx 与推理覆盖率采集器共用，统一 User-Agent 和请求预算:
+SEC 公平访问规则按客户端 (IP) 计算，所有 *.sec.gov 主机共享同一个每秒请求预算，
+并发请求数也有上限，公司之间可以并发采集而不会超出预算
+
+环境变量:
+- SEC_MAX_RPS: 每秒请求数上限 (默认 8，SEC 规定不超过 10)
+- SEC_USER_AGENT: 声明身份的 User-Agent (SEC 要求包含联系方式)
+- SEC_RATE_BACKEND: local (默认) / redis，redis 时多个 worker 进程共享预算
+- REDIS_URL: Redis 地址
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import httpx
+
+from spiders.http_client import get_http_pool, ResponseTooLargeError
+from spiders.rate_limiter import TokenBucket, backoff_delay, parse_retry_after
+from spiders.response_cache import get_response_cache
+from collectors.companyfacts_stream import CompanyFactsExtractor
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+SEC_EDGAR_BASE = "https://data.sec.gov"
+SEC_MAX_RPS = 8.0                 # 每秒请求数 (所有 SEC 主机合计)
+SEC_MAX_CONCURRENCY = 4           # 同时进行的请求数
+SEC_USER_AGENT = "InfraWatch/1.0 (research@infrawatch.io)"
+SUBMISSIONS_TTL = 600             # 同一进程内 submissions 索引的复用时间 (秒)
+
+# Redis 共享预算的键前缀 (按秒计数)
+REDIS_KEY_PREFIX = "infrawatch:sec_rate:"
+
+
+class SECRateBudget:
+    """
+    SEC 请求预算
+
+    进程内使用令牌桶；配置 Redis 时再叠加按秒计数的全局窗口，
+    多个 worker 进程合计不超过 max_rps。Redis 不可用时只按进程内预算限流
+    """
+
+    def __init__(self, max_rps: float = SEC_MAX_RPS, redis_url: Optional[str] = None):
+        self.max_rps = max_rps
+        self.bucket = TokenBucket(max_rps, max(1, int(max_rps)))
+        self._redis = None
+        if redis_url:
+            import redis.asyncio as aioredis
+            self._redis = aioredis.from_url(redis_url, decode_responses=True)
+
+    async def acquire(self):
+        """等待直到预算允许发出下一个请求"""
+        wait = self.bucket.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        if self._redis is not None:
+            await self._acquire_global()
+
+    async def _acquire_global(self):
+        while True:
+            now = time.time()
+            key = f"{REDIS_KEY_PREFIX}{int(now)}"
+            try:
+                count = await self._redis.incr(key)
+                if count == 1:
+                    await self._redis.expire(key, 2)
+            except Exception as e:
+                logger.warning(f"[sec_client] Redis 预算不可用，仅按进程内预算限流: {e}")
+                return
+            if count <= self.max_rps:
+                return
+            await asyncio.sleep(1 - (now % 1) + 0.01)
+
+    def penalize(self, seconds: float):
+        """SEC 返回 429/503 时暂停所有 SEC 请求"""
+        self.bucket.block(seconds)
+
+
+class SECClient:
+    """
+    SEC EDGAR 客户端
+
+    - 所有请求经 SECRateBudget 和并发信号量，再交给共享 HTTP 连接池
+    - submissions 索引带条件请求，并在进程内短期复用 (多个采集器查询同一 CIK 只下载一次)
+    - companyfacts 流式提取指定概念
+    """
+
+    def __init__(
+        self,
+        timeout: float = 15,
+        retries: int = 3,
+        max_concurrency: int = SEC_MAX_CONCURRENCY,
+        budget: Optional[SECRateBudget] = None,
+        user_agent: str = SEC_USER_AGENT,
+    ):
+        self.timeout = timeout
+        self.retries = retries
+        self.max_concurrency = max_concurrency
+        self.budget = budget or SECRateBudget()
+        self.headers = {"User-Agent": user_agent, "Accept": "application/json"}
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._submissions: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """并发信号量 (事件循环变化时重建)"""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    def _retry_after(self, error: Exception) -> Optional[float]:
+        """从 429/503 错误中取 Retry-After，并暂停整个 SEC 预算"""
+        if not isinstance(error, httpx.HTTPStatusError):
+            return None
+        if error.response.status_code not in (429, 503):
+            return None
+        retry_after = parse_retry_after(error.response.headers.get("retry-after"))
+        self.budget.penalize(retry_after if retry_after is not None else backoff_delay(0))
+        return retry_after
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+        """GET with retry (304 原样返回)"""
+        request_headers = {**self.headers, **(headers or {})}
+        for attempt in range(self.retries):
+            try:
+                async with self.semaphore:
+                    await self.budget.acquire()
+                    resp = await get_http_pool().get(url, headers=request_headers, timeout=self.timeout)
+                if resp.status_code == 304:
+                    return resp
+                resp.raise_for_status()
+                return resp
+            except ResponseTooLargeError as e:
+                logger.error(str(e))
+                return None
+            except Exception as e:
+                logger.warning(f"Fetch failed ({attempt+1}/{self.retries}): {url} - {e}")
+                retry_after = self._retry_after(e)
+                if attempt < self.retries - 1:
+                    await asyncio.sleep(backoff_delay(attempt, retry_after))
+        return None
+
+    async def get_json(self, url: str) -> Optional[Dict[str, Any]]:
+        resp = await self.get(url)
+        if resp is None or resp.status_code == 304:
+            return None
+        try:
+            return resp.json()
+        except ValueError as e:
+            logger.error(f"JSON解析失败: {url} - {e}")
+            return None
+
+    async def submissions(self, cik: str) -> Optional[Dict[str, Any]]:
+        """获取 submissions 索引 (进程内短期复用 + 条件请求)"""
+        memo = self._submissions.get(cik)
+        if memo and time.monotonic() - memo[0] < SUBMISSIONS_TTL:
+            return memo[1]
+
+        url = f"{SEC_EDGAR_BASE}/submissions/CIK{cik}.json"
+        cache = get_response_cache()
+        cached = await cache.get(url)
+        resp = await self.get(url, headers=cached.validator_headers() if cached else None)
+        if resp is None:
+            return None
+
+        try:
+            if resp.status_code == 304 and cached:
+                data = json.loads(cached.body)
+            else:
+                await cache.store(url, resp)
+                data = resp.json()
+        except ValueError as e:
+            logger.error(f"SEC解析失败: {url} - {e}")
+            return None
+
+        self._submissions[cik] = (time.monotonic(), data)
+        return data
+
+    async def company_facts(self, cik: str, concepts: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """
+        获取公司 XBRL 财务数据
+
+        边下载边增量解析，只保留指定概念的 USD 数据点
+        """
+        url = f"{SEC_EDGAR_BASE}/api/xbrl/companyfacts/CIK{cik}.json"
+        concepts = list(concepts)
+        pool = get_http_pool()
+
+        for attempt in range(self.retries):
+            extractor = CompanyFactsExtractor(concepts)
+            try:
+                async with self.semaphore:
+                    await self.budget.acquire()
+                    async with pool.stream(url, headers=self.headers, timeout=self.timeout) as resp:
+                        resp.raise_for_status()
+                        async for chunk in resp.aiter_bytes():
+                            extractor.feed(chunk)
+                facts = extractor.close()
+                logger.debug(f"CIK{cik}: 流式解析 {extractor.bytes_read / 1e6:.1f} MB")
+                return facts
+            except Exception as e:
+                logger.warning(f"Fetch failed ({attempt+1}/{self.retries}): {url} - {e}")
+                retry_after = self._retry_after(e)
+                if attempt < self.retries - 1:
+                    await asyncio.sleep(backoff_delay(attempt, retry_after))
+        return None
+
+
+# 全局客户端实例
+_client: Optional[SECClient] = None
+
+
+def get_sec_client() -> SECClient:
+    """获取全局 SEC 客户端"""
+    global _client
+    if _client is None:
+        redis_url = None
+        if os.getenv("SEC_RATE_BACKEND", "local").lower() == "redis":
+            redis_url = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+        _client = SECClient(
+            budget=SECRateBudget(float(os.getenv("SEC_MAX_RPS", SEC_MAX_RPS)), redis_url),
+            user_agent=os.getenv("SEC_USER_AGENT", SEC_USER_AGENT),
+        )
+    return _client
@@ -0,0 +1,205 @@
+"""
+SEC EDGAR 增量同步
+每个 (数据流, CIK) 记录上次处理到的 accession 编号 (游标) 和上次的处理结果；
+每次采集先经 SEC 共享客户端拉取体积很小的 submissions 索引 (带条件请求)，
+只有出现新的目标表单 (10-Q/10-K/8-K) 时才重新下载 companyfacts 或文件列表，
+否则直接复用上次结果
+"""
+
+import json
+import logging
+import os
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from collectors.sec_client import SECClient, get_sec_client
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+DEFAULT_SYNC_DIR = Path(__file__).parent.parent / "data" / "sec_sync"
+
+
+@dataclass
+class SyncCursor:
+    """同步游标"""
+    stream: str
+    cik: str
+    last_accession: Optional[str] = None
+    last_filing_date: str = ""
+    synced_at: str = ""
+    payload: Any = None
+
+
+@dataclass
+class SyncCheck:
+    """一次增量检查的结果"""
+    stream: str
+    cik: str
+    changed: bool
+    new_filings: List[Dict[str, Any]] = field(default_factory=list)
+    latest: Optional[Dict[str, Any]] = None
+    cursor: Optional[SyncCursor] = None
+    submissions: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def cached_payload(self) -> Any:
+        return self.cursor.payload if self.cursor else None
+
+
+def recent_filings(
+    submissions: Dict[str, Any],
+    forms: Optional[Iterable[str]] = None,
+    scan_limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    从 submissions 索引展开最近的文件列表 (新 -> 旧)
+
+    Args:
+        forms: 目标表单，按子串匹配 (8-K 同时匹配 8-K/A)；为空时不过滤
+        scan_limit: 只扫描最近 N 份文件
+    """
+    recent = submissions.get("filings", {}).get("recent", {})
+    form_types = recent.get("form", [])
+    dates = recent.get("filingDate", [])
+    accessions = recent.get("accessionNumber", [])
+    report_dates = recent.get("reportDate", [])
+    documents = recent.get("primaryDocument", [])
+    forms = tuple(forms or ())
+
+    filings = []
+    for i, ft in enumerate(form_types[:scan_limit] if scan_limit else form_types):
+        if forms and not any(f in ft for f in forms):
+            continue
+        filings.append({
+            "form_type": ft,
+            "filing_date": dates[i] if i < len(dates) else "",
+            "accession": accessions[i] if i < len(accessions) else "",
+            "report_date": report_dates[i] if i < len(report_dates) else "",
+            "primary_document": documents[i] if i < len(documents) else "",
+            "company": submissions.get("name", ""),
+        })
+    return filings
+
+
+class SECSync:
+    """
+    SEC 增量同步
+
+    用法:
+        check = await sync.check("capex", cik, ("10-Q", "10-K"))
+        if not check.changed:
+            return check.cached_payload
+        ... 重新下载并处理 ...
+        sync.commit(check, payload)
+
+    处理成功后才 commit 游标，中途失败下次会重新处理
+    """
+
+    def __init__(self, sync_dir: Path = DEFAULT_SYNC_DIR, client: Optional[SECClient] = None):
+        self.sync_dir = Path(sync_dir)
+        self._client = client
+
+    @property
+    def client(self) -> SECClient:
+        return self._client or get_sec_client()
+
+    def _path(self, stream: str, cik: str) -> Path:
+        return self.sync_dir / f"{stream}_CIK{cik}.json"
+
+    def load_cursor(self, stream: str, cik: str) -> Optional[SyncCursor]:
+        path = self._path(stream, cik)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return SyncCursor(**json.load(f))
+        except Exception as e:
+            logger.warning(f"[sec_sync] 读取游标失败 {path}: {e}")
+            return None
+
+    def _save_cursor(self, cursor: SyncCursor) -> bool:
+        path = self._path(cursor.stream, cursor.cik)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.sync_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(cursor), f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"[sec_sync] 写入游标失败 {path}: {e}")
+            return False
+
+    async def fetch_submissions(self, cik: str) -> Optional[Dict[str, Any]]:
+        """获取 submissions 索引"""
+        return await self.client.submissions(cik)
+
+    async def check(
+        self,
+        stream: str,
+        cik: str,
+        forms: Iterable[str],
+        force: bool = False,
+    ) -> SyncCheck:
+        """
+        检查 CIK 是否有游标之后的新表单
+
+        submissions 获取失败时视为有变化 (由调用方走完整下载)
+        """
+        cursor = self.load_cursor(stream, cik)
+        submissions = await self.fetch_submissions(cik)
+        if submissions is None:
+            return SyncCheck(stream, cik, changed=True, cursor=cursor, error="submissions 获取失败")
+
+        filings = recent_filings(submissions, forms)
+        latest = filings[0] if filings else None
+
+        if force or cursor is None or cursor.payload is None or not cursor.last_accession:
+            new_filings = filings
+        else:
+            accessions = [f["accession"] for f in filings]
+            if cursor.last_accession in accessions:
+                new_filings = filings[:accessions.index(cursor.last_accession)]
+            else:
+                new_filings = filings
+
+        changed = force or cursor is None or cursor.payload is None or bool(new_filings)
+        return SyncCheck(
+            stream=stream,
+            cik=cik,
+            changed=changed,
+            new_filings=new_filings,
+            latest=latest,
+            cursor=cursor,
+            submissions=submissions,
+        )
+
+    def commit(self, check: SyncCheck, payload: Any) -> bool:
+        """处理成功后推进游标并保存结果"""
+        latest = check.latest or {}
+        previous = check.cursor
+        cursor = SyncCursor(
+            stream=check.stream,
+            cik=check.cik,
+            last_accession=latest.get("accession") or (previous.last_accession if previous else None),
+            last_filing_date=latest.get("filing_date") or (previous.last_filing_date if previous else ""),
+            synced_at=datetime.utcnow().isoformat(),
+            payload=payload,
+        )
+        return self._save_cursor(cursor)
+
+
+# 全局同步实例
+_sync: Optional[SECSync] = None
+
+
+def get_sec_sync() -> SECSync:
+    """获取全局 SEC 同步实例 (目录可由 SEC_SYNC_DIR 指定)"""
+    global _sync
+    if _sync is None:
+        _sync = SECSync(Path(os.getenv("SEC_SYNC_DIR", DEFAULT_SYNC_DIR)))
+    return _sync
@@ -0,0 +1,392 @@
+"""
+列式快照存储
+采集器的每次快照以一个压缩的列式块 (zlib + 按列存储的 JSON) 追加写入按月分段的文件，
+旁边维护一个小索引: 块的位置/时间戳，以及每个 (主键1, 主键2) 出现在哪些块中。
+读取某个 SKU 跨月的历史只需按索引 seek 到相关块，不必解析所有快照文件
+
+目录结构 (每个数据集一份):
+    data/<dataset>/store/
+        index.log            块索引，每块一行 JSON (位置/时间戳/包含的主键)，只追加
+        2026-10.seg          追加写入的数据段 (每块: 4 字节长度 + zlib 压缩的列式 JSON)
+        .lock                写入锁
+
+写入: 持有 .lock 的排他 flock，先追加并 fsync 数据块，再追加一行索引，
+多个进程同时写入 (如 Celery prefork) 不会丢失彼此的索引项。
+读取: 只解析索引文件新增的完整行，读者看到的总是完整的块
+
+环境变量:
+- SNAPSHOT_STORE_ROOT: 数据根目录 (默认 backend/data)
+- SNAPSHOT_JSON_EXPORT: 1 (默认) / 0，是否同时写出旧格式的 JSON 快照
+"""
+
+import json
+import logging
+import os
+import struct
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: 不加锁，需保证单写者
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+DEFAULT_DATA_ROOT = Path(__file__).parent.parent / "data"
+COMPRESSION_LEVEL = 6
+_LENGTH = struct.Struct(">I")
+
+# 数据集 -> 行主键字段
+DATASETS: Dict[str, Tuple[str, str]] = {
+    "gpu_prices": ("provider", "sku_id"),
+    "capex": ("company", "period"),
+    "inference_coverage": ("matched_company", "url"),
+}
+
+
+def json_export_enabled() -> bool:
+    """是否同时导出 JSON 快照"""
+    return os.getenv("SNAPSHOT_JSON_EXPORT", "1").lower() not in ("0", "false", "no", "off")
+
+
+def _to_epoch(value: Any) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp())
+
+
+@dataclass
+class BlockRef:
+    """块索引项"""
+    id: int
+    segment: str
+    offset: int
+    length: int
+    ts: int              # 快照时间 (epoch 秒)
+    rows: int
+
+
+def encode_columns(rows: List[Dict[str, Any]]) -> Tuple[Dict[str, List[Any]], Dict[str, List[int]]]:
+    """行 -> (列, 缺失字段的行号)，缺失字段在列中占位为 None"""
+    names: Dict[str, None] = {}
+    for row in rows:
+        for name in row:
+            names.setdefault(name, None)
+    columns = {name: [row.get(name) for row in rows] for name in names}
+    absent = {}
+    for name in names:
+        missing = [i for i, row in enumerate(rows) if name not in row]
+        if missing:
+            absent[name] = missing
+    return columns, absent
+
+
+def decode_columns(
+    columns: Dict[str, List[Any]],
+    absent: Optional[Dict[str, List[int]]] = None,
+) -> List[Dict[str, Any]]:
+    """(列, 缺失字段的行号) -> 行"""
+    if not columns:
+        return []
+    count = len(next(iter(columns.values())))
+    rows = [{name: values[i] for name, values in columns.items()} for i in range(count)]
+    for name, missing in (absent or {}).items():
+        for i in missing:
+            rows[i].pop(name, None)
+    return rows
+
+
+class SnapshotStore:
+    """
+    追加写入的列式快照存储
+
+    用法:
+        store = get_snapshot_store("gpu_prices")
+        store.append(datetime.now(), rows, meta={...})
+        for ts, row in store.history("aws", "p5.48xlarge", start=..., end=...):
+            ...
+    """
+
+    def __init__(self, root: Path, key_fields: Tuple[str, str]):
+        self.root = Path(root)
+        self.key_fields = key_fields
+        # 内存中的索引，只增量读取索引文件新增的行
+        self._blocks: List[Dict[str, Any]] = []
+        self._keys: Dict[str, List[int]] = {}
+        self._index_inode: Optional[int] = None
+        self._index_pos = 0
+
+    @property
+    def index_path(self) -> Path:
+        return self.root / "index.log"
+
+    # ---------- 索引 ----------
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        """跨进程写锁 (排他 flock)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _reset_index(self):
+        self._blocks = []
+        self._keys = {}
+        self._index_inode = None
+        self._index_pos = 0
+
+    def _add_entry(self, entry: Dict[str, Any]):
+        keys = entry.pop("keys", [])
+        self._blocks.append(entry)
+        for key in keys:
+            self._keys.setdefault(key, []).append(entry["id"])
+
+    def _refresh_index(self):
+        """读取索引文件中新增的完整行 (文件被替换时从头读取)"""
+        try:
+            st = self.index_path.stat()
+        except FileNotFoundError:
+            self._reset_index()
+            return
+        if st.st_ino != self._index_inode or st.st_size < self._index_pos:
+            self._reset_index()
+            self._index_inode = st.st_ino
+        if st.st_size == self._index_pos:
+            return
+
+        with open(self.index_path, "rb") as f:
+            f.seek(self._index_pos)
+            data = f.read()
+        complete = data.rfind(b"\n") + 1  # 正在写入的半行留到下次
+        for line in data[:complete].splitlines():
+            if line.strip():
+                self._add_entry(json.loads(line))
+        self._index_pos += complete
+
+    def _load_index(self) -> Dict[str, Any]:
+        """当前索引 {"blocks": [...], "keys": {主键: [块号]}} (只读)"""
+        self._refresh_index()
+        return {"blocks": self._blocks, "keys": self._keys}
+
+    def signature(self) -> Optional[Tuple[int, int]]:
+        """索引文件的 (mtime, 大小)，用于判断是否有新块；存储为空时为 None"""
+        try:
+            st = self.index_path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _key(self, row: Dict[str, Any]) -> Optional[str]:
+        first = row.get(self.key_fields[0])
+        second = row.get(self.key_fields[1])
+        if first is None and second is None:
+            return None
+        return f"{first}|{second}"
+
+    # ---------- 写入 ----------
+
+    def append(
+        self,
+        timestamp: datetime,
+        rows: List[Dict[str, Any]],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> BlockRef:
+        """追加一个快照块"""
+        columns, absent = encode_columns(rows)
+        payload = json.dumps(
+            {"columns": columns, "absent": absent, "meta": meta or {}},
+            ensure_ascii=False,
+            separators=(",", ":"),
+            default=str,
+        ).encode("utf-8")
+        frame = zlib.compress(payload, COMPRESSION_LEVEL)
+        keys = list(dict.fromkeys(k for k in map(self._key, rows) if k is not None))
+
+        segment = f"{timestamp:%Y-%m}.seg"
+        with self._write_lock():
+            # 持锁后再读取其他进程追加的索引行，块号才不会重复
+            self._refresh_index()
+            if self.index_path.exists() and self.index_path.stat().st_size > self._index_pos:
+                # 持锁时仍不完整的末行是写入中途崩溃留下的，截掉
+                os.truncate(self.index_path, self._index_pos)
+            with open(self.root / segment, "ab") as f:
+                offset = f.tell()
+                f.write(_LENGTH.pack(len(frame)))
+                f.write(frame)
+                f.flush()
+                os.fsync(f.fileno())
+
+            ref = BlockRef(
+                id=len(self._blocks),
+                segment=segment,
+                offset=offset,
+                length=len(frame),
+                ts=_to_epoch(timestamp),
+                rows=len(rows),
+            )
+            line = json.dumps({**asdict(ref), "keys": keys}, ensure_ascii=False, separators=(",", ":"))
+            with open(self.index_path, "ab") as f:
+                f.write((line + "\n").encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh_index()
+
+        logger.info(
+            f"[snapshot_store] {self.root.parent.name}: 追加 {len(rows)} 行 "
+            f"({len(payload)} -> {len(frame)} bytes)"
+        )
+        return ref
+
+    # ---------- 读取 ----------
+
+    def blocks(self, start: Any = None, end: Any = None) -> List[BlockRef]:
+        """时间范围内的块 (含端点)"""
+        start_ts, end_ts = _to_epoch(start), _to_epoch(end)
+        return [
+            BlockRef(**b) for b in self._load_index()["blocks"]
+            if (start_ts is None or b["ts"] >= start_ts) and (end_ts is None or b["ts"] <= end_ts)
+        ]
+
+    def keys(self) -> List[Tuple[str, str]]:
+        """所有出现过的主键"""
+        return [tuple(key.split("|", 1)) for key in self._load_index()["keys"]]
+
+    def read_block(self, ref: BlockRef) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """读取单个块，返回 (行, 元数据)"""
+        with open(self.root / ref.segment, "rb") as f:
+            return self._read_frame(f, ref)
+
+    @staticmethod
+    def _read_frame(f, ref: BlockRef) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        f.seek(ref.offset)
+        (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+        data = json.loads(zlib.decompress(f.read(length)))
+        return decode_columns(data["columns"], data.get("absent")), data.get("meta", {})
+
+    def iter_blocks(self, refs: List[BlockRef]) -> Iterator[Tuple[BlockRef, List[Dict[str, Any]], Dict[str, Any]]]:
+        """按段文件分组顺序读取多个块 (每个段只打开一次)"""
+        handles = {}
+        try:
+            for ref in sorted(refs, key=lambda r: (r.segment, r.offset)):
+                f = handles.get(ref.segment)
+                if f is None:
+                    f = handles[ref.segment] = open(self.root / ref.segment, "rb")
+                rows, meta = self._read_frame(f, ref)
+                yield ref, rows, meta
+        finally:
+            for f in handles.values():
+                f.close()
+
+    def latest(self) -> Optional[Tuple[BlockRef, List[Dict[str, Any]], Dict[str, Any]]]:
+        """最新的快照块"""
+        blocks = self._load_index()["blocks"]
+        if not blocks:
+            return None
+        ref = BlockRef(**blocks[-1])
+        rows, meta = self.read_block(ref)
+        return ref, rows, meta
+
+    def history(
+        self,
+        first: Any,
+        second: Any = None,
+        start: Any = None,
+        end: Any = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        某个主键的历史 [(epoch 秒, 行)]，只读取索引中包含该主键的块
+
+        second 为空时返回 first 下所有主键 (如某服务商的全部 SKU)
+        """
+        index = self._load_index()
+        if second is not None:
+            block_ids = set(index["keys"].get(f"{first}|{second}", []))
+        else:
+            prefix = f"{first}|"
+            block_ids = {i for key, ids in index["keys"].items() if key.startswith(prefix) for i in ids}
+
+        start_ts, end_ts = _to_epoch(start), _to_epoch(end)
+        refs = [
+            BlockRef(**index["blocks"][i]) for i in sorted(block_ids)
+            if (start_ts is None or index["blocks"][i]["ts"] >= start_ts)
+            and (end_ts is None or index["blocks"][i]["ts"] <= end_ts)
+        ]
+
+        result = []
+        for ref, rows, _ in self.iter_blocks(refs):
+            for row in rows:
+                if str(row.get(self.key_fields[0])) != str(first):
+                    continue
+                if second is not None and str(row.get(self.key_fields[1])) != str(second):
+                    continue
+                result.append((ref.ts, row))
+        result.sort(key=lambda item: item[0])
+        return result
+
+
+def latest_pointer_path(directory: Path, prefix: str) -> Path:
+    """JSON 快照目录中的 latest 指针文件 (内容为最新快照的文件名)，如 prices_latest"""
+    return Path(directory) / f"{prefix}latest"
+
+
+def write_snapshot(
+    dataset: str,
+    document: Dict[str, Any],
+    rows: List[Dict[str, Any]],
+    meta: Dict[str, Any],
+    json_path: Path,
+) -> str:
+    """
+    保存采集器快照: 追加到列式存储，按配置同时导出 JSON
+
+    Returns:
+        JSON 文件路径 (导出时) 或 "<段文件>#<块号>"
+    """
+    store = get_snapshot_store(dataset)
+    ref = store.append(datetime.fromisoformat(document["timestamp"]), rows, meta)
+    if not json_export_enabled():
+        return f"{store.root / ref.segment}#{ref.id}"
+
+    json_path = Path(json_path)
+    tmp_path = json_path.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, json_path)
+
+    # 更新 latest 指针，API 据此判断快照是否变化而不必扫描目录
+    pointer = latest_pointer_path(json_path.parent, json_path.name.rsplit("_", 1)[0] + "_")
+    tmp_pointer = pointer.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_pointer, "w", encoding="utf-8") as f:
+        f.write(json_path.name)
+    os.replace(tmp_pointer, pointer)
+    return str(json_path)
+
+
+# 各数据集的存储实例
+_stores: Dict[str, SnapshotStore] = {}
+
+
+def get_snapshot_store(dataset: str) -> SnapshotStore:
+    """获取数据集的快照存储"""
+    store = _stores.get(dataset)
+    if store is None:
+        root = Path(os.getenv("SNAPSHOT_STORE_ROOT", DEFAULT_DATA_ROOT)) / dataset / "store"
+        store = SnapshotStore(root, DATASETS[dataset])
+        _stores[dataset] = store
+    return store
@@ -8,6 +8,8 @@ InfraWatch 数据采集主入口
     python run_collectors.py gpu               # 只运行 GPU 价格采集
     python run_collectors.py inference         # 只运行推理覆盖率采集
     python run_collectors.py capex             # 只运行 CapEx 采集
+    python run_collectors.py --record fixtures/http   # 运行并录制所有 HTTP 响应
+    python run_collectors.py --replay fixtures/http   # 离线回放录制的响应
 """
 
 import asyncio
@@ -24,6 +26,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 from collectors.gpu_price_collector import GPUPriceCollector
 from collectors.inference_coverage_collector import InferenceCoverageCollector
 from collectors.capex_collector import CapExCollector
+from spiders.recorder import configure_recorder, MODE_RECORD, MODE_REPLAY
 
 logging.basicConfig(
     level=logging.INFO,
@@ -40,21 +43,21 @@ async def run_gpu_collector() -> dict:
     return await collector.run()
 
 
-async def run_inference_collector() -> dict:
+async def run_inference_collector(full_refresh: bool = False) -> dict:
     """运行推理覆盖率采集器"""
     logger.info("=== 开始推理覆盖率采集 ===")
-    collector = InferenceCoverageCollector()
+    collector = InferenceCoverageCollector(full_refresh=full_refresh)
     return await collector.collect_all()
 
 
-async def run_capex_collector() -> dict:
+async def run_capex_collector(full_refresh: bool = False) -> dict:
     """运行 CapEx 采集器"""
     logger.info("=== 开始 CapEx 资本密集度采集 ===")
-    collector = CapExCollector()
+    collector = CapExCollector(full_refresh=full_refresh)
     return await collector.collect_all()
 
 
-async def run_all() -> dict:
+async def run_all(full_refresh: bool = False) -> dict:
     """运行所有采集器"""
     results = {}
     
@@ -65,13 +68,13 @@ async def run_all() -> dict:
         results["gpu"] = {"error": str(e)}
     
     try:
-        results["inference"] = await run_inference_collector()
+        results["inference"] = await run_inference_collector(full_refresh)
     except Exception as e:
         logger.error(f"推理覆盖率采集失败: {e}")
         results["inference"] = {"error": str(e)}
     
     try:
-        results["capex"] = await run_capex_collector()
+        results["capex"] = await run_capex_collector(full_refresh)
     except Exception as e:
         logger.error(f"CapEx采集失败: {e}")
         results["capex"] = {"error": str(e)}
@@ -94,20 +97,49 @@ def main():
         default=None,
         help="输出结果到JSON文件",
     )
+    offline = parser.add_mutually_exclusive_group()
+    offline.add_argument(
+        "--record",
+        type=Path,
+        metavar="DIR",
+        help="录制所有 HTTP 响应到夹具目录",
+    )
+    offline.add_argument(
+        "--replay",
+        type=Path,
+        metavar="DIR",
+        help="从夹具目录离线回放 HTTP 响应",
+    )
+    parser.add_argument(
+        "--full-refresh",
+        action="store_true",
+        help="忽略 SEC 增量同步游标，重新下载全部数据",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="回放时每个请求的模拟延迟 (秒)",
+    )
     
     args = parser.parse_args()
     
+    if args.record:
+        configure_recorder(MODE_RECORD, args.record)
+    elif args.replay:
+        configure_recorder(MODE_REPLAY, args.replay, latency=args.latency)
+    
     logger.info(f"InfraWatch 数据采集 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # 运行采集器
     if args.collector == "gpu":
         result = asyncio.run(run_gpu_collector())
     elif args.collector == "inference":
-        result = asyncio.run(run_inference_collector())
+        result = asyncio.run(run_inference_collector(args.full_refresh))
     elif args.collector == "capex":
-        result = asyncio.run(run_capex_collector())
+        result = asyncio.run(run_capex_collector(args.full_refresh))
     else:
-        result = asyncio.run(run_all())
+        result = asyncio.run(run_all(args.full_refresh))
     
     # 输出结果
     if args.output:
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+快照存储回填
+把已有的 JSON 快照 (prices_*.json / capex_*.json / coverage_*.json) 按时间顺序导入列式快照存储。
+只导入晚于存储中最新块的快照，重复运行不会产生重复块
+
+用法:
+    python scripts/backfill_snapshot_store.py
+    python scripts/backfill_snapshot_store.py --dataset gpu_prices
+"""
+
+import argparse
+import json
+import logging
+import sys
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collectors.snapshot_store import get_snapshot_store, DEFAULT_DATA_ROOT
+from collectors.gpu_price_collector import GPUPriceCollector
+from collectors.capex_collector import CapExCollector
+from collectors.inference_coverage_collector import InferenceCoverageCollector
+
+# 数据集 -> (JSON 文件前缀, 行转换)
+SOURCES = {
+    "gpu_prices": ("prices_", GPUPriceCollector.snapshot_to_rows),
+    "capex": ("capex_", CapExCollector.snapshot_to_rows),
+    "inference_coverage": ("coverage_", InferenceCoverageCollector.snapshot_to_rows),
+}
+
+
+def backfill(dataset: str) -> int:
+    """导入一个数据集，返回导入的快照数"""
+    prefix, to_rows = SOURCES[dataset]
+    store = get_snapshot_store(dataset)
+    existing = store.blocks()
+    latest_ts = existing[-1].ts if existing else None
+
+    snapshots = []
+    for path in (DEFAULT_DATA_ROOT / dataset).glob(f"{prefix}*.json"):
+        with open(path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        timestamp = datetime.fromisoformat(snapshot["timestamp"])
+        if latest_ts is None or int(timestamp.timestamp()) > latest_ts:
+            snapshots.append((timestamp, snapshot))
+
+    for i, (timestamp, snapshot) in enumerate(sorted(snapshots, key=lambda item: item[0])):
+        if dataset == "inference_coverage":
+            # 与采集器一致: 定期写完整文章列表，其余块只存新增文章
+            full = InferenceCoverageCollector.full_block_due(len(existing) + i)
+            rows, meta = to_rows(snapshot, full=full)
+        else:
+            rows, meta = to_rows(snapshot)
+        store.append(timestamp, rows, meta)
+    return len(snapshots)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 快照导入列式快照存储")
+    parser.add_argument("--dataset", choices=sorted(SOURCES), default=None, help="只导入指定数据集")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    for dataset in [args.dataset] if args.dataset else SOURCES:
+        count = backfill(dataset)
+        print(f"{dataset}: 导入 {count} 个快照")
+
+
+if __name__ == "__main__":
+    main()
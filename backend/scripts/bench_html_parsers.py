@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+HTML 解析基准
+对比 html.parser 全量建树 (原实现) 与 lxml + SoupStrainer 定向解析的 parse() 耗时
+
+用法:
+    python scripts/bench_html_parsers.py                       # 使用合成页面
+    python scripts/bench_html_parsers.py --pages fixtures/     # 使用录制页面 (<spider>_*.html)
+    python scripts/bench_html_parsers.py --iterations 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from spiders import html_parser
+from spiders.openai_spider import OpenAISpider
+from spiders.anthropic_spider import AnthropicSpider
+from spiders.trendforce_spider import TrendForceSpider
+import spiders.openai_spider as openai_module
+import spiders.anthropic_spider as anthropic_module
+import spiders.trendforce_spider as trendforce_module
+
+SPIDERS = {
+    "openai": (OpenAISpider, openai_module),
+    "anthropic": (AnthropicSpider, anthropic_module),
+    "trendforce": (TrendForceSpider, trendforce_module),
+}
+
+# 模拟真实页面的无关内容 (导航、脚本、页脚等)
+_NOISE = "".join(
+    f'<div class="nav-item"><a href="/p{i}">Link {i}</a><span>text {i}</span>'
+    f'<img src="/i{i}.png"><p>Lorem ipsum dolor sit amet {i}</p></div>'
+    for i in range(400)
+)
+
+
+def synth_pages() -> Dict[str, str]:
+    """生成与各站点结构相近的合成页面"""
+    openai_rows = "".join(
+        f'<tr class="pricing-row"><td class="model">gpt-4o</td>'
+        f'<td class="price">${i}.50 / 1M input tokens</td></tr>'
+        for i in range(40)
+    )
+    anthropic_cards = "".join(
+        f'<div class="pricing-card"><h3>Claude 3.5 Sonnet</h3>'
+        f'<p>${i} / MTok (input)</p><p>${i * 5} / MTok (output)</p></div>'
+        for i in range(1, 20)
+    )
+    trendforce_articles = "".join(
+        f'<table><tr><td><a class="deepbluebold3" href="/News/{i}">HBM3e prices increase by {i}%</a>'
+        f'<div class="BlogPostContent">DRAM contract prices rise by {i}% in Q{i % 4 + 1}</div>'
+        f'<div class="BlogPostFooter"><span class="title22"><span>2026-01-{i % 28 + 1:02d}</span></span></div>'
+        f'</td></tr></table>'
+        for i in range(30)
+    )
+    wrap = "<html><head><script>var x = 1;</script></head><body>{noise}{body}{noise}</body></html>"
+    return {
+        "openai": wrap.format(noise=_NOISE, body=f"<table>{openai_rows}</table>"),
+        "anthropic": wrap.format(noise=_NOISE, body=anthropic_cards),
+        "trendforce": wrap.format(noise=_NOISE, body=trendforce_articles),
+    }
+
+
+def load_pages(pages_dir: Path) -> Dict[str, List[Tuple[str, str]]]:
+    """加载录制页面: 文件名前缀为爬虫名"""
+    pages: Dict[str, List[Tuple[str, str]]] = {}
+    for path in sorted(pages_dir.glob("*.html")):
+        spider_key = path.stem.split("_")[0]
+        if spider_key in SPIDERS:
+            pages.setdefault(spider_key, []).append((path.name, path.read_text(encoding="utf-8")))
+    return pages
+
+
+def _baseline_make_soup(content, parse_only=None, parser=None):
+    """原实现: html.parser 全量建树"""
+    return html_parser.BeautifulSoup(content, "html.parser")
+
+
+async def time_parse(spider, content: str, iterations: int) -> Tuple[float, int]:
+    """返回平均耗时 (ms) 和记录数"""
+    records = await spider.parse(content)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await spider.parse(content)
+    return (time.perf_counter() - start) / iterations * 1000, len(records)
+
+
+async def bench(pages: Dict[str, List[Tuple[str, str]]], iterations: int):
+    print(f"{'spider':<12} {'page':<28} {'KB':>7} {'baseline ms':>12} {'new ms':>9} {'speedup':>8} {'records':>9}")
+    for spider_key, page_list in pages.items():
+        spider_cls, module = SPIDERS[spider_key]
+        spider = spider_cls()
+        for page_name, content in page_list:
+            module.make_soup = _baseline_make_soup
+            base_ms, base_n = await time_parse(spider, content, iterations)
+            module.make_soup = html_parser.make_soup
+            new_ms, new_n = await time_parse(spider, content, iterations)
+
+            records = f"{base_n}/{new_n}"
+            print(
+                f"{spider_key:<12} {page_name:<28} {len(content) / 1024:>7.1f} "
+                f"{base_ms:>12.2f} {new_ms:>9.2f} {base_ms / new_ms:>7.1f}x {records:>9}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 解析基准")
+    parser.add_argument("--pages", type=Path, default=None, help="录制页面目录")
+    parser.add_argument("--iterations", type=int, default=10, help="每个页面的迭代次数")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = load_pages(args.pages)
+    else:
+        pages = {key: [("synthetic", html)] for key, html in synth_pages().items()}
+
+    print(f"解析后端: {html_parser.DEFAULT_PARSER}")
+    asyncio.run(bench(pages, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
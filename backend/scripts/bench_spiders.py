@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+爬虫基准
+复用 test_spiders.py 的爬虫列表，分别计时 fetch / parse / 标准化三个阶段，
+报告每个爬虫的记录吞吐 (records/sec) 与峰值内存，结果保存为 JSON 便于对比回归
+
+默认从录制夹具回放 (见 spiders/recorder.py，先用 test_spiders.py --record 录制)，
+HTML 页面可按倍数放大 body 以观察 parse() 随页面体积的伸缩
+
+用法:
+    python scripts/bench_spiders.py                                  # 回放 fixtures/http
+    python scripts/bench_spiders.py --fixtures DIR --scales 1,4,16
+    python scripts/bench_spiders.py --only openai_spider,aws_spider --iterations 20
+    python scripts/bench_spiders.py --compare bench_results/spiders_20260101_120000.json
+    python scripts/bench_spiders.py --live                           # 访问真实站点 (fetch 只计一次)
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from test_spiders import SPIDERS
+from spiders.base import APISpider
+from spiders.runner import SpiderJob
+from spiders.recorder import configure_recorder, DEFAULT_FIXTURE_DIR, MODE_OFF, MODE_REPLAY
+from collectors.gpu_price_collector import GPUPriceCollector
+from app.services.collection_service import CollectionService
+
+RESULTS_DIR = Path(__file__).parent.parent / "bench_results"
+
+_BODY_RE = re.compile(r"(<body[^>]*>)(.*)(</body>)", re.S | re.I)
+
+
+def scale_page(content: str, factor: int) -> Optional[str]:
+    """将 HTML body 内容重复 factor 次；非 HTML (如 JSON) 无法放大时返回 None"""
+    if factor <= 1:
+        return content
+    m = _BODY_RE.search(content)
+    if m:
+        return content[:m.start(2)] + m.group(2) * factor + content[m.end(2):]
+    if content.lstrip().startswith(("{", "[")):
+        return None
+    return content * factor
+
+
+async def _time_async(func: Callable[[], Awaitable[Any]], iterations: int) -> Tuple[float, Any]:
+    """返回平均耗时 (ms) 与最后一次的结果"""
+    result = None
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = await func()
+    return (time.perf_counter() - start) / iterations * 1000, result
+
+
+def _time_sync(func: Callable[[], Any], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+class Normaliser:
+    """标准化阶段: 与采集链路一致的存储格式转换 + GPU 类型归一"""
+
+    def __init__(self):
+        self.service = CollectionService()
+        self.gpu = GPUPriceCollector()
+
+    def __call__(self, provider: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        rows = []
+        for record in records:
+            row = self.service._format_record("bench", provider, record)
+            row["gpu_type"] = self.gpu.normalize_gpu_type(record.get("sku_id") or "")
+            rows.append(row)
+        return rows
+
+
+async def bench_spider(
+    spider_class,
+    label: str,
+    normaliser: Normaliser,
+    iterations: int,
+    scales: List[int],
+    live: bool,
+) -> Dict[str, Any]:
+    """对单个爬虫计时"""
+    spider = spider_class()
+    spider.use_cache = False  # 计时不走条件请求/解析缓存
+    if not live:
+        spider.retries = 1    # 回放结果确定，重试只会把缺夹具的退避时间算进 fetch
+    url = SpiderJob(spider.name, spider).target_url
+    is_api = isinstance(spider, APISpider)
+
+    fetch_ms, content = await _time_async(lambda: spider.fetch(url), 1 if live else iterations)
+    entry: Dict[str, Any] = {
+        "spider": spider.name,
+        "label": label,
+        "url": url,
+        "fetch_ms": round(fetch_ms, 3),
+        "bytes": len(content.encode("utf-8")) if content else 0,
+        "scales": [],
+    }
+    if not content:
+        entry["error"] = "未获取到内容 (缺少夹具?)"
+        return entry
+
+    for factor in scales:
+        if is_api:
+            # API 爬虫的解析在 fetch_prices 内完成 (回放时仅读取夹具)，不支持放大
+            if factor != 1:
+                continue
+            parse = spider.fetch_prices
+            parse_iterations = 1 if live else iterations
+            page_bytes = entry["bytes"]
+        else:
+            page = scale_page(content, factor)
+            if page is None:
+                continue
+            parse = lambda page=page: spider.parse(page)
+            parse_iterations = iterations
+            page_bytes = len(page.encode("utf-8"))
+
+        parse_ms, records = await _time_async(parse, parse_iterations)
+        records = records or []
+        # parse 无结果时各爬虫的 run() 使用后备数据，标准化阶段按同样的数据计时
+        rows = records or getattr(spider, "_get_fallback_prices", list)()
+        normalise_ms = _time_sync(lambda: normaliser(spider.name, rows), iterations)
+
+        # 峰值内存单独测一轮 (tracemalloc 会拖慢计时)
+        tracemalloc.start()
+        await parse()
+        normaliser(spider.name, rows)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        entry["scales"].append({
+            "scale": factor,
+            "page_bytes": page_bytes,
+            "parse_ms": round(parse_ms, 3),
+            "normalise_ms": round(normalise_ms, 3),
+            "records": len(records),
+            "normalised_records": len(rows),
+            "records_per_sec": round(len(records) / (parse_ms / 1000), 1) if records and parse_ms else 0.0,
+            "peak_memory_kb": round(peak / 1024, 1),
+        })
+
+    return entry
+
+
+def print_report(results: List[Dict[str, Any]], baseline: Optional[Dict[Tuple[str, int], float]] = None):
+    header = (
+        f"{'spider':<20} {'scale':>5} {'KB':>8} {'fetch ms':>9} {'parse ms':>9} "
+        f"{'norm ms':>8} {'records':>8} {'rec/s':>10} {'peak KB':>9}"
+    )
+    if baseline:
+        header += f" {'parse Δ':>8}"
+    print(header)
+    for entry in results:
+        if entry.get("error"):
+            print(f"{entry['spider']:<20} {entry['error']}")
+            continue
+        for row in entry["scales"]:
+            line = (
+                f"{entry['spider']:<20} {row['scale']:>5} {row['page_bytes'] / 1024:>8.1f} "
+                f"{entry['fetch_ms']:>9.2f} {row['parse_ms']:>9.2f} {row['normalise_ms']:>8.2f} "
+                f"{row['records']:>8} {row['records_per_sec']:>10.1f} {row['peak_memory_kb']:>9.1f}"
+            )
+            if baseline:
+                previous = baseline.get((entry["spider"], row["scale"]))
+                if previous:
+                    line += f" {(row['parse_ms'] - previous) / previous * 100:>+7.1f}%"
+            print(line)
+
+
+def load_baseline(path: Path) -> Dict[Tuple[str, int], float]:
+    """读取历史结果: (spider, scale) -> parse_ms"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return {
+        (entry["spider"], row["scale"]): row["parse_ms"]
+        for entry in data.get("results", [])
+        for row in entry.get("scales", [])
+    }
+
+
+async def bench(args) -> List[Dict[str, Any]]:
+    only = set(args.only.split(",")) if args.only else None
+    scales = [int(s) for s in args.scales.split(",")]
+    normaliser = Normaliser()
+
+    results = []
+    for spider_class, label in SPIDERS:
+        if only and spider_class.name not in only:
+            continue
+        results.append(await bench_spider(spider_class, label, normaliser, args.iterations, scales, args.live))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="爬虫 fetch/parse/标准化 基准")
+    parser.add_argument("--fixtures", type=Path, default=DEFAULT_FIXTURE_DIR, help="录制夹具目录")
+    parser.add_argument("--live", action="store_true", help="访问真实站点而不是回放夹具")
+    parser.add_argument("--iterations", type=int, default=5, help="每个阶段的迭代次数")
+    parser.add_argument("--scales", type=str, default="1,4,16", help="HTML 页面放大倍数 (逗号分隔)")
+    parser.add_argument("--only", type=str, default=None, help="只测指定爬虫 (name，逗号分隔)")
+    parser.add_argument("--output", "-o", type=Path, default=None, help="结果 JSON 路径")
+    parser.add_argument("--compare", type=Path, default=None, help="与历史结果对比 parse 耗时")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if args.live:
+        configure_recorder(MODE_OFF)
+    else:
+        configure_recorder(MODE_REPLAY, args.fixtures)
+
+    results = asyncio.run(bench(args))
+    print_report(results, load_baseline(args.compare) if args.compare else None)
+
+    output = args.output or RESULTS_DIR / f"spiders_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "timestamp": datetime.now().isoformat(),
+            "mode": "live" if args.live else "replay",
+            "fixtures": None if args.live else str(args.fixtures),
+            "iterations": args.iterations,
+            "results": results,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"\n结果已保存到: {output}")
+
+
+if __name__ == "__main__":
+    main()
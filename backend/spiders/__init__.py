@@ -2,7 +2,8 @@
 爬虫包
 """
 
-from .base import BaseSpider, APISpider
+from .base import BaseSpider, APISpider, BrowserSpider
+from .runner import SpiderRunner, SpiderJob, SpiderRunResult
 from .openai_spider import OpenAISpider
 from .anthropic_spider import AnthropicSpider
 from .lambda_labs_spider import LambdaLabsSpider
@@ -20,6 +21,10 @@ from .trendforce_spider import TrendForceSpider
 __all__ = [
     "BaseSpider",
     "APISpider",
+    "BrowserSpider",
+    "SpiderRunner",
+    "SpiderJob",
+    "SpiderRunResult",
     "OpenAISpider",
     "AnthropicSpider",
     "LambdaLabsSpider",
@@ -10,6 +10,7 @@ from typing import Any, Dict, List
 from bs4 import BeautifulSoup
 
 from .base import BaseSpider
+from .html_parser import make_soup, class_strainer
 
 logger = logging.getLogger(__name__)
 
@@ -40,10 +41,13 @@ class AnthropicSpider(BaseSpider):
         "claude-3-haiku": "claude-3-haiku",
     }
     
+    # 定价卡片过滤器
+    CARD_STRAINER = class_strainer(["div", "article", "section"], r"card|pricing|model")
+    
     async def parse(self, content: str) -> List[Dict[str, Any]]:
         """解析Anthropic定价页面"""
         results = []
-        soup = BeautifulSoup(content, "html.parser")
+        soup = make_soup(content, parse_only=self.CARD_STRAINER)
         
         # 尝试解析表格结构
         results = self._parse_pricing_cards(soup)
@@ -1,21 +1,29 @@
 """
 爬虫基类 - 提供通用爬虫功能
-使用 httpx 进行异步请求，支持重试和超时
+使用共享 httpx 连接池进行异步请求，支持重试和超时
 """
 
 import httpx
 import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
+from urllib.parse import urlsplit
+
+from .http_client import get_http_pool, ResponseTooLargeError
+from .response_cache import get_response_cache
+from .parse_cache import get_parse_store, content_hash
+from .rate_limiter import backoff_delay, parse_retry_after
+from .circuit_breaker import get_circuit_breaker
+from .recorder import get_recorder
+from .browser_pool import get_browser_pool, PlaywrightError, RENDER_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
 # 默认配置
 DEFAULT_TIMEOUT = 10  # 10秒超时
-DEFAULT_RETRIES = 3   # 3次重试
-RETRY_DELAY = 1       # 重试间隔秒数
+DEFAULT_RETRIES = 3   # 3次重试 (重试间隔见 rate_limiter.backoff_delay)
 
 
 class BaseSpider(ABC):
@@ -26,6 +34,8 @@ class BaseSpider(ABC):
     """
     
     name: str = "base_spider"
+    use_cache: bool = True  # 是否启用条件请求缓存 (ETag/Last-Modified) 和解析结果缓存
+    use_conditional_get: bool = True  # 是否携带 ETag/Last-Modified 发起条件请求
     
     def __init__(
         self,
@@ -40,55 +50,138 @@ class BaseSpider(ABC):
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.5",
         }
+        # 最近一次 run 的页面内容哈希；内容未变化时 last_run_unchanged 为 True
+        self.last_content_hash: Optional[str] = None
+        self.last_run_unchanged: bool = False
+        # 最近一次请求是否因熔断而跳过
+        self.circuit_open: bool = False
+    
+    @property
+    def caching(self) -> bool:
+        """
+        是否启用条件请求与解析结果缓存
+        
+        录制/回放模式下关闭: 录制需要完整响应体，回放需要每次都真实解析
+        """
+        return self.use_cache and not get_recorder().enabled
+    
+    @property
+    def conditional_get(self) -> bool:
+        """是否发起条件请求并缓存响应体"""
+        return self.caching and self.use_conditional_get
+    
+    async def _with_breaker(self, url: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        经熔断器发起请求
+        
+        熔断打开时直接返回 None 并置 circuit_open，不访问网络；
+        请求结果为 None 记为一次失败，否则记为成功
+        """
+        if get_recorder().enabled:
+            # 录制/回放不受熔断状态影响，也不改写熔断状态
+            self.circuit_open = False
+            return await request()
+        
+        breaker = get_circuit_breaker()
+        key = f"{self.name}@{urlsplit(url).netloc}"
+        
+        if not breaker.allow(key):
+            self.circuit_open = True
+            logger.info(f"[{self.name}] 熔断中，跳过请求: {url}")
+            return None
+        
+        self.circuit_open = False
+        result = await request()
+        if result is None:
+            breaker.record_failure(key, f"请求失败: {url}")
+        else:
+            breaker.record_success(key)
+        return result
     
     async def fetch(self, url: str, **kwargs) -> Optional[str]:
         """
-        获取URL内容，带重试机制
+        获取URL内容，带重试机制和熔断保护
+        
+        响应带 ETag/Last-Modified 时写入共享缓存，下次以条件请求获取，
+        服务端返回 304 时直接使用缓存内容
         """
+        return await self._with_breaker(url, lambda: self._fetch_text(url, **kwargs))
+    
+    async def _fetch_text(self, url: str, **kwargs) -> Optional[str]:
+        """带重试的文本请求"""
         headers = {**self.headers, **kwargs.get("headers", {})}
+        pool = get_http_pool()
+        cache = get_response_cache()
+        
+        # 携带上次的校验值发起条件请求
+        cached = await cache.get(url) if self.conditional_get else None
+        if cached:
+            headers.update(cached.validator_headers())
         
         for attempt in range(self.retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.get(url, headers=headers)
-                    response.raise_for_status()
-                    return response.text
+                response = await pool.get(url, headers=headers, timeout=self.timeout)
+                if response.status_code == 304 and cached:
+                    logger.info(f"[{self.name}] 内容未修改 (304)，使用缓存: {url}")
+                    return cached.body
+                
+                response.raise_for_status()
+                if self.conditional_get:
+                    await cache.store(url, response)
+                return response.text
                     
+            except ResponseTooLargeError as e:
+                logger.error(f"[{self.name}] {e}")
+                return None
             except httpx.TimeoutException:
                 logger.warning(f"[{self.name}] 超时 (尝试 {attempt + 1}/{self.retries}): {url}")
+                delay = backoff_delay(attempt)
             except httpx.HTTPStatusError as e:
                 logger.warning(f"[{self.name}] HTTP错误 {e.response.status_code}: {url}")
-                if e.response.status_code == 429:  # Rate limit
-                    await asyncio.sleep(RETRY_DELAY * (attempt + 1) * 2)
+                if e.response.status_code in (429, 503):  # Rate limit / 服务端过载，遵循 Retry-After
+                    delay = backoff_delay(attempt, parse_retry_after(e.response.headers.get("retry-after")))
                 elif e.response.status_code >= 500:
-                    await asyncio.sleep(RETRY_DELAY)
+                    delay = backoff_delay(attempt)
                 else:
                     return None  # 4xx 错误不重试
             except Exception as e:
                 logger.error(f"[{self.name}] 请求失败: {e}")
+                delay = backoff_delay(attempt)
             
             if attempt < self.retries - 1:
-                await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+                await asyncio.sleep(delay)
         
         return None
     
     async def fetch_json(self, url: str, **kwargs) -> Optional[Dict]:
         """
-        获取JSON数据
+        获取JSON数据，带熔断保护
         """
+        return await self._with_breaker(url, lambda: self._fetch_json_data(url, **kwargs))
+    
+    async def _fetch_json_data(self, url: str, **kwargs) -> Optional[Dict]:
+        """带重试的 JSON 请求"""
         headers = {**self.headers, "Accept": "application/json", **kwargs.get("headers", {})}
+        pool = get_http_pool()
         
         for attempt in range(self.retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.get(url, headers=headers)
-                    response.raise_for_status()
-                    return response.json()
+                response = await pool.get(url, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
                     
+            except ResponseTooLargeError as e:
+                logger.error(f"[{self.name}] {e}")
+                return None
+            except httpx.HTTPStatusError as e:
+                logger.warning(f"[{self.name}] JSON请求失败 (尝试 {attempt + 1}): {e}")
+                retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                if attempt < self.retries - 1:
+                    await asyncio.sleep(backoff_delay(attempt, retry_after))
             except Exception as e:
                 logger.warning(f"[{self.name}] JSON请求失败 (尝试 {attempt + 1}): {e}")
                 if attempt < self.retries - 1:
-                    await asyncio.sleep(RETRY_DELAY * (attempt + 1))
+                    await asyncio.sleep(backoff_delay(attempt))
         
         return None
     
@@ -107,17 +200,45 @@ class BaseSpider(ABC):
     async def run(self, url: str) -> List[Dict[str, Any]]:
         """
         执行爬虫
+        
+        页面内容哈希与上次一致时不再调用 parse，直接返回上次的记录，
+        并将 last_run_unchanged 置为 True 供下游跳过存储；
+        熔断打开时同样复用上次成功的记录
         """
         logger.info(f"[{self.name}] 开始采集: {url}")
+        self.last_run_unchanged = False
         
         content = await self.fetch(url)
+        store = get_parse_store()
+        
+        # 熔断中: 直接使用上次成功解析的数据 (没有则由子类回退到后备数据)
+        if not content and self.circuit_open:
+            previous = store.get(self.name, url)
+            if previous and previous.records:
+                self.last_run_unchanged = True
+                logger.info(f"[{self.name}] 熔断中，使用上次成功数据: {len(previous.records)} 条记录")
+                return previous.records
+            return []
+        
         if not content:
             logger.error(f"[{self.name}] 获取内容失败")
             return []
         
+        # 页面内容与上次一致: 跳过解析，复用上次结果
+        digest = content_hash(content)
+        self.last_content_hash = digest
+        if self.caching:
+            previous = store.get(self.name, url)
+            if previous and previous.content_hash == digest and previous.records:
+                self.last_run_unchanged = True
+                logger.info(f"[{self.name}] 页面未变化，复用上次解析结果: {len(previous.records)} 条记录")
+                return previous.records
+        
         try:
             results = await self.parse(content)
             logger.info(f"[{self.name}] 采集完成: {len(results)} 条记录")
+            if self.caching and results:
+                store.store(self.name, url, digest, results)
             return results
         except Exception as e:
             logger.error(f"[{self.name}] 解析失败: {e}")
@@ -147,3 +268,54 @@ class APISpider(BaseSpider):
     async def run(self, url: str = None) -> List[Dict[str, Any]]:
         """执行API爬虫"""
         return await self.fetch_prices()
+
+
+class BrowserSpider(BaseSpider):
+    """
+    浏览器爬虫基类
+    
+    用于客户端渲染价格或拦截普通 HTTP 请求的页面: 从浏览器上下文池取页面渲染，
+    parse 接收渲染后的 HTML。浏览器不可用 (未安装 playwright / SPIDER_BROWSER=off /
+    启动失败) 时退回普通 HTTP 请求。
+    渲染结果没有 ETag/Last-Modified，不发条件请求；解析结果仍按渲染后页面的
+    内容哈希缓存 (页面未变化时跳过解析，熔断时复用上次成功数据)
+    """
+    
+    use_conditional_get = False
+
+    wait_for_selector: Optional[str] = None  # 等待价格节点渲染完成的 CSS 选择器
+    render_timeout: float = RENDER_TIMEOUT
+    
+    async def _fetch_text(self, url: str, **kwargs) -> Optional[str]:
+        """带重试的页面渲染"""
+        pool = get_browser_pool()
+        if not pool.available:
+            return await super()._fetch_text(url, **kwargs)
+        
+        for attempt in range(self.retries):
+            try:
+                page = await pool.render(url, wait_for=self.wait_for_selector, timeout=self.render_timeout)
+                if page.status < 400:
+                    return page.html
+                
+                logger.warning(f"[{self.name}] HTTP错误 {page.status}: {url}")
+                if page.status in (429, 503):
+                    delay = backoff_delay(attempt, parse_retry_after(page.headers.get("retry-after")))
+                elif page.status >= 500:
+                    delay = backoff_delay(attempt)
+                else:
+                    return None  # 4xx 错误不重试
+                    
+            except PlaywrightError as e:
+                if not pool.available:
+                    return await super()._fetch_text(url, **kwargs)
+                logger.warning(f"[{self.name}] 渲染失败 (尝试 {attempt + 1}/{self.retries}): {e}")
+                delay = backoff_delay(attempt)
+            except Exception as e:
+                logger.error(f"[{self.name}] 请求失败: {e}")
+                delay = backoff_delay(attempt)
+            
+            if attempt < self.retries - 1:
+                await asyncio.sleep(delay)
+        
+        return None
@@ -0,0 +1,308 @@
+"""
+浏览器上下文池
+部分定价页在客户端渲染价格或拦截普通 HTTP 请求，需要真实浏览器。
+整个进程只启动一个 headless Chromium，维护若干个预热的 BrowserContext 复用，
+每次抓取只新建/关闭一个 Page；图片、字体、媒体和统计脚本在路由层直接拦截
+
+环境变量:
+- SPIDER_BROWSER: on (默认) / off，off 时 BrowserSpider 退回普通 HTTP
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .rate_limiter import get_rate_limiter, parse_retry_after
+from .recorder import get_recorder
+
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+# playwright 为可选依赖 (还需执行 playwright install chromium)，缺失时退回普通 HTTP
+try:
+    from playwright.async_api import async_playwright, Error as PlaywrightError
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+    class PlaywrightError(Exception):
+        """占位: playwright 未安装"""
+        pass
+
+# 默认配置
+POOL_SIZE = 3                  # 预热的浏览器上下文数 (即同时渲染的页面数上限)
+CONTEXT_MAX_USES = 50          # 单个上下文复用次数上限，超过后重建 (释放缓存/内存)
+RENDER_TIMEOUT = 20            # 单页渲染超时 (秒)
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# 拦截的资源类型与统计/广告域名
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
+BLOCKED_HOST_SUFFIXES = (
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "segment.io",
+    "segment.com",
+    "hotjar.com",
+    "facebook.net",
+    "connect.facebook.net",
+    "clarity.ms",
+    "newrelic.com",
+    "nr-data.net",
+    "optimizely.com",
+)
+
+
+@dataclass
+class RenderedPage:
+    """渲染结果"""
+    url: str
+    status: int
+    html: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+def _is_blocked(resource_type: str, url: str) -> bool:
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        return True
+    host = urlsplit(url).hostname or ""
+    return any(host == suffix or host.endswith("." + suffix) for suffix in BLOCKED_HOST_SUFFIXES)
+
+
+class BrowserContextPool:
+    """
+    浏览器上下文池
+
+    - 进程内单个 Chromium，按需懒启动
+    - 最多 pool_size 个上下文，空闲上下文在队列中等待复用
+    - 上下文复用 max_uses 次后关闭重建
+    - 导航前从主机级令牌桶取令牌，与 HTTP 连接池共用限流
+
+    与 HTTPClientPool 一样，浏览器绑定在启动它的事件循环上，事件循环变化时重启
+    """
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        max_uses: int = CONTEXT_MAX_USES,
+        timeout: float = RENDER_TIMEOUT,
+        enabled: bool = True,
+    ):
+        self.pool_size = pool_size
+        self.max_uses = max_uses
+        self.timeout = timeout
+        self.enabled = enabled and PLAYWRIGHT_AVAILABLE
+
+        self._playwright = None
+        self._browser = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._idle: Optional[asyncio.Queue] = None
+        self._uses: Dict[int, int] = {}
+        self._created = 0
+        self._launch_failed = False
+
+    @property
+    def available(self) -> bool:
+        """浏览器是否可用 (未安装/禁用/启动失败时为 False)"""
+        return self.enabled and not self._launch_failed
+
+    async def _ensure_browser(self):
+        """启动 (必要时重启) 浏览器"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._browser is not None:
+                logger.info("[browser_pool] 事件循环已变化，重启浏览器")
+            self._playwright = None
+            self._browser = None
+            self._loop = loop
+            self._lock = asyncio.Lock()
+            self._idle = asyncio.Queue()
+            self._uses = {}
+            self._created = 0
+
+        async with self._lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            try:
+                if self._playwright is None:
+                    self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._idle = asyncio.Queue()
+                self._uses = {}
+                self._created = 0
+                logger.info("[browser_pool] Chromium 已启动")
+            except PlaywrightError as e:
+                # 常见原因: 未执行 playwright install chromium
+                self._launch_failed = True
+                logger.error(f"[browser_pool] 浏览器启动失败，退回普通 HTTP: {e}")
+                raise
+
+    async def _new_context(self):
+        context = await self._browser.new_context(
+            user_agent=USER_AGENT,
+            locale="en-US",
+            java_script_enabled=True,
+        )
+
+        async def _route(route):
+            request = route.request
+            if _is_blocked(request.resource_type, request.url):
+                await route.abort()
+            else:
+                await route.continue_()
+
+        try:
+            await context.route("**/*", _route)
+        except Exception:
+            await context.close()
+            raise
+        self._uses[id(context)] = 0
+        return context
+
+    async def _acquire_context(self):
+        if not self._idle.empty():
+            return self._idle.get_nowait()
+        if self._created < self.pool_size:
+            # 先占位再 await，并发调用者不会越过 pool_size；创建失败时归还名额
+            self._created += 1
+            try:
+                return await self._new_context()
+            except BaseException:
+                self._created -= 1
+                raise
+        return await self._idle.get()
+
+    async def _release_context(self, context, broken: bool = False):
+        uses = self._uses.get(id(context), 0) + 1
+        if broken or uses >= self.max_uses:
+            self._uses.pop(id(context), None)
+            self._created -= 1
+            try:
+                await context.close()
+            except PlaywrightError:
+                pass
+            return
+        self._uses[id(context)] = uses
+        self._idle.put_nowait(context)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator["Page"]:
+        """从池中取一个上下文并新建页面，用完后关闭页面、归还上下文"""
+        await self._ensure_browser()
+        context = await self._acquire_context()
+        page = None
+        broken = False
+        try:
+            page = await context.new_page()
+            page.set_default_timeout(self.timeout * 1000)
+            yield page
+        except PlaywrightError:
+            broken = True
+            raise
+        finally:
+            if page is not None:
+                try:
+                    await page.close()
+                except PlaywrightError:
+                    broken = True
+            await self._release_context(context, broken=broken)
+
+    async def render(
+        self,
+        url: str,
+        wait_for: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> RenderedPage:
+        """
+        渲染页面并返回 DOM 序列化后的 HTML
+
+        Args:
+            url: 页面地址
+            wait_for: 等待出现的 CSS 选择器 (价格表等异步渲染的节点)
+            timeout: 渲染超时 (秒)
+
+        Raises:
+            PlaywrightError: 导航/渲染失败 (含超时)
+            httpx.ConnectError: 回放模式下无夹具
+        """
+        recorder = get_recorder()
+        if recorder.replaying:
+            response = await recorder.replay(url)
+            return RenderedPage(url, response.status_code, response.text, dict(response.headers))
+
+        limiter = get_rate_limiter()
+        timeout_ms = (timeout or self.timeout) * 1000
+
+        await limiter.acquire(url)
+        async with self.page() as page:
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout_ms)
+            status = response.status if response else 200
+            headers = await response.all_headers() if response else {}
+
+            if status in (429, 503):
+                retry_after = parse_retry_after(headers.get("retry-after"))
+                if retry_after is not None:
+                    limiter.penalize(url, retry_after)
+            elif status < 400 and wait_for:
+                await page.wait_for_selector(wait_for, timeout=timeout_ms)
+
+            html = await page.content()
+
+        rendered = RenderedPage(url, status, html, headers)
+        if recorder.recording:
+            recorder.save(url, None, httpx.Response(
+                status_code=status,
+                headers={"content-type": "text/html; charset=utf-8"},
+                content=html.encode("utf-8"),
+            ))
+        return rendered
+
+    async def aclose(self):
+        """关闭所有上下文和浏览器"""
+        try:
+            if self._browser is not None:
+                await self._browser.close()
+            if self._playwright is not None:
+                await self._playwright.stop()
+        except (PlaywrightError, RuntimeError) as e:
+            logger.debug(f"[browser_pool] 关闭浏览器时忽略: {e}")
+        self._browser = None
+        self._playwright = None
+        self._loop = None
+        self._idle = None
+        self._uses = {}
+        self._created = 0
+
+
+# 全局浏览器池实例
+_browser_pool: Optional[BrowserContextPool] = None
+
+
+def get_browser_pool() -> BrowserContextPool:
+    """获取全局浏览器池"""
+    global _browser_pool
+    if _browser_pool is None:
+        _browser_pool = BrowserContextPool(
+            enabled=os.getenv("SPIDER_BROWSER", "on").lower() != "off",
+        )
+    return _browser_pool
+
+
+async def close_browser_pool():
+    """关闭全局浏览器池 (由 FastAPI lifespan / Celery worker 关闭时调用)"""
+    global _browser_pool
+    if _browser_pool is not None:
+        await _browser_pool.aclose()
+        _browser_pool = None
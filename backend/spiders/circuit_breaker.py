@@ -0,0 +1,134 @@
+"""
+爬虫熔断器
+按 (爬虫, 主机) 记录连续失败次数，状态持久化到磁盘，跨采集周期和 worker 共享
+
+- closed: 正常请求
+- open: 连续失败达到阈值，跳过网络请求，直接使用上次成功数据或后备数据
+- half_open: 熔断超过冷却时间后放行一次探测请求，成功则恢复，失败则重新熔断
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+FAILURE_THRESHOLD = 3               # 连续失败次数达到阈值后熔断
+RESET_TIMEOUT = 6 * 3600            # 熔断冷却时间 (秒)，之后进入半开探测
+PROBE_TIMEOUT = 300                 # 半开探测超时 (秒)，超时未回报视为探测失败
+
+DEFAULT_BREAKER_DIR = Path(__file__).parent.parent / "data" / "circuit_breaker"
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+@dataclass
+class CircuitState:
+    """熔断状态"""
+    key: str
+    state: str = STATE_CLOSED
+    failures: int = 0
+    opened_at: float = 0.0
+    probe_started_at: float = 0.0
+    last_error: str = ""
+
+
+class CircuitBreaker:
+    """持久化熔断器 (每个 key 一个 JSON 文件，原子替换写入)"""
+
+    def __init__(
+        self,
+        state_dir: Path = DEFAULT_BREAKER_DIR,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_timeout: float = RESET_TIMEOUT,
+    ):
+        self.state_dir = Path(state_dir)
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+        return self.state_dir / f"{digest}.json"
+
+    def get_state(self, key: str) -> CircuitState:
+        path = self._path(key)
+        if not path.exists():
+            return CircuitState(key=key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return CircuitState(**json.load(f))
+        except Exception as e:
+            logger.warning(f"[circuit_breaker] 读取状态失败 {key}: {e}")
+            return CircuitState(key=key)
+
+    def _save(self, state: CircuitState):
+        path = self._path(state.key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(state), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"[circuit_breaker] 保存状态失败 {state.key}: {e}")
+
+    def allow(self, key: str) -> bool:
+        """是否允许发起请求 (熔断冷却结束时放行一次半开探测)"""
+        state = self.get_state(key)
+        now = time.time()
+
+        if state.state == STATE_CLOSED:
+            return True
+
+        if state.state == STATE_HALF_OPEN and now - state.probe_started_at < PROBE_TIMEOUT:
+            return False  # 已有探测进行中
+
+        if state.state == STATE_OPEN and now - state.opened_at < self.reset_timeout:
+            return False
+
+        state.state = STATE_HALF_OPEN
+        state.probe_started_at = now
+        self._save(state)
+        logger.info(f"[circuit_breaker] {key} 进入半开状态，发起探测请求")
+        return True
+
+    def record_success(self, key: str):
+        state = self.get_state(key)
+        if state.state != STATE_CLOSED or state.failures:
+            if state.state != STATE_CLOSED:
+                logger.info(f"[circuit_breaker] {key} 探测成功，恢复正常")
+            self._save(CircuitState(key=key))
+
+    def record_failure(self, key: str, error: str = ""):
+        state = self.get_state(key)
+        state.failures += 1
+        state.last_error = error[:200]
+
+        if state.state == STATE_HALF_OPEN or state.failures >= self.failure_threshold:
+            if state.state != STATE_OPEN:
+                logger.warning(
+                    f"[circuit_breaker] {key} 连续失败 {state.failures} 次，熔断 {self.reset_timeout:.0f}s"
+                )
+            state.state = STATE_OPEN
+            state.opened_at = time.time()
+        self._save(state)
+
+
+# 全局熔断器实例
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """获取全局熔断器 (目录可由 SPIDER_BREAKER_DIR 指定)"""
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(Path(os.getenv("SPIDER_BREAKER_DIR", DEFAULT_BREAKER_DIR)))
+    return _breaker
@@ -0,0 +1,179 @@
+"""
+价格/数值抽取引擎
+各爬虫和采集器注册自己的正则模式集，引擎将其合并编译为一个多分支正则，
+对每段文本只扫描一次，返回带类型的匹配结果 (指标、方向、数值、单位)
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 方向判断关键词
+UP_WORDS = ("increase", "rise", "surge", "jump", "climb")
+DOWN_WORDS = ("decrease", "drop", "fall", "decline")
+
+
+@dataclass(frozen=True)
+class PricePattern:
+    """
+    抽取模式
+
+    Attributes:
+        name: 模式名 (同一模式集内唯一)
+        regex: 正则表达式 (不可使用命名分组)
+        metric: 指标类型，如 hbm_price / dram_price / api_price / amount
+        direction: 固定方向 up/down；为空时按匹配文本中的关键词判断
+        unit: 固定单位；unit_group 非空时以该分组内容为准
+        value_group: 数值所在分组序号
+        unit_group: 单位所在分组序号
+    """
+    name: str
+    regex: str
+    metric: str
+    direction: Optional[str] = None
+    unit: Optional[str] = None
+    value_group: int = 1
+    unit_group: Optional[int] = None
+
+
+@dataclass
+class PriceMatch:
+    """抽取结果"""
+    pattern: str
+    metric: str
+    direction: str
+    value: Optional[float]
+    unit: Optional[str]
+    text: str
+    groups: Tuple[Optional[str], ...] = field(default_factory=tuple)
+    span: Tuple[int, int] = (0, 0)
+
+
+@dataclass
+class _CompiledSet:
+    regex: "re.Pattern"
+    # 分支名 -> (模式, 分支分组序号, 内部分组数)
+    branches: Dict[str, Tuple[PricePattern, int, int]]
+
+
+class ExtractionEngine:
+    """
+    多模式抽取引擎
+
+    用法:
+        engine = get_extraction_engine()
+        engine.register("trendforce", [PricePattern(...), ...])
+        matches = engine.scan(text, ["trendforce"])
+    """
+
+    def __init__(self, flags: int = re.IGNORECASE):
+        self.flags = flags
+        self._sets: Dict[str, List[PricePattern]] = {}
+        self._compiled: Dict[Tuple[str, ...], _CompiledSet] = {}
+
+    def register(self, set_name: str, patterns: Sequence[PricePattern]):
+        """注册 (或替换) 一个模式集"""
+        self._sets[set_name] = list(patterns)
+        self._compiled = {}
+
+    def patterns(self, set_name: str) -> List[PricePattern]:
+        return list(self._sets.get(set_name, []))
+
+    def _compile(self, set_names: Tuple[str, ...]) -> _CompiledSet:
+        """将多个模式集合并编译为一个多分支正则 (按组合缓存)"""
+        compiled = self._compiled.get(set_names)
+        if compiled is not None:
+            return compiled
+
+        parts = []
+        branches = {}
+        group_index = 0
+        for set_name in set_names:
+            for pattern in self._sets.get(set_name, []):
+                inner_groups = re.compile(pattern.regex, self.flags).groups
+                branch = f"_b{len(branches)}"
+                parts.append(f"(?P<{branch}>{pattern.regex})")
+                group_index += 1
+                branches[branch] = (pattern, group_index, inner_groups)
+                group_index += inner_groups
+
+        regex = re.compile("|".join(parts) if parts else r"(?!x)x", self.flags)
+        compiled = _CompiledSet(regex=regex, branches=branches)
+        self._compiled[set_names] = compiled
+        return compiled
+
+    def scan(self, text: str, set_names: Iterable[str]) -> List[PriceMatch]:
+        """单次扫描文本，返回所有 (互不重叠的) 匹配"""
+        compiled = self._compile(tuple(set_names))
+        matches = []
+        for m in compiled.regex.finditer(text):
+            pattern, outer, inner_count = compiled.branches[m.lastgroup]
+            groups = tuple(m.group(outer + i) for i in range(1, inner_count + 1))
+            matches.append(self._build_match(pattern, m.group(outer), groups, m.span()))
+        return matches
+
+    def first(self, text: str, set_names: Iterable[str], metric: str) -> Optional[PriceMatch]:
+        """返回指定指标的第一个匹配"""
+        for match in self.scan(text, set_names):
+            if match.metric == metric:
+                return match
+        return None
+
+    @staticmethod
+    def _build_match(
+        pattern: PricePattern,
+        text: str,
+        groups: Tuple[Optional[str], ...],
+        span: Tuple[int, int],
+    ) -> PriceMatch:
+        value = None
+        if 0 < pattern.value_group <= len(groups) and groups[pattern.value_group - 1]:
+            try:
+                value = float(groups[pattern.value_group - 1])
+            except ValueError:
+                value = None
+
+        unit = pattern.unit
+        if pattern.unit_group and pattern.unit_group <= len(groups) and groups[pattern.unit_group - 1]:
+            unit = groups[pattern.unit_group - 1]
+
+        direction = pattern.direction
+        if direction is None:
+            lowered = text.lower()
+            if any(word in lowered for word in UP_WORDS):
+                direction = "up"
+            elif any(word in lowered for word in DOWN_WORDS):
+                direction = "down"
+            else:
+                direction = "neutral"
+
+        return PriceMatch(
+            pattern=pattern.name,
+            metric=pattern.metric,
+            direction=direction,
+            value=value,
+            unit=unit,
+            text=text,
+            groups=groups,
+            span=span,
+        )
+
+
+# 全局引擎实例
+_engine: Optional[ExtractionEngine] = None
+
+
+def get_extraction_engine() -> ExtractionEngine:
+    """获取全局抽取引擎"""
+    global _engine
+    if _engine is None:
+        _engine = ExtractionEngine()
+    return _engine
+
+
+def register_patterns(set_name: str, patterns: Sequence[PricePattern]):
+    """向全局引擎注册模式集"""
+    get_extraction_engine().register(set_name, patterns)
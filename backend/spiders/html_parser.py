@@ -0,0 +1,50 @@
+"""
+HTML 解析层
+统一创建 BeautifulSoup，默认使用 lxml (C 实现)，缺失时退回 html.parser；
+支持 SoupStrainer 定向解析，只物化价格表格、JSON-LD 脚本等目标节点
+"""
+
+import logging
+import os
+import re
+from typing import Optional, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# lxml 已在依赖中，缺失时退回标准库解析器
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+# 解析后端: lxml / html.parser (可由 SPIDER_HTML_PARSER 指定)
+DEFAULT_PARSER = os.getenv("SPIDER_HTML_PARSER", "lxml" if LXML_AVAILABLE else "html.parser")
+if DEFAULT_PARSER == "lxml" and not LXML_AVAILABLE:
+    DEFAULT_PARSER = "html.parser"
+
+# 常用定向解析过滤器
+JSON_LD_STRAINER = SoupStrainer("script", type="application/ld+json")
+
+
+def class_strainer(tags: Union[str, list], pattern: str) -> SoupStrainer:
+    """按标签名 + class 正则构建过滤器"""
+    return SoupStrainer(tags, class_=re.compile(pattern, re.I))
+
+
+def make_soup(
+    content: Union[str, bytes],
+    parse_only: Optional[SoupStrainer] = None,
+    parser: Optional[str] = None,
+) -> BeautifulSoup:
+    """
+    创建 BeautifulSoup
+
+    Args:
+        content: 页面内容
+        parse_only: 定向解析过滤器，仅保留匹配的节点及其子树
+        parser: 覆盖默认解析后端
+    """
+    return BeautifulSoup(content, parser or DEFAULT_PARSER, parse_only=parse_only)
@@ -0,0 +1,258 @@
+"""
+共享 HTTP 连接池
+所有爬虫与采集器复用同一个 httpx.AsyncClient，保持长连接 (keep-alive)，
+同一主机在一次采集周期内只需完成一次 TCP/TLS 握手
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from .rate_limiter import get_rate_limiter, parse_retry_after
+from .recorder import get_recorder
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 需要 h2 包 (httpx[http2])，缺失时退回 HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 默认配置
+DEFAULT_TIMEOUT = 10                        # 默认请求超时 (秒)
+MAX_CONNECTIONS = 100                       # 连接池总连接数
+MAX_KEEPALIVE_CONNECTIONS = 20              # 保持空闲的长连接数
+KEEPALIVE_EXPIRY = 60                       # 空闲长连接保留时间 (秒)
+MAX_CONNECTIONS_PER_HOST = 6                # 单主机并发请求上限
+MAX_RESPONSE_BYTES = 20 * 1024 * 1024       # 单个响应体上限 (解压后, 20MB)
+
+# 流式读取时不应透传给重建响应的头 (响应体已解压)
+_DECODED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class ResponseTooLargeError(Exception):
+    """响应体超过大小上限"""
+    pass
+
+
+class HTTPClientPool:
+    """
+    HTTP 连接池
+
+    - keep-alive + HTTP/2 (若 h2 可用)
+    - gzip/deflate 内置，brotli 在安装 brotli 包后自动启用
+    - 单主机并发上限，避免压垮同一数据源
+    - 请求前从主机级令牌桶取令牌，429/503 的 Retry-After 会暂停该主机
+    - 响应体大小上限，流式读取超限即中断
+    - 录制/回放模式 (见 recorder.py)，回放时不访问网络
+
+    httpx 的连接绑定在创建它的事件循环上，若检测到事件循环变化
+    (例如脚本多次调用 asyncio.run) 会丢弃旧连接并重建
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_connections: int = MAX_CONNECTIONS,
+        max_keepalive_connections: int = MAX_KEEPALIVE_CONNECTIONS,
+        per_host_limit: int = MAX_CONNECTIONS_PER_HOST,
+        max_response_bytes: int = MAX_RESPONSE_BYTES,
+        http2: bool = HTTP2_AVAILABLE,
+    ):
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+        )
+        self.per_host_limit = per_host_limit
+        self.max_response_bytes = max_response_bytes
+        self.http2 = http2
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """获取 (必要时创建) 绑定当前事件循环的客户端"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            if self._client is not None and not self._client.is_closed:
+                logger.info("[http_pool] 事件循环已变化，重建连接池")
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+            )
+            self._loop = loop
+            self._host_semaphores = {}
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """获取主机级并发信号量"""
+        host = urlsplit(url).netloc.lower()
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_limit)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def _stream_live(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """发起真实的流式 GET 请求 (经限流和主机并发控制)"""
+        client = self.client
+        request_timeout = timeout if timeout is not None else self.timeout
+        limiter = get_rate_limiter()
+
+        await limiter.acquire(url)
+        async with self._host_semaphore(url):
+            async with client.stream(
+                "GET", url, headers=headers, params=params, timeout=request_timeout
+            ) as response:
+                if response.status_code in (429, 503):
+                    retry_after = parse_retry_after(response.headers.get("retry-after"))
+                    if retry_after is not None:
+                        limiter.penalize(url, retry_after)
+                yield response
+
+    async def _read(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+    ) -> httpx.Response:
+        """读取完整响应体 (max_bytes 为空时不限大小)"""
+        async with self._stream_live(url, headers=headers, params=params, timeout=timeout) as response:
+            declared = response.headers.get("content-length")
+            if max_bytes and declared and declared.isdigit() and int(declared) > max_bytes:
+                raise ResponseTooLargeError(f"响应体过大 ({declared} bytes): {url}")
+
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if max_bytes and size > max_bytes:
+                    raise ResponseTooLargeError(f"响应体超过 {max_bytes} bytes: {url}")
+                chunks.append(chunk)
+
+        # 重建已完整读取的响应，保持 raise_for_status / text / json 的用法不变
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=[
+                (k, v) for k, v in response.headers.multi_items()
+                if k.lower() not in _DECODED_HEADERS
+            ],
+            content=b"".join(chunks),
+            request=response.request,
+            extensions={"http_version": response.extensions.get("http_version", b"HTTP/1.1")},
+        )
+
+    async def _fetch_offline(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]],
+        params: Optional[Dict],
+        timeout: Optional[float],
+        max_bytes: Optional[int],
+    ) -> httpx.Response:
+        """录制/回放模式下的完整读取"""
+        recorder = get_recorder()
+        if recorder.replaying:
+            return await recorder.replay(url, params)
+
+        response = await self._read(url, headers=headers, params=params, timeout=timeout)
+        recorder.save(url, params, response)
+        if max_bytes and len(response.content) > max_bytes:
+            raise ResponseTooLargeError(f"响应体超过 {max_bytes} bytes: {url}")
+        return response
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[httpx.Response]:
+        """
+        发起流式 GET 请求 (经限流和主机并发控制)，响应体由调用方按块读取
+
+        用于大文档的增量解析，不受 max_response_bytes 限制；
+        录制/回放模式下返回已完整读取的响应，aiter_bytes 用法不变
+        """
+        if get_recorder().enabled:
+            yield await self._fetch_offline(url, headers, params, timeout, max_bytes=None)
+            return
+
+        async with self._stream_live(url, headers=headers, params=params, timeout=timeout) as response:
+            yield response
+
+    async def get(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+    ) -> httpx.Response:
+        """
+        发起 GET 请求并读取完整响应体
+
+        Raises:
+            httpx.HTTPError: 网络/协议错误 (回放模式下无夹具时为 httpx.ConnectError)
+            ResponseTooLargeError: 响应体超过 max_response_bytes
+        """
+        if get_recorder().enabled:
+            return await self._fetch_offline(
+                url, headers, params, timeout, max_bytes=self.max_response_bytes
+            )
+        return await self._read(
+            url, headers=headers, params=params, timeout=timeout,
+            max_bytes=self.max_response_bytes,
+        )
+
+    async def aclose(self):
+        """关闭连接池"""
+        if self._client is not None and not self._client.is_closed:
+            try:
+                await self._client.aclose()
+            except RuntimeError as e:
+                # 所属事件循环已关闭，连接随之释放
+                logger.debug(f"[http_pool] 关闭连接池时忽略: {e}")
+        self._client = None
+        self._loop = None
+        self._host_semaphores = {}
+
+
+# 全局连接池实例
+_pool: Optional[HTTPClientPool] = None
+
+
+def get_http_pool() -> HTTPClientPool:
+    """获取全局连接池实例"""
+    global _pool
+    if _pool is None:
+        _pool = HTTPClientPool()
+    return _pool
+
+
+async def close_http_pool():
+    """关闭全局连接池 (由 FastAPI lifespan / Celery worker 关闭时调用)"""
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
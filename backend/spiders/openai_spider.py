@@ -10,12 +10,14 @@ from typing import Any, Dict, List
 from datetime import datetime
 from bs4 import BeautifulSoup
 
-from .base import BaseSpider
+from .base import BrowserSpider
+from .html_parser import make_soup, class_strainer, JSON_LD_STRAINER
+from .extraction import PricePattern, get_extraction_engine, register_patterns
 
 logger = logging.getLogger(__name__)
 
 
-class OpenAISpider(BaseSpider):
+class OpenAISpider(BrowserSpider):
     """
     OpenAI 定价爬虫
     
@@ -44,17 +46,31 @@ class OpenAISpider(BaseSpider):
         "o3-mini": "o3-mini",
     }
     
+    # 价格节点过滤器
+    PRICE_STRAINER = class_strainer(["div", "tr", "td"], r"price|pricing|cost")
+    
+    # 模型名/价格抽取模式 (模型名在前，避免模型名中的数字被当作价格)
+    PATTERN_SET = "openai"
+    PRICE_PATTERNS = [
+        PricePattern("model", r"(gpt-[34][o\-\w]*|o[13]-\w*)", metric="model", value_group=0),
+        PricePattern(
+            "api_price",
+            r"\$?([\d.]+)\s*(?:\/\s*)?(?:per\s*)?(\d*[KM]?)\s*(?:tokens?|input|output)?",
+            metric="api_price", unit_group=2,
+        ),
+    ]
+    
     async def parse(self, content: str) -> List[Dict[str, Any]]:
         """
         解析OpenAI定价页面
         """
         results = []
-        soup = BeautifulSoup(content, "html.parser")
         
         # OpenAI 的定价页面结构
         # 尝试查找价格表格或价格卡片
         
-        # 方式1: 查找JSON-LD结构化数据
+        # 方式1: 查找JSON-LD结构化数据 (只解析 ld+json 脚本节点)
+        soup = make_soup(content, parse_only=JSON_LD_STRAINER)
         json_scripts = soup.find_all("script", type="application/ld+json")
         for script in json_scripts:
             try:
@@ -65,9 +81,9 @@ class OpenAISpider(BaseSpider):
             except json.JSONDecodeError:
                 pass
         
-        # 方式2: 解析HTML表格
+        # 方式2: 解析HTML表格 (只解析带价格 class 的节点)
         if not results:
-            results = self._parse_html_tables(soup)
+            results = self._parse_html_tables(make_soup(content, parse_only=self.PRICE_STRAINER))
         
         # 方式3: 使用预定义的价格 (作为后备)
         if not results:
@@ -84,15 +100,19 @@ class OpenAISpider(BaseSpider):
         # OpenAI页面通常使用特定的CSS类
         price_elements = soup.find_all(["div", "tr", "td"], class_=re.compile(r"price|pricing|cost", re.I))
         
+        engine = get_extraction_engine()
+        
         for elem in price_elements:
             text = elem.get_text(strip=True)
             
-            # 匹配价格模式: $0.00015 / 1K tokens
-            price_match = re.search(r"\$?([\d.]+)\s*(?:\/\s*)?(?:per\s*)?(\d*[KM]?)\s*(?:tokens?|input|output)?", text, re.I)
+            # 单次扫描同时匹配模型名和价格 ($0.00015 / 1K tokens)
+            matches = engine.scan(text, [self.PATTERN_SET])
+            price_match = next((m for m in matches if m.metric == "api_price" and m.value is not None), None)
+            model_match = next((m for m in matches if m.metric == "model"), None)
             
             if price_match:
-                price = float(price_match.group(1))
-                multiplier = price_match.group(2)
+                price = price_match.value
+                multiplier = price_match.unit or ""
                 
                 # 标准化为每1M tokens
                 if multiplier.upper() == "K" or multiplier == "1K":
@@ -100,10 +120,9 @@ class OpenAISpider(BaseSpider):
                 elif not multiplier or multiplier == "1":
                     price = price * 1000000
                 
-                # 尝试匹配模型名
-                model_match = re.search(r"(gpt-[34][o\-\w]*|o[13]-\w*)", text, re.I)
+                # 模型名
                 if model_match:
-                    model = model_match.group(1).lower()
+                    model = model_match.text.lower()
                     results.append({
                         "sku_id": self.MODEL_MAPPING.get(model, model),
                         "price": price,
@@ -154,8 +173,9 @@ class OpenAISpider(BaseSpider):
         """
         执行爬虫
         
-        注意: OpenAI 网站有反爬机制 (403)
+        注意: OpenAI 网站有反爬机制 (403)，页面经浏览器池渲染后再解析
         生产环境建议使用 OpenAI API 或第三方数据源
+        连续失败后熔断器打开，冷却期内不再请求官网，直接使用后备数据
         """
         # 尝试爬取，失败则使用后备数据
         target_url = url or self.pricing_url
@@ -166,3 +186,6 @@ class OpenAISpider(BaseSpider):
             results = self._get_fallback_prices()
         
         return results
+
+
+register_patterns(OpenAISpider.PATTERN_SET, OpenAISpider.PRICE_PATTERNS)
@@ -0,0 +1,88 @@
+"""
+解析结果缓存
+按 (爬虫, URL) 记录上次页面内容哈希和解析结果，
+页面内容字节级一致时跳过解析，直接复用上次的记录列表
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存目录 (多个 worker 共享同一目录)
+DEFAULT_PARSE_CACHE_DIR = Path(__file__).parent.parent / "data" / "parse_cache"
+
+
+def content_hash(content: str) -> str:
+    """计算页面内容哈希"""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ParsedResult:
+    """上次解析结果"""
+    spider: str
+    url: str
+    content_hash: str
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    parsed_at: str = ""
+
+
+class ParseResultStore:
+    """目录存储: 每个 (爬虫, URL) 一个 JSON 文件，原子替换写入"""
+
+    def __init__(self, cache_dir: Path = DEFAULT_PARSE_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, spider: str, url: str) -> Path:
+        url_key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        return self.cache_dir / f"{spider}_{url_key}.json"
+
+    def get(self, spider: str, url: str) -> Optional[ParsedResult]:
+        path = self._path(spider, url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return ParsedResult(**json.load(f))
+        except Exception as e:
+            logger.warning(f"[parse_cache] 读取失败 {path}: {e}")
+            return None
+
+    def store(self, spider: str, url: str, digest: str, records: List[Dict[str, Any]]) -> bool:
+        path = self._path(spider, url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        entry = ParsedResult(
+            spider=spider,
+            url=url,
+            content_hash=digest,
+            records=records,
+            parsed_at=datetime.utcnow().isoformat(),
+        )
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"[parse_cache] 写入失败 {path}: {e}")
+            return False
+
+
+# 全局存储实例
+_store: Optional[ParseResultStore] = None
+
+
+def get_parse_store() -> ParseResultStore:
+    """获取全局解析结果存储 (目录可由 SPIDER_PARSE_CACHE_DIR 指定)"""
+    global _store
+    if _store is None:
+        _store = ParseResultStore(Path(os.getenv("SPIDER_PARSE_CACHE_DIR", DEFAULT_PARSE_CACHE_DIR)))
+    return _store
@@ -0,0 +1,136 @@
+"""
+主机级限流器
+进程内按主机共享令牌桶，所有爬虫和采集器的请求都先取令牌；
+服务端返回 429/503 + Retry-After 时暂停该主机，重试使用带抖动的指数退避
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+DEFAULT_RATE = 2.0          # 每主机每秒请求数
+DEFAULT_BURST = 4           # 令牌桶容量 (允许的突发请求数)
+BACKOFF_BASE = 1.0          # 退避基数 (秒)
+BACKOFF_MAX = 60.0          # 单次退避上限 (秒)
+MAX_RETRY_AFTER = 120.0     # Retry-After 上限 (秒)，避免单个主机拖住整批任务
+
+# 特定主机的限速 (每秒请求数, 桶容量)
+HOST_RATE_OVERRIDES: Dict[str, Tuple[float, int]] = {
+    "data.sec.gov": (8.0, 8),   # SEC 公平访问: 不超过 10 req/s
+}
+
+
+class TokenBucket:
+    """
+    令牌桶
+
+    采用预约方式: 取令牌时立即扣减 (可为负)，返回需要等待的秒数，
+    检查与扣减之间没有 await，因此在单线程事件循环中无需加锁，也不绑定事件循环
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self) -> float:
+        """预约一个令牌，返回需要等待的秒数"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        self.tokens -= 1
+
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+    def block(self, seconds: float):
+        """暂停发放令牌 (Retry-After)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class HostRateLimiter:
+    """按主机划分的限流器"""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        overrides: Optional[Dict[str, Tuple[float, int]]] = None,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides if overrides is not None else dict(HOST_RATE_OVERRIDES)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.overrides.get(host, (self.rate, self.burst))
+            bucket = TokenBucket(rate, burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, url: str):
+        """等待直到该主机允许发出下一个请求"""
+        wait = self._bucket(url).reserve()
+        if wait > 0:
+            logger.debug(f"[rate_limiter] {urlsplit(url).netloc} 限流等待 {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def penalize(self, url: str, retry_after: float):
+        """服务端要求退避时暂停该主机"""
+        retry_after = min(retry_after, MAX_RETRY_AFTER)
+        self._bucket(url).block(retry_after)
+        logger.warning(f"[rate_limiter] {urlsplit(url).netloc} 暂停 {retry_after:.1f}s (Retry-After)")
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 头 (秒数或 HTTP 日期)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """
+    计算重试等待时间
+
+    有 Retry-After 时以其为准 (有上限)，否则为带抖动的指数退避:
+    base * 2^attempt 的一半固定 + 一半随机
+    """
+    if retry_after is not None:
+        return min(retry_after, MAX_RETRY_AFTER)
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+# 全局限流器实例
+_limiter: Optional[HostRateLimiter] = None
+
+
+def get_rate_limiter() -> HostRateLimiter:
+    """获取全局限流器实例"""
+    global _limiter
+    if _limiter is None:
+        _limiter = HostRateLimiter()
+    return _limiter
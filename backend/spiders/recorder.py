@@ -0,0 +1,150 @@
+"""
+HTTP 录制/回放
+record 模式把经共享连接池的每个响应写入夹具目录；
+replay 模式完全离线，从夹具目录返回响应，并可模拟网络延迟。
+爬虫、采集器和财报接口都经过连接池，因此无需逐个改造即可离线运行
+
+环境变量:
+- SPIDER_RECORD_MODE: off (默认) / record / replay
+- SPIDER_FIXTURE_DIR: 夹具目录
+- SPIDER_REPLAY_LATENCY: 回放时每个请求的模拟延迟 (秒)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+MODE_OFF = "off"
+MODE_RECORD = "record"
+MODE_REPLAY = "replay"
+
+DEFAULT_FIXTURE_DIR = Path(__file__).parent.parent / "fixtures" / "http"
+
+# 回放时不透传的响应头 (响应体以解压后的形式保存)
+_SKIP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "set-cookie"}
+
+
+def fixture_key(url: str, params: Optional[Dict] = None) -> str:
+    """请求的夹具键 (GET + URL + 排序后的查询参数，不含请求头)"""
+    query = json.dumps(sorted((params or {}).items()), ensure_ascii=False, default=str)
+    return hashlib.sha256(f"GET {url} {query}".encode("utf-8")).hexdigest()[:24]
+
+
+class HTTPRecorder:
+    """HTTP 录制/回放器"""
+
+    def __init__(
+        self,
+        mode: str = MODE_OFF,
+        fixture_dir: Path = DEFAULT_FIXTURE_DIR,
+        latency: float = 0.0,
+    ):
+        if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+            raise ValueError(f"未知的录制模式: {mode}")
+        self.mode = mode
+        self.fixture_dir = Path(fixture_dir)
+        self.latency = latency
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == MODE_RECORD
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == MODE_REPLAY
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != MODE_OFF
+
+    def _paths(self, url: str, params: Optional[Dict]):
+        key = fixture_key(url, params)
+        return self.fixture_dir / f"{key}.json", self.fixture_dir / f"{key}.body"
+
+    def save(self, url: str, params: Optional[Dict], response: httpx.Response):
+        """保存响应到夹具目录"""
+        meta_path, body_path = self._paths(url, params)
+        meta = {
+            "url": url,
+            "params": params or {},
+            "status_code": response.status_code,
+            "headers": [
+                [k, v] for k, v in response.headers.multi_items()
+                if k.lower() not in _SKIP_HEADERS
+            ],
+            "recorded_at": datetime.utcnow().isoformat(),
+            "size": len(response.content),
+        }
+        try:
+            self.fixture_dir.mkdir(parents=True, exist_ok=True)
+            body_path.write_bytes(response.content)
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(meta, f, indent=2, ensure_ascii=False)
+            logger.info(f"[recorder] 已录制 {response.status_code} {url}")
+        except Exception as e:
+            logger.warning(f"[recorder] 录制失败 {url}: {e}")
+
+    async def replay(self, url: str, params: Optional[Dict] = None) -> httpx.Response:
+        """
+        从夹具目录返回响应
+
+        Raises:
+            httpx.ConnectError: 没有对应夹具 (与离线时的网络错误一致，调用方走后备逻辑)
+        """
+        if self.latency > 0:
+            await asyncio.sleep(self.latency * random.uniform(0.8, 1.2))
+
+        request = httpx.Request("GET", url, params=params)
+        meta_path, body_path = self._paths(url, params)
+        if not meta_path.exists():
+            logger.warning(f"[recorder] 无夹具: {url}")
+            raise httpx.ConnectError(f"回放模式下无夹具: {url}", request=request)
+
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return httpx.Response(
+            status_code=meta["status_code"],
+            headers=[tuple(h) for h in meta.get("headers", [])],
+            content=body_path.read_bytes() if body_path.exists() else b"",
+            request=request,
+        )
+
+
+# 全局录制器实例
+_recorder: Optional[HTTPRecorder] = None
+
+
+def get_recorder() -> HTTPRecorder:
+    """获取全局录制器 (首次调用时按环境变量初始化)"""
+    global _recorder
+    if _recorder is None:
+        _recorder = HTTPRecorder(
+            mode=os.getenv("SPIDER_RECORD_MODE", MODE_OFF).lower(),
+            fixture_dir=Path(os.getenv("SPIDER_FIXTURE_DIR", DEFAULT_FIXTURE_DIR)),
+            latency=float(os.getenv("SPIDER_REPLAY_LATENCY", "0")),
+        )
+        if _recorder.enabled:
+            logger.info(f"[recorder] 模式: {_recorder.mode}, 夹具目录: {_recorder.fixture_dir}")
+    return _recorder
+
+
+def configure_recorder(
+    mode: str,
+    fixture_dir: Optional[Path] = None,
+    latency: float = 0.0,
+) -> HTTPRecorder:
+    """显式设置录制/回放模式 (供命令行脚本使用)"""
+    global _recorder
+    _recorder = HTTPRecorder(mode=mode, fixture_dir=fixture_dir or DEFAULT_FIXTURE_DIR, latency=latency)
+    logger.info(f"[recorder] 模式: {_recorder.mode}, 夹具目录: {_recorder.fixture_dir}")
+    return _recorder
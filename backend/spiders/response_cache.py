@@ -0,0 +1,186 @@
+"""
+条件请求响应缓存
+保存 ETag/Last-Modified 校验值及响应体，供所有 Celery worker 共享
+下次请求携带 If-None-Match/If-Modified-Since，304 时直接复用缓存内容
+"""
+
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# 默认缓存目录 (多个 worker 共享同一目录)
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "http_cache"
+
+# Redis 键前缀与过期时间
+REDIS_KEY_PREFIX = "infrawatch:http_cache:"
+REDIS_TTL_SECONDS = 30 * 24 * 3600  # 30天未访问自动淘汰
+
+
+@dataclass
+class CachedResponse:
+    """缓存的响应"""
+    url: str
+    body: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    stored_at: str = ""
+
+    def validator_headers(self) -> Dict[str, str]:
+        """生成条件请求头"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _entry_from_response(url: str, response: httpx.Response) -> Optional[CachedResponse]:
+    """从响应构建缓存条目，无校验值时返回 None"""
+    etag = response.headers.get("etag")
+    last_modified = response.headers.get("last-modified")
+    if not etag and not last_modified:
+        return None
+    return CachedResponse(
+        url=url,
+        body=response.text,
+        etag=etag,
+        last_modified=last_modified,
+        stored_at=datetime.utcnow().isoformat(),
+    )
+
+
+class ResponseCache:
+    """
+    响应缓存基类
+
+    缓存读写失败只记录日志，不影响正常请求
+    """
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        return None
+
+    async def store(self, url: str, response: httpx.Response) -> bool:
+        return False
+
+    async def clear(self):
+        pass
+
+
+class FileResponseCache(ResponseCache):
+    """目录缓存: 每个 URL 一个 JSON 文件，原子替换写入，可跨进程共享"""
+
+    def __init__(self, cache_dir: Path = DEFAULT_CACHE_DIR):
+        self.cache_dir = Path(cache_dir)
+
+    def _path(self, url: str) -> Path:
+        return self.cache_dir / f"{_cache_key(url)}.json"
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        path = self._path(url)
+        if not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return CachedResponse(**json.load(f))
+        except Exception as e:
+            logger.warning(f"[http_cache] 读取缓存失败 {path}: {e}")
+            return None
+
+    async def store(self, url: str, response: httpx.Response) -> bool:
+        entry = _entry_from_response(url, response)
+        if entry is None:
+            return False
+        path = self._path(url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"[http_cache] 写入缓存失败 {path}: {e}")
+            return False
+
+    async def clear(self):
+        if not self.cache_dir.exists():
+            return
+        for path in self.cache_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+class RedisResponseCache(ResponseCache):
+    """Redis 缓存: 适用于多机部署的 worker"""
+
+    def __init__(self, redis_url: str):
+        import redis.asyncio as aioredis
+
+        self.redis_url = redis_url
+        self._redis = aioredis.from_url(redis_url, decode_responses=True)
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        try:
+            raw = await self._redis.get(REDIS_KEY_PREFIX + _cache_key(url))
+            return CachedResponse(**json.loads(raw)) if raw else None
+        except Exception as e:
+            logger.warning(f"[http_cache] Redis 读取失败: {e}")
+            return None
+
+    async def store(self, url: str, response: httpx.Response) -> bool:
+        entry = _entry_from_response(url, response)
+        if entry is None:
+            return False
+        try:
+            await self._redis.set(
+                REDIS_KEY_PREFIX + _cache_key(url),
+                json.dumps(asdict(entry), ensure_ascii=False),
+                ex=REDIS_TTL_SECONDS,
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"[http_cache] Redis 写入失败: {e}")
+            return False
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=REDIS_KEY_PREFIX + "*"):
+            await self._redis.delete(key)
+
+
+# 全局缓存实例
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    获取全局响应缓存
+
+    环境变量:
+    - SPIDER_CACHE_BACKEND: file (默认) / redis / none
+    - SPIDER_CACHE_DIR: 目录缓存路径
+    - REDIS_URL: Redis 缓存地址
+    """
+    global _cache
+    if _cache is None:
+        backend = os.getenv("SPIDER_CACHE_BACKEND", "file").lower()
+        if backend == "redis":
+            _cache = RedisResponseCache(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        elif backend == "none":
+            _cache = ResponseCache()
+        else:
+            _cache = FileResponseCache(Path(os.getenv("SPIDER_CACHE_DIR", DEFAULT_CACHE_DIR)))
+        logger.info(f"[http_cache] 使用缓存后端: {type(_cache).__name__}")
+    return _cache
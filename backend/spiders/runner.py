@@ -0,0 +1,145 @@
+"""
+并发爬虫执行器
+在全局并发上限和单主机并发上限内同时运行多个爬虫，
+每个爬虫有独立的截止时间，超时即取消，返回部分结果和逐个状态
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from .base import BaseSpider
+
+logger = logging.getLogger(__name__)
+
+# 默认配置
+DEFAULT_CONCURRENCY = 8         # 全局同时运行的爬虫数
+DEFAULT_PER_HOST_LIMIT = 2      # 同一主机同时运行的爬虫数
+DEFAULT_DEADLINE = 30           # 单个爬虫截止时间 (秒)
+
+# 运行状态
+STATUS_OK = "ok"
+STATUS_UNCHANGED = "unchanged"
+STATUS_TIMEOUT = "timeout"
+STATUS_ERROR = "error"
+
+# 失败/超时时由爬虫后备数据填充的记录带 source="fallback"，下游不应作为采集结果存储
+FALLBACK_SOURCE = "fallback"
+
+
+@dataclass
+class SpiderJob:
+    """待运行的爬虫任务"""
+    provider: str
+    spider: BaseSpider
+    url: Optional[str] = None
+    deadline: Optional[float] = None  # 覆盖默认截止时间
+
+    @property
+    def target_url(self) -> Optional[str]:
+        return self.url or getattr(self.spider, "pricing_url", None) or getattr(self.spider, "api_url", None)
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.target_url or "").netloc.lower() or self.provider
+
+
+@dataclass
+class SpiderRunResult:
+    """单个爬虫运行结果"""
+    provider: str
+    status: str
+    records: List[Dict[str, Any]] = field(default_factory=list)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "status": self.status,
+            "records": len(self.records),
+            "elapsed": round(self.elapsed, 3),
+            "error": self.error,
+        }
+
+
+class SpiderRunner:
+    """
+    并发爬虫执行器
+
+    用法:
+        runner = SpiderRunner(deadline=20)
+        results = await runner.run([SpiderJob("aws", AWSSpider()), ...])
+        results = await runner.run_registry(["openai", "aws"])
+    """
+
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        deadline: float = DEFAULT_DEADLINE,
+        use_fallback: bool = True,
+    ):
+        self.concurrency = concurrency
+        self.per_host_limit = per_host_limit
+        self.deadline = deadline
+        self.use_fallback = use_fallback
+
+    async def run(self, jobs: Iterable[SpiderJob]) -> Dict[str, SpiderRunResult]:
+        """并发运行所有任务，按任务顺序返回 {provider: 结果}"""
+        jobs = list(jobs)
+        global_semaphore = asyncio.Semaphore(self.concurrency)
+        host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        for job in jobs:
+            host_semaphores.setdefault(job.host, asyncio.Semaphore(self.per_host_limit))
+
+        async def run_job(job: SpiderJob) -> SpiderRunResult:
+            async with global_semaphore, host_semaphores[job.host]:
+                return await self._run_one(job)
+
+        results = await asyncio.gather(*(run_job(job) for job in jobs))
+
+        summary = ", ".join(f"{r.provider}={r.status}" for r in results)
+        logger.info(f"[runner] 完成 {len(results)} 个爬虫: {summary}")
+        return {r.provider: r for r in results}
+
+    async def run_registry(self, names: Optional[Iterable[str]] = None) -> Dict[str, SpiderRunResult]:
+        """按注册表名称运行爬虫 (默认全部)"""
+        from . import SPIDER_REGISTRY
+
+        names = list(names) if names is not None else list(SPIDER_REGISTRY.keys())
+        jobs = [SpiderJob(name, SPIDER_REGISTRY[name]()) for name in names if name in SPIDER_REGISTRY]
+        return await self.run(jobs)
+
+    async def _run_one(self, job: SpiderJob) -> SpiderRunResult:
+        """运行单个爬虫，超时取消"""
+        deadline = job.deadline or self.deadline
+        start = time.monotonic()
+        try:
+            coro = job.spider.run(job.url) if job.url else job.spider.run()
+            records = await asyncio.wait_for(coro, timeout=deadline)
+            status = STATUS_UNCHANGED if getattr(job.spider, "last_run_unchanged", False) else STATUS_OK
+            return SpiderRunResult(job.provider, status, records or [], time.monotonic() - start)
+        except asyncio.TimeoutError:
+            logger.warning(f"[runner] {job.provider} 超过截止时间 {deadline}s，已取消")
+            return SpiderRunResult(
+                job.provider, STATUS_TIMEOUT, self._fallback(job), time.monotonic() - start,
+                error=f"超过截止时间 {deadline}s",
+            )
+        except Exception as e:
+            logger.error(f"[runner] {job.provider} 运行失败: {e}")
+            return SpiderRunResult(
+                job.provider, STATUS_ERROR, self._fallback(job), time.monotonic() - start,
+                error=str(e),
+            )
+
+    def _fallback(self, job: SpiderJob) -> List[Dict[str, Any]]:
+        """失败/超时时使用爬虫自带的后备数据 (若有)，记录带 source 标记"""
+        get_fallback = getattr(job.spider, "_get_fallback_prices", None)
+        if not self.use_fallback or get_fallback is None:
+            return []
+        logger.info(f"[runner] {job.provider} 使用后备价格数据")
+        return [{**record, "source": FALLBACK_SOURCE} for record in get_fallback()]
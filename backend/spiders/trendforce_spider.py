@@ -4,13 +4,14 @@ TrendForce/DRAMeXchange 存储价格爬虫
 从 DRAMeXchange 新闻页面抓取 HBM/DRAM 价格信号
 """
 
-import re
 import logging
 from typing import Any, Dict, List, Optional
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import SoupStrainer
 
 from .base import BaseSpider
+from .html_parser import make_soup
+from .extraction import PricePattern, get_extraction_engine, register_patterns
 
 logger = logging.getLogger(__name__)
 
@@ -31,23 +32,52 @@ class TrendForceSpider(BaseSpider):
         "enterprise_news": "https://www.dramexchange.com/WeeklyResearch/EnterpriseNews",
     }
     
-    # 价格提取正则模式
+    # 价格提取模式 (注册到共享抽取引擎，合并编译后单次扫描)
+    PATTERN_SET = "trendforce"
     PRICE_PATTERNS = [
         # HBM 价格模式: "HBM3e prices increased by 15%"
-        r"HBM\d?e?\s+(?:price[s]?|ASP)\s+(?:increase|rise|surge|jump|climb)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
-        r"HBM\d?e?\s+(?:price[s]?|ASP)\s+(?:decrease|drop|fall|decline)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
+        PricePattern(
+            "hbm_up",
+            r"HBM\d?e?\s+(?:price[s]?|ASP)\s+(?:increase|rise|surge|jump|climb)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
+            metric="hbm_price", direction="up", unit="%",
+        ),
+        PricePattern(
+            "hbm_down",
+            r"HBM\d?e?\s+(?:price[s]?|ASP)\s+(?:decrease|drop|fall|decline)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
+            metric="hbm_price", direction="down", unit="%",
+        ),
         # DRAM 价格模式
-        r"DRAM\s+(?:contract\s+)?(?:price[s]?|ASP)\s+(?:increase|rise|surge)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
-        r"DDR\d\s+(?:price[s]?|ASP)\s+(?:increase|rise)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
+        PricePattern(
+            "dram_up",
+            r"DRAM\s+(?:contract\s+)?(?:price[s]?|ASP)\s+(?:increase|rise|surge)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
+            metric="dram_price", direction="up", unit="%",
+        ),
+        PricePattern(
+            "ddr_up",
+            r"DDR\d\s+(?:price[s]?|ASP)\s+(?:increase|rise)[sd]?\s+(?:by\s+)?(\d+(?:\.\d+)?)\s*%",
+            metric="ddr_price", direction="up", unit="%",
+        ),
         # 绝对价格: "$15.50 per GB"
-        r"\$(\d+(?:\.\d+)?)\s*(?:per|\/)\s*(?:GB|chip|unit)",
+        PricePattern(
+            "absolute_price",
+            r"\$(\d+(?:\.\d+)?)\s*(?:per|\/)\s*(?:GB|chip|unit)",
+            metric="memory_price",
+        ),
         # 季度涨幅: "Q4 prices to increase 13-18% QoQ"
-        r"Q\d\s+(?:price[s]?)\s+(?:to\s+)?(?:increase|rise)\s+(\d+)[-–](\d+)\s*%\s*QoQ",
+        PricePattern(
+            "quarterly_range",
+            r"Q\d\s+(?:price[s]?)\s+(?:to\s+)?(?:increase|rise)\s+(\d+)[-–](\d+)\s*%\s*QoQ",
+            metric="memory_price_qoq", direction="up", unit="%",
+        ),
     ]
     
+    # 文章节点过滤器: 标题链接、摘要、页脚
+    ARTICLE_STRAINER = SoupStrainer(class_=["deepbluebold3", "BlogPostContent", "BlogPostFooter"])
+    
     async def parse(self, content: str) -> List[Dict[str, Any]]:
         """解析页面内容，提取新闻文章"""
-        soup = BeautifulSoup(content, "html.parser")
+        # 只物化标题、摘要和页脚节点，文档顺序保持不变
+        soup = make_soup(content, parse_only=self.ARTICLE_STRAINER)
         articles = []
         
         # DRAMeXchange 页面结构：
@@ -55,7 +85,7 @@ class TrendForceSpider(BaseSpider):
         # - 摘要: .BlogPostContent
         # - 日期: .BlogPostFooter 内的 span
         
-        # 方法1: 通过标题链接查找文章
+        # 通过标题链接查找文章，摘要和日期取标题之后最近的节点
         title_links = soup.select("a.deepbluebold3")
         
         for title_elem in title_links[:20]:  # 限制数量
@@ -68,24 +98,19 @@ class TrendForceSpider(BaseSpider):
                 if link and not link.startswith("http"):
                     link = f"https://www.dramexchange.com{link}"
                 
-                # 找到父容器，然后查找摘要和日期
-                parent = title_elem.find_parent("td") or title_elem.find_parent("div")
-                
                 # 提取日期 (在 BlogPostFooter 内)
                 date_str = ""
-                if parent:
-                    footer = parent.find_next(class_="BlogPostFooter")
-                    if footer:
-                        date_span = footer.select_one(".title22 span") or footer.select_one("span")
-                        if date_span:
-                            date_str = date_span.get_text(strip=True)
+                footer = title_elem.find_next(class_="BlogPostFooter")
+                if footer:
+                    date_span = footer.select_one(".title22 span") or footer.select_one("span")
+                    if date_span:
+                        date_str = date_span.get_text(strip=True)
                 
                 # 提取摘要 (BlogPostContent)
                 summary = ""
-                if parent:
-                    content_div = parent.find_next(class_="BlogPostContent")
-                    if content_div:
-                        summary = content_div.get_text(strip=True)[:300]  # 限制长度
+                content_div = title_elem.find_next(class_="BlogPostContent")
+                if content_div:
+                    summary = content_div.get_text(strip=True)[:300]  # 限制长度
                 
                 if title:
                     articles.append({
@@ -99,59 +124,31 @@ class TrendForceSpider(BaseSpider):
                 logger.warning(f"解析文章失败: {e}")
                 continue
         
-        # 方法2: 备用 - 通过表格行查找
-        if not articles:
-            rows = soup.select("tr")
-            for row in rows[:20]:
-                try:
-                    title_elem = row.select_one("a.deepbluebold3")
-                    if not title_elem:
-                        continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    link = title_elem.get("href", "")
-                    if link and not link.startswith("http"):
-                        link = f"https://www.dramexchange.com{link}"
-                    
-                    articles.append({
-                        "title": title,
-                        "date": "",
-                        "link": link,
-                        "summary": "",
-                        "source": "DRAMeXchange",
-                    })
-                except Exception as e:
-                    continue
-        
         logger.info(f"[trendforce_spider] 解析到 {len(articles)} 篇文章")
         return articles
     
     def extract_price_signals(self, text: str) -> List[Dict[str, Any]]:
-        """从文本中提取价格信号"""
+        """
+        从文本中提取价格信号 (单次扫描所有模式)
+        
+        pattern/match/values/direction/extracted_at 与逐个正则匹配时的格式一致
+        (pattern 为正则前 50 个字符)，metric/value/unit 为新增字段
+        """
         signals = []
+        extracted_at = datetime.utcnow().isoformat()
+        regexes = {p.name: p.regex for p in self.PRICE_PATTERNS}
         
-        for pattern in self.PRICE_PATTERNS:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    signal = {
-                        "pattern": pattern[:50],
-                        "match": match.group(0),
-                        "values": match.groups(),
-                        "extracted_at": datetime.utcnow().isoformat(),
-                    }
-                    
-                    # 判断是涨还是跌
-                    if any(word in match.group(0).lower() for word in ["increase", "rise", "surge", "jump", "climb"]):
-                        signal["direction"] = "up"
-                    elif any(word in match.group(0).lower() for word in ["decrease", "drop", "fall", "decline"]):
-                        signal["direction"] = "down"
-                    else:
-                        signal["direction"] = "neutral"
-                    
-                    signals.append(signal)
-                except Exception as e:
-                    logger.warning(f"提取价格信号失败: {e}")
+        for match in get_extraction_engine().scan(text, [self.PATTERN_SET]):
+            signals.append({
+                "pattern": regexes[match.pattern][:50],
+                "match": match.text,
+                "values": match.groups,
+                "metric": match.metric,
+                "value": match.value,
+                "unit": match.unit,
+                "direction": match.direction,
+                "extracted_at": extracted_at,
+            })
         
         return signals
     
@@ -203,6 +200,9 @@ class TrendForceSpider(BaseSpider):
         return all_signals
 
 
+register_patterns(TrendForceSpider.PATTERN_SET, TrendForceSpider.PRICE_PATTERNS)
+
+
 # 便捷函数
 async def fetch_memory_prices() -> List[Dict[str, Any]]:
     """获取内存价格信号"""
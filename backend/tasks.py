@@ -5,9 +5,11 @@ Celery 任务定义
 
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import worker_process_init, worker_process_shutdown
 import asyncio
 import os
 import logging
+from typing import Optional
 
 # 配置 Celery
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -74,13 +76,48 @@ celery_app.conf.beat_schedule = {
 logger = logging.getLogger(__name__)
 
 
-def run_async(coro):
-    """在同步上下文中运行异步函数"""
-    loop = asyncio.new_event_loop()
+# Worker 进程常驻事件循环 (共享 HTTP 连接池绑定在该循环上，跨任务复用)
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_worker_loop() -> asyncio.AbstractEventLoop:
+    """获取 (必要时创建) 当前进程的常驻事件循环"""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        _worker_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_worker_loop)
+    return _worker_loop
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Worker 子进程启动: 创建常驻事件循环"""
+    _get_worker_loop()
+    logger.info("[Celery] Worker 事件循环已初始化")
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    """Worker 子进程退出: 关闭共享连接池、浏览器池和事件循环"""
+    global _worker_loop
+    if _worker_loop is None or _worker_loop.is_closed():
+        return
+    
+    from spiders.http_client import close_http_pool
+    from spiders.browser_pool import close_browser_pool
+    
     try:
-        return loop.run_until_complete(coro)
+        _worker_loop.run_until_complete(close_http_pool())
+        _worker_loop.run_until_complete(close_browser_pool())
     finally:
-        loop.close()
+        _worker_loop.close()
+        _worker_loop = None
+    logger.info("[Celery] Worker 连接池已关闭")
+
+
+def run_async(coro):
+    """在同步上下文中运行异步函数"""
+    return _get_worker_loop().run_until_complete(coro)
 
 
 @celery_app.task(name="tasks.collect_sector")
@@ -2,12 +2,19 @@
 """
 爬虫测试脚本
 测试各个爬虫的运行情况
+
+用法:
+    python test_spiders.py                          # 访问真实站点
+    python test_spiders.py --record fixtures/http   # 访问真实站点并录制响应
+    python test_spiders.py --replay fixtures/http   # 离线回放录制的响应
 """
 
+import argparse
 import asyncio
 import json
 import sys
 from datetime import datetime
+from pathlib import Path
 
 # 添加路径
 sys.path.insert(0, '.')
@@ -17,6 +24,22 @@ from spiders import (
     DeepSeekSpider, QwenSpider, MiniMaxSpider,
     AWSSpider, AzureSpider, GCPSpider
 )
+from spiders.recorder import configure_recorder, MODE_RECORD, MODE_REPLAY
+
+# 待测爬虫 (scripts/bench_spiders.py 复用此列表)
+SPIDERS = [
+    # B板块：大模型 API
+    (OpenAISpider, "OpenAI 定价"),
+    (AnthropicSpider, "Anthropic 定价"),
+    (DeepSeekSpider, "DeepSeek 定价"),
+    (QwenSpider, "通义千问 定价"),
+    (MiniMaxSpider, "MiniMax 定价"),
+    # C板块：GPU 租赁
+    (LambdaLabsSpider, "Lambda Labs GPU"),
+    (AWSSpider, "AWS GPU"),
+    (AzureSpider, "Azure GPU"),
+    (GCPSpider, "GCP GPU"),
+]
 
 
 async def test_spider(spider_class, name: str):
@@ -56,22 +79,8 @@ async def main():
     print(f"时间: {datetime.now().isoformat()}")
     print("="*60)
     
-    spiders = [
-        # B板块：大模型 API
-        (OpenAISpider, "OpenAI 定价"),
-        (AnthropicSpider, "Anthropic 定价"),
-        (DeepSeekSpider, "DeepSeek 定价"),
-        (QwenSpider, "通义千问 定价"),
-        (MiniMaxSpider, "MiniMax 定价"),
-        # C板块：GPU 租赁
-        (LambdaLabsSpider, "Lambda Labs GPU"),
-        (AWSSpider, "AWS GPU"),
-        (AzureSpider, "Azure GPU"),
-        (GCPSpider, "GCP GPU"),
-    ]
-    
     results = []
-    for spider_class, name in spiders:
+    for spider_class, name in SPIDERS:
         result = await test_spider(spider_class, name)
         results.append(result)
     
@@ -111,4 +120,16 @@ async def main():
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="InfraWatch 爬虫测试")
+    offline = parser.add_mutually_exclusive_group()
+    offline.add_argument("--record", type=Path, metavar="DIR", help="录制所有 HTTP 响应到夹具目录")
+    offline.add_argument("--replay", type=Path, metavar="DIR", help="从夹具目录离线回放 HTTP 响应")
+    parser.add_argument("--latency", type=float, default=0.0, help="回放时每个请求的模拟延迟 (秒)")
+    args = parser.parse_args()
+    
+    if args.record:
+        configure_recorder(MODE_RECORD, args.record)
+    elif args.replay:
+        configure_recorder(MODE_REPLAY, args.replay, latency=args.latency)
+    
     asyncio.run(main())